@@ -0,0 +1,37 @@
+"""Game event log
+
+Revision ID: 002_game_events
+Revises: 001_initial
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002_game_events'
+down_revision: Union[str, None] = '001_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Журнал событий игр /api/game"""
+    op.create_table(
+        'game_events',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('player_id', sa.String(36), nullable=False),
+        sa.Column('kind', sa.SmallInteger, nullable=False),
+        sa.Column('scene', sa.Integer, nullable=False),
+        sa.Column('choice', sa.SmallInteger, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_game_events_player_id', 'game_events', ['player_id', 'id'])
+
+
+def downgrade() -> None:
+    """Удаление журнала событий"""
+    op.drop_table('game_events')
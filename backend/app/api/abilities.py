@@ -7,34 +7,29 @@ API endpoints для системы способностей
 """
 
 import logging
-import json
-from typing import Dict, List, Optional
-from pathlib import Path
+from typing import Dict, List, Mapping, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 
 from app.services.auth_service import get_current_user
+from app.services.ability_index import AbilityIndex
+from app.services.content_store import get_content
+from app.services.search_index import DEFAULT_SEARCH_LIMIT
 from app.database.models import User
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Путь к файлу с данными
-DATA_FILE = Path(__file__).parent.parent / "data" / "abilities.json"
 
+def load_abilities_data() -> Mapping:
+    """Получить данные о способностях из хранилища контента"""
+    return get_content().abilities
 
-def load_abilities_data() -> dict:
-    """Загрузить данные о способностях из JSON"""
-    try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        logger.error("Abilities data file not found")
-        return {}
-    except json.JSONDecodeError as e:
-        logger.error(f"Error parsing abilities JSON: {e}")
-        return {}
+
+def get_ability_index() -> AbilityIndex:
+    """Получить индекс способностей текущего снимка"""
+    return get_content().ability_index
 
 
 @router.get("", response_model=Dict, summary="Получить все способности")
@@ -97,21 +92,9 @@ async def get_ability(ability_id: str, branch: Optional[str] = Query(None)):
     - **ability_id**: ID способности (например, alc_50, psy_100)
     - **branch**: Опционально, ветка способности для ускорения поиска
     """
-    data = load_abilities_data()
-    
-    # Поиск по всем веткам
-    for branch_name, abilities in data.items():
-        if branch_name == "metadata":
-            continue
-        
-        # Если указана ветка, пропускаем другие
-        if branch and branch_name != branch:
-            continue
-        
-        # Поиск в текущей ветке
-        for key, ability in abilities.items():
-            if ability.get("id") == ability_id or key == ability_id:
-                return ability
+    ability = get_ability_index().get(ability_id, branch)
+    if ability is not None:
+        return ability
     
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -130,23 +113,7 @@ async def get_abilities_by_level(
     - **min_level**: Минимальный уровень (1-100)
     - **max_level**: Максимальный уровень (1-100)
     """
-    data = load_abilities_data()
-    result = {}
-    
-    for branch_name, abilities in data.items():
-        if branch_name == "metadata":
-            continue
-        
-        branch_abilities = {}
-        for key, ability in abilities.items():
-            level_req = ability.get("level_required", 1)
-            if min_level <= level_req <= max_level:
-                branch_abilities[key] = ability
-        
-        if branch_abilities:
-            result[branch_name] = branch_abilities
-    
-    return result
+    return get_ability_index().by_level(min_level, max_level)
 
 
 @router.get("/by-chapter/{chapter}", response_model=Dict, summary="Получить способности по главе")
@@ -162,62 +129,25 @@ async def get_abilities_by_chapter(chapter: int):
             detail="Chapter must be between 1 and 18"
         )
     
-    data = load_abilities_data()
-    result = {}
-    
-    for branch_name, abilities in data.items():
-        if branch_name == "metadata":
-            continue
-        
-        branch_abilities = {}
-        for key, ability in abilities.items():
-            chapters = ability.get("chapters", [])
-            if chapter in chapters:
-                branch_abilities[key] = ability
-        
-        if branch_abilities:
-            result[branch_name] = branch_abilities
-    
-    return result
+    return get_ability_index().by_chapter(chapter)
 
 
 @router.get("/search", response_model=List[Dict], summary="Поиск способностей")
 async def search_abilities(
     query: str = Query(..., min_length=2),
-    branch: Optional[str] = Query(None)
+    branch: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=200)
 ):
     """
     Поиск способностей по названию или описанию.
     
+    Результаты отсортированы по релевантности: совпадения в названии выше.
+    
     - **query**: Поисковый запрос (минимум 2 символа)
     - **branch**: Опционально, ограничить поиск конкретной веткой
+    - **limit**: Максимум результатов
     """
-    data = load_abilities_data()
-    results = []
-    query_lower = query.lower()
-    
-    for branch_name, abilities in data.items():
-        if branch_name == "metadata":
-            continue
-        
-        if branch and branch_name != branch:
-            continue
-        
-        for key, ability in abilities.items():
-            name = ability.get("name", "").lower()
-            description = ability.get("description", "").lower()
-            
-            if query_lower in name or query_lower in description:
-                results.append({
-                    "id": ability.get("id"),
-                    "key": key,
-                    "name": ability.get("name"),
-                    "description": ability.get("description"),
-                    "branch": branch_name,
-                    "level_required": ability.get("level_required")
-                })
-    
-    return results
+    return get_content().ability_search.search(query, limit=limit, group=branch)
 
 
 @router.get("/available", response_model=List[Dict], summary="Доступные способности для персонажа")
@@ -236,60 +166,10 @@ async def get_available_abilities(
     - **path**: Выбранный путь (alliance/observer/independence)
     - **completed_quests**: Список завершённых квестов через запятую
     """
-    data = load_abilities_data()
     completed_quests_list = completed_quests.split(",") if completed_quests else []
-    available = []
-    
-    for branch_name, abilities in data.items():
-        if branch_name == "metadata":
-            continue
-        
-        # Обработка способностей пути
-        if branch_name == "path":
-            if path and path in abilities:
-                for key, ability in abilities[path].items():
-                    unlock = ability.get("unlock", "")
-                    if path in unlock and f"chapter_{current_chapter}" in unlock.lower():
-                        available.append({
-                            "id": ability.get("id"),
-                            "name": ability.get("name"),
-                            "description": ability.get("description"),
-                            "branch": branch_name,
-                            "path": path
-                        })
-            continue
-        
-        # Проверка остальных способностей
-        for key, ability in abilities.items():
-            level_req = ability.get("level_required", 1)
-            chapters = ability.get("chapters", [])
-            quest_unlock = ability.get("quest_unlock")
-            quest_requirement = ability.get("quest_requirement")
-            
-            # Проверка уровня
-            if character_level < level_req:
-                continue
-            
-            # Проверка главы
-            if chapters and current_chapter not in chapters:
-                continue
-            
-            # Проверка квеста
-            if quest_unlock and quest_unlock not in completed_quests_list:
-                continue
-            
-            if quest_requirement and quest_requirement not in completed_quests_list:
-                continue
-            
-            available.append({
-                "id": ability.get("id"),
-                "name": ability.get("name"),
-                "description": ability.get("description"),
-                "branch": branch_name,
-                "level_required": level_req
-            })
-    
-    return available
+    return get_ability_index().available(
+        character_level, current_chapter, completed_quests_list, path
+    )
 
 
 @router.get("/metadata", response_model=Dict, summary="Метаданные системы способностей")
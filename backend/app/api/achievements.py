@@ -6,54 +6,28 @@ API endpoints для системы достижений
 Версия: 1.0.0
 """
 
-import json
 import logging
-from datetime import datetime
-from typing import List, Optional, Dict, Any
-from pathlib import Path
+from typing import List, Optional, Dict, Any, Mapping
 
 from fastapi import APIRouter, HTTPException, Query
 
+from app.services.achievement_rules import get_rarity
+from app.services.achievement_tracker import achievement_tracker
+from app.services.content_store import get_content
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Путь к файлам данных
-DATA_DIR = Path(__file__).parent.parent / "data"
-ACHIEVEMENTS_FILE = DATA_DIR / "achievements.json"
-
-
-def _load_achievements() -> dict:
-    """Загрузка определений достижений"""
-    if not ACHIEVEMENTS_FILE.exists():
-        return {"achievements": {}, "categories": {}, "rarity": {}}
-    try:
-        with open(ACHIEVEMENTS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading achievements: {e}")
-        return {"achievements": {}, "categories": {}, "rarity": {}}
-
 
-def get_rarity(points: int) -> str:
-    """Определение редкости по очкам"""
-    if points <= 30:
-        return "common"
-    elif points <= 50:
-        return "uncommon"
-    elif points <= 75:
-        return "rare"
-    elif points <= 100:
-        return "epic"
-    else:
-        return "legendary"
+def _load_achievements() -> Mapping:
+    """Определения достижений из хранилища контента"""
+    return get_content().achievements
 
 
 def get_rarity_color(rarity: str) -> str:
     """Получение цвета редкости"""
-    data = _load_achievements()
-    rarity_data = data.get("rarity", {})
-    return rarity_data.get(rarity, {}).get("color", "#9ca3af")
+    return get_content().get_rarity_color(rarity)
 
 
 # ============================================================================
@@ -172,136 +146,28 @@ async def check_player_achievements(player_data: dict):
       "games_completed": 1
     }
     ```
-    """
-    data = _load_achievements()
-    achievements = data.get("achievements", {})
-    
-    unlocked = []
-    progress = {}
-    
-    for ach_id, ach in achievements.items():
-        req = ach.get("requirement", {})
-        req_type = req.get("type")
-        is_unlocked = False
-        current_progress = 0
-        max_progress = 1
-        
-        if req_type == "scenes_visited":
-            visited = set(player_data.get("visited_scenes", []))
-            required = req.get("count", 1)
-            current_progress = len(visited)
-            max_progress = required
-            is_unlocked = len(visited) >= required
-            
-        elif req_type == "all_scenes_visited":
-            # Упрощённая проверка - в реальной игре нужно знать общее количество сцен
-            visited = set(player_data.get("visited_scenes", []))
-            current_progress = len(visited)
-            max_progress = 58  # Количество сцен в игре
-            is_unlocked = len(visited) >= 58
-            
-        elif req_type == "choice_pattern":
-            pattern = req.get("pattern", "")
-            required = req.get("count", 1)
-            patterns = player_data.get("decision_patterns", {})
-            current_progress = patterns.get(pattern, 0)
-            max_progress = required
-            is_unlocked = current_progress >= required
-            
-        elif req_type == "final_stat":
-            stat = req.get("stat", "")
-            min_val = req.get("min", 0)
-            max_val = req.get("max", 100)
-            stats = player_data.get("stats", {})
-            stat_value = stats.get(stat, 0)
-            current_progress = stat_value
-            max_progress = 100
-            if min_val > 0:
-                is_unlocked = stat_value >= min_val
-            elif max_val < 100:
-                is_unlocked = stat_value <= max_val and stat_value > 0
-                
-        elif req_type == "stat_maxed":
-            stat = req.get("stat", "")
-            stats = player_data.get("stats", {})
-            stat_value = stats.get(stat, 0)
-            current_progress = stat_value
-            max_progress = 100
-            is_unlocked = stat_value >= 100
-            
-        elif req_type == "stat_threshold":
-            stat = req.get("stat", "")
-            min_val = req.get("min", 0)
-            stats = player_data.get("stats", {})
-            stat_value = stats.get(stat, 0)
-            current_progress = stat_value
-            max_progress = min_val
-            is_unlocked = stat_value >= min_val
-            
-        elif req_type == "relationship_max":
-            char = req.get("character", "")
-            relationships = player_data.get("relationships", {})
-            rel_value = relationships.get(char, 0)
-            current_progress = rel_value
-            max_progress = 100
-            is_unlocked = rel_value >= 100
-            
-        elif req_type == "ending":
-            ending = req.get("ending", "")
-            player_ending = player_data.get("ending_type", "")
-            is_unlocked = player_ending == ending
-            
-        elif req_type == "playtime":
-            max_minutes = req.get("max_minutes", 999)
-            playtime = player_data.get("playtime_minutes", 0)
-            current_progress = playtime
-            max_progress = max_minutes
-            is_unlocked = playtime <= max_minutes and playtime > 0
-            
-        elif req_type == "no_pattern":
-            pattern = req.get("pattern", "")
-            patterns = player_data.get("decision_patterns", {})
-            is_unlocked = patterns.get(pattern, 0) == 0 and player_data.get("games_completed", 0) > 0
-            
-        elif req_type == "games_completed":
-            required = req.get("count", 1)
-            completed = player_data.get("games_completed", 0)
-            current_progress = completed
-            max_progress = required
-            is_unlocked = completed >= required
-        
-        # Записываем прогресс
-        progress[ach_id] = {
-            "current": current_progress,
-            "max": max_progress,
-            "percentage": min(100, (current_progress / max_progress * 100)) if max_progress > 0 else 0
-        }
-        
-        if is_unlocked:
-            rarity = get_rarity(ach.get("points", 0))
-            unlocked.append({
-                "id": ach_id,
-                "name": ach["name"],
-                "description": ach["description"],
-                "icon": ach["icon"],
-                "points": ach["points"],
-                "rarity": rarity,
-                "rarity_color": get_rarity_color(rarity),
-                "unlocked_at": datetime.utcnow().isoformat()
-            })
-    
-    # Сортировка разблокированных по очкам
-    unlocked.sort(key=lambda x: x["points"], reverse=True)
     
-    total_points = sum(a["points"] for a in unlocked)
+    Правила скомпилированы заранее; вычисляются только группы правил,
+    читающие переданные поля.
+    """
+    return get_content().achievement_engine.check(player_data)
+
+
+@router.get("/player/{player_id}", summary="Достижения текущей игры игрока")
+async def get_player_achievements(player_id: str):
+    """
+    Достижения игрока, отслеживаемые сервером по ходу игры.
     
-    return {
-        "unlocked_count": len(unlocked),
-        "total_count": len(achievements),
-        "total_points": total_points,
-        "achievements": unlocked,
-        "progress": progress
-    }
+    Формат ответа совпадает с /check, но данные игрока передавать
+    не нужно: прогресс обновляется при каждом выборе.
+    """
+    payload = achievement_tracker.get_payload(player_id)
+    if payload is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Игрок '{player_id}' не найден"
+        )
+    return payload
 
 
 @router.get("/stats/summary", summary="Статистика достижений")
@@ -6,6 +6,7 @@ API для административной панели
 Версия: 1.0.0
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
@@ -15,6 +16,7 @@ from pydantic import BaseModel, Field
 from sqlalchemy import select, update, delete, and_, or_, func, desc, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database.connection import get_db
 from app.database.models import (
     User, PlayerStats, GameSession, Achievement, 
@@ -607,19 +609,86 @@ async def clear_data_cache(
     """
     Очистка кэша данных игры (сцены, персонажи)
 
-    Используйте после обновления JSON файлов
+    Используйте после обновления JSON файлов. Новый снимок контента
+    строится в фоне и подменяется атомарно; при ошибке в файлах
+    остаётся прежняя версия.
     """
-    from app.services import data_service
+    from app.services.content_store import content_store, ContentValidationError
 
-    data_service.clear_cache()
-    data_service.reload_data()
+    try:
+        snapshot = await content_store.reload_async()
+    except ContentValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": "Контент не прошёл проверку", "errors": e.errors}
+        )
 
     return {
         "status": "success",
-        "message": "Кэш данных очищен и перезапущен"
+        "message": "Кэш данных очищен и перезапущен",
+        "version": snapshot.version,
+        "generation": snapshot.generation
+    }
+
+
+@router.get("/game-store/stats", summary="Статистика хранилища игроков")
+async def get_game_store_stats(
+    admin: User = Depends(require_admin)
+):
+    """
+    Число активных игроков, оценка занятой памяти, счётчики вытеснений,
+    журнала событий и общего хранилища сессий
+    """
+    from app.services.game_log import game_event_log
+    from app.services.player_store import player_store
+    from app.services.session_store import session_store
+
+    return {
+        **player_store.get_stats(),
+        "event_log": game_event_log.get_stats(),
+        "sessions": session_store.get_stats(),
     }
 
 
+@router.get("/content/simulate", summary="Симуляция прохождений")
+async def simulate_playthroughs(
+    runs: int = Query(10000, ge=1, le=settings.simulation_max_runs),
+    policy: str = Query("uniform", description="Политика выбора: uniform, cautious"),
+    seed: Optional[int] = Query(None),
+    max_steps: int = Query(200, ge=1, le=10000),
+    include_scenes: bool = Query(False),
+    admin: User = Depends(require_admin)
+):
+    """
+    Монте-Карло симуляция прохождений по графу сцен: распределение
+    концовок, длины путей и распределения характеристик
+    """
+    from app.services.simulation import (
+        POLICIES, SimulationUnavailable, build_simulation_table, simulate
+    )
+
+    if policy not in POLICIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Неизвестная политика '{policy}', доступны: {', '.join(POLICIES)}"
+        )
+
+    def run():
+        return simulate(
+            build_simulation_table(), runs=runs, policy=policy, seed=seed,
+            max_steps=max_steps, batch_size=settings.simulation_batch_size,
+            include_scenes=include_scenes
+        )
+
+    try:
+        report = await asyncio.to_thread(run)
+    except SimulationUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    logger.info(f"🎲 Симуляция: {runs} прохождений за {report['elapsed_ms']} мс ({admin.username})")
+    return report
+
+
 @router.get("/content/stats", summary="Статистика контента")
 async def get_content_stats(
     admin: User = Depends(require_admin),
@@ -9,46 +9,55 @@ API endpoints для персонажей
 import logging
 from typing import Dict
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 
 from app.models.game import CharacterInfo
-from app.services.data_service import get_characters, get_character
+from app.services.content_store import get_content
+from app.services.payload_cache import get_payload, payload_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _character_info(char_id: str, char_data: Dict) -> CharacterInfo:
+    """Собрать CharacterInfo из данных персонажа"""
+    return CharacterInfo(
+        id=char_id,
+        name=char_data.get("name", "Неизвестный"),
+        role=char_data.get("role", ""),
+        description=char_data.get("description", ""),
+        relationship=char_data.get("initial_relationship", 50),
+        avatar=char_data.get("avatar")
+    )
+
+
 @router.get("", response_model=Dict[str, CharacterInfo],
             summary="Получить всех персонажей")
-async def list_characters() -> Dict[str, CharacterInfo]:
+async def list_characters() -> Response:
     """
     Получить список всех персонажей игры.
 
     Возвращает словарь с информацией о всех персонажах.
+    Ответ сериализуется один раз на версию контента.
     
     Returns:
         Dict[str, CharacterInfo]: Словарь персонажей по ID
     """
-    characters: Dict[str, dict] = get_characters()
-    result: Dict[str, CharacterInfo] = {}
-
-    for char_id, char_data in characters.items():
-        result[char_id] = CharacterInfo(
-            id=char_id,
-            name=char_data.get("name", "Неизвестный"),
-            role=char_data.get("role", ""),
-            description=char_data.get("description", ""),
-            relationship=char_data.get("initial_relationship", 50),
-            avatar=char_data.get("avatar")
-        )
+    content = get_content()
+
+    def build() -> Dict[str, dict]:
+        return {
+            char_id: _character_info(char_id, char_data).model_dump(mode="json")
+            for char_id, char_data in content.characters.items()
+        }
 
-    return result
+    return payload_response(get_payload(content, "characters", build))
 
 
 @router.get("/{character_id}", response_model=CharacterInfo,
             summary="Получить персонажа по ID")
-async def get_character_by_id(character_id: str) -> CharacterInfo:
+async def get_character_by_id(character_id: str) -> Response:
     """
     Получить детальную информацию о персонаже по его ID.
 
@@ -61,7 +70,8 @@ async def get_character_by_id(character_id: str) -> CharacterInfo:
     Raises:
         HTTPException: 404 если персонаж не найден
     """
-    char_data: Dict = get_character(character_id)
+    content = get_content()
+    char_data = content.characters.get(character_id)
 
     if not char_data:
         raise HTTPException(
@@ -69,11 +79,8 @@ async def get_character_by_id(character_id: str) -> CharacterInfo:
             detail=f"Персонаж '{character_id}' не найден"
         )
 
-    return CharacterInfo(
-        id=character_id,
-        name=char_data.get("name", "Неизвестный"),
-        role=char_data.get("role", ""),
-        description=char_data.get("description", ""),
-        relationship=char_data.get("initial_relationship", 50),
-        avatar=char_data.get("avatar")
+    payload = get_payload(
+        content, f"character:{character_id}",
+        lambda: _character_info(character_id, char_data).model_dump(mode="json")
     )
+    return payload_response(payload)
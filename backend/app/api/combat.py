@@ -10,7 +10,7 @@ from pydantic import BaseModel, Field
 from app.services.combat_service import (
     CombatManager, CombatState, CombatAction, CombatActionType,
     CombatAbility, Position, Combatant, create_player_combatant,
-    create_enemy_combatant
+    create_enemy_combatant, combat_manager as shared_combat_manager
 )
 from app.models.base import APIResponse, ResponseBuilder, ErrorCodeEnum
 
@@ -24,8 +24,8 @@ router = APIRouter()
 # ============================================================================
 
 def get_combat_manager() -> CombatManager:
-    """Получить менеджер боя"""
-    return CombatManager()
+    """Получить менеджер боя (бои общие для воркеров через хранилище сессий)"""
+    return shared_combat_manager
 
 
 # ============================================================================
@@ -83,6 +83,7 @@ async def start_combat(
         
         # Начало боя
         combat = combat_manager.start_combat(player, [enemy], rewards)
+        await combat_manager.save_combat(combat.id)
         
         return APIResponse(
             status="success",
@@ -114,7 +115,7 @@ async def get_combat_state(
     - Лог действий
     """
     try:
-        combat = combat_manager.combats.get(combat_id)
+        combat = await combat_manager.load_combat(combat_id, fresh=False)
         
         if not combat:
             raise HTTPException(status_code=404, detail="Бой не найден")
@@ -164,58 +165,58 @@ async def player_action(
     ```
     """
     try:
-        combat = combat_manager.combats.get(combat_id)
-        
-        if not combat:
-            raise HTTPException(status_code=404, detail="Бой не найден")
-        
-        if combat.result:
-            raise HTTPException(status_code=400, detail="Бой уже завершён")
-        
-        # Создание действия
-        ability = None
-        if request.ability_id:
-            ability = next(
-                (a for a in combat.player.abilities if a.id == request.ability_id),
-                None
+        # Бой отпускается из памяти менеджера и при ошибке
+        async with combat_manager.use_combat(combat_id) as combat:
+            if not combat:
+                raise HTTPException(status_code=404, detail="Бой не найден")
+            
+            if combat.result:
+                raise HTTPException(status_code=400, detail="Бой уже завершён")
+            
+            # Создание действия
+            ability = None
+            if request.ability_id:
+                ability = next(
+                    (a for a in combat.player.abilities if a.id == request.ability_id),
+                    None
+                )
+                if not ability:
+                    raise HTTPException(status_code=400, detail="Способность не найдена")
+            
+            action = CombatAction(
+                type=request.action_type,
+                actor_id=combat.player.id,
+                target_id=request.target_id,
+                ability=ability,
+                item_id=request.item_id,
+                position=request.position
             )
-            if not ability:
-                raise HTTPException(status_code=400, detail="Способность не найдена")
-        
-        action = CombatAction(
-            type=request.action_type,
-            actor_id=combat.player.id,
-            target_id=request.target_id,
-            ability=ability,
-            item_id=request.item_id,
-            position=request.position
-        )
-        
-        # Выполнение действия
-        success, message, log_entry = combat_manager.player_turn(combat_id, action)
-        
-        if not success:
-            raise HTTPException(status_code=400, detail=message)
-        
-        # Ход врага (если бой не завершён)
-        enemy_logs = []
-        if not combat.result:
-            _, _, enemy_logs = combat_manager.enemy_turn(combat_id)
-        
-        return APIResponse(
-            status="success",
-            message=message,
-            data={
-                "player_action": log_entry.model_dump() if log_entry else None,
-                "enemy_actions": [log.model_dump() for log in enemy_logs],
-                "combat_state": {
-                    "player": combat.player.model_dump(),
-                    "enemies": [e.model_dump() for e in combat.enemies],
-                    "result": combat.result.value if combat.result else None,
-                    "rewards": combat.rewards if combat.result == "victory" else None
+            
+            # Выполнение действия
+            success, message, log_entry = combat_manager.player_turn(combat_id, action)
+            
+            if not success:
+                raise HTTPException(status_code=400, detail=message)
+            
+            # Ход врага (если бой не завершён)
+            enemy_logs = []
+            if not combat.result:
+                _, _, enemy_logs = combat_manager.enemy_turn(combat_id)
+            
+            return APIResponse(
+                status="success",
+                message=message,
+                data={
+                    "player_action": log_entry.model_dump() if log_entry else None,
+                    "enemy_actions": [log.model_dump() for log in enemy_logs],
+                    "combat_state": {
+                        "player": combat.player.model_dump(),
+                        "enemies": [e.model_dump() for e in combat.enemies],
+                        "result": combat.result.value if combat.result else None,
+                        "rewards": combat.rewards if combat.result == "victory" else None
+                    }
                 }
-            }
-        )
+            )
     except HTTPException:
         raise
     except Exception as e:
@@ -236,28 +237,28 @@ async def flee_combat(
     - Скорости врагов
     """
     try:
-        combat = combat_manager.combats.get(combat_id)
-        
-        if not combat:
-            raise HTTPException(status_code=404, detail="Бой не найден")
-        
-        action = CombatAction(
-            type=CombatActionType.FLEE,
-            actor_id=combat.player.id
-        )
-        
-        success, message, log_entry = combat_manager.player_turn(combat_id, action)
-        
-        if not success:
-            raise HTTPException(status_code=400, detail=message)
-        
-        return APIResponse(
-            status="success",
-            message=message,
-            data={
-                "result": combat.result.value if combat.result else None
-            }
-        )
+        # Бой отпускается из памяти менеджера и при ошибке
+        async with combat_manager.use_combat(combat_id) as combat:
+            if not combat:
+                raise HTTPException(status_code=404, detail="Бой не найден")
+            
+            action = CombatAction(
+                type=CombatActionType.FLEE,
+                actor_id=combat.player.id
+            )
+            
+            success, message, log_entry = combat_manager.player_turn(combat_id, action)
+            
+            if not success:
+                raise HTTPException(status_code=400, detail=message)
+            
+            return APIResponse(
+                status="success",
+                message=message,
+                data={
+                    "result": combat.result.value if combat.result else None
+                }
+            )
     except HTTPException:
         raise
     except Exception as e:
@@ -277,7 +278,7 @@ async def get_combat_log(
     Возвращает последние N записей лога.
     """
     try:
-        combat = combat_manager.combats.get(combat_id)
+        combat = await combat_manager.load_combat(combat_id, fresh=False)
         
         if not combat:
             raise HTTPException(status_code=404, detail="Бой не найден")
@@ -7,31 +7,65 @@ API endpoints для игровой логики
 """
 
 import logging
-from typing import Dict, Optional, Tuple
+from typing import Dict, Mapping, Optional, Tuple
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 
+from app.config import settings
 from app.models.game import (
     GameStartRequest, GameStartResponse,
     GameChoiceRequest, GameChoiceResponse,
-    PlayerStatsResponse, SceneResponse, Choice
+    PlayerStatsResponse, SceneResponse
+)
+from app.services.achievement_tracker import achievement_tracker
+from app.services.content_store import get_content
+from app.services.game_log import game_event_log, new_game_state
+from app.services.payload_cache import get_payload, payload_response
+from app.services.player_state import PlayerState
+from app.services.player_store import StaleStateError, player_store
+# is_ending_scene и get_ending_type реэкспортируются для обратной совместимости
+from app.services.scene_graph import (
+    MISSING_SCENE, CompiledScene, SceneGraph, Transition, compile_scene_response,
+    get_ending_type, is_ending_scene
 )
-from app.services.data_service import data_service, get_scene
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Временное хранилище состояния игроков (в продакшене - база данных)
-players_state: Dict[str, dict] = {}
+# Состояние активных игроков: ограничено по числу, простою и памяти,
+# вытесненные игроки сохраняются в PlayerStats и восстанавливаются по запросу;
+# с общим хранилищем сессий состояние видно всем воркерам
+players_state = player_store
+
+
+def _on_player_evicted(player_id: str, player: PlayerState) -> None:
+    """Перенести разблокированные достижения в сохраняемое состояние"""
+    unlocked = achievement_tracker.get_unlocked(player_id)
+    if unlocked:
+        player.achievements_unlocked = list(unlocked)
+    achievement_tracker.forget(player_id)
+    # При вытеснении сохраняется снимок, счётчик журнала начинается заново
+    game_event_log.forget(player_id)
+
+
+players_state.on_evict(_on_player_evicted)
+
+
+def _on_events_dropped(player_id: str) -> None:
+    """События игрока отброшены из переполненного журнала: сохранить снимок"""
+    players_state.mark_dirty(player_id)
+
+
+game_event_log.on_drop(_on_events_dropped)
 
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def check_game_over(stats: Dict[str, int]) -> Tuple[bool, Optional[str]]:
+def check_game_over(stats: Mapping[str, int]) -> Tuple[bool, Optional[str]]:
     """Проверка условий конца игры
     
     Args:
@@ -47,42 +81,6 @@ def check_game_over(stats: Dict[str, int]) -> Tuple[bool, Optional[str]]:
     return False, None
 
 
-def is_ending_scene(scene_id: str) -> bool:
-    """Проверка, является ли сцена финальной
-    
-    Args:
-        scene_id: ID сцены для проверки
-        
-    Returns:
-        True если сцена финальная
-    """
-    ending_keywords = ["ancient_awakening", "hide_artifact", "artifact_destruction",
-                       "defend_station", "victory", "game_over"]
-    return any(keyword in scene_id for keyword in ending_keywords)
-
-
-def get_ending_type(scene_id: str) -> Optional[str]:
-    """Определить тип концовки
-    
-    Args:
-        scene_id: ID сцены
-        
-    Returns:
-        Тип концовки или None
-    """
-    ending_types: Dict[str, str] = {
-        "ancient_awakening": "awakening",
-        "hide_artifact": "guardian",
-        "artifact_destruction": "sacrifice",
-        "defend_station": "combat_victory",
-        "game_over": "defeat"
-    }
-    for key, ending_type in ending_types.items():
-        if key in scene_id:
-            return ending_type
-    return None
-
-
 def apply_stat_changes(current_stats: Dict[str, int],
                        changes: Optional[Dict[str, int]]) -> Dict[str, int]:
     """Применить изменения статистики
@@ -117,24 +115,84 @@ def format_scene_response(scene_id: str, scene_data: dict) -> SceneResponse:
     Returns:
         SceneResponse для API
     """
-    choices = [
-        Choice(
-            text=choice.get("text", ""),
-            next=choice.get("next", ""),
-            stats=choice.get("stats"),
-            difficulty=choice.get("difficulty")
+    return compile_scene_response(scene_id, scene_data)
+
+
+async def load_player(player_id: str, fresh: bool = True) -> Optional[PlayerState]:
+    """Состояние игрока (вытесненные восстанавливаются из БД)
+
+    Args:
+        player_id: ID игрока
+        fresh: False - для чтения допустимо значение из L1-кэша общего хранилища
+    """
+    previous = players_state.get(player_id) if players_state.sessions is not None else None
+    player = await players_state.load(player_id, fresh=fresh)
+    # Состояние, изменённое другим воркером, требует пересчёта достижений
+    replaced = players_state.sessions is not None and player is not previous
+    if player is not None and (replaced or not achievement_tracker.is_tracking(player_id)):
+        achievement_tracker.restore(player_id, player, player.achievements_unlocked or ())
+    # Восстановленный игрок мог вытеснить других
+    await players_state.spill_pending()
+    return player
+
+
+async def publish_player(player_id: str, player: PlayerState, force: bool = False) -> None:
+    """Записать состояние в общее хранилище сессий вместе с достижениями
+
+    Args:
+        player_id: ID игрока
+        player: Состояние игрока
+        force: Записать поверх изменений других воркеров (новая игра)
+
+    Raises:
+        HTTPException: 409 если игрока изменил параллельный запрос на другом воркере
+    """
+    if players_state.sessions is None:
+        return
+    unlocked = achievement_tracker.get_unlocked(player_id)
+    if unlocked:
+        player.achievements_unlocked = list(unlocked)
+    try:
+        await players_state.publish(player_id, force=force)
+    except StaleStateError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Состояние игры изменено параллельным запросом. Повторите действие."
         )
-        for choice in scene_data.get("choices", [])
-    ]
-
-    return SceneResponse(
-        id=scene_id,
-        title=scene_data.get("title", "Без названия"),
-        text=scene_data.get("text", ""),
-        image=scene_data.get("image", "🎮"),
-        character=scene_data.get("character", "Система"),
-        choices=choices
-    )
+
+
+def get_compiled_scene(scene_id: str) -> Optional[CompiledScene]:
+    """Скомпилированная сцена из текущего снимка контента"""
+    return get_content().scene_graph.get(scene_id)
+
+
+def resolve_transition(graph: SceneGraph, player: PlayerState,
+                       choice_index: int) -> Transition:
+    """Переход по номеру выбора в текущей сцене игрока
+
+    Args:
+        graph: Граф сцен текущего снимка контента
+        player: Состояние игрока
+        choice_index: Номер выбора
+
+    Raises:
+        HTTPException: 400 если такого выбора в сцене нет
+    """
+    current = graph.get(player.current_scene)
+    transition = current.transition(choice_index) if current is not None else None
+    if transition is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Выбор {choice_index} недоступен в сцене '{player.current_scene}'"
+        )
+    return transition
+
+
+def get_scene_response(scene: CompiledScene) -> SceneResponse:
+    """Готовый ответ сцены (или сборка, если сцена не скомпилирована)"""
+    if scene.response is not None:
+        return scene.response
+    return format_scene_response(scene.scene_id, get_content().scenes[scene.scene_id])
 
 
 # ============================================================================
@@ -152,31 +210,34 @@ async def start_game(request: GameStartRequest):
     player_id = request.player_id
 
     # Получаем начальную сцену
-    scene_data = get_scene("start")
-    if not scene_data:
+    scene = get_compiled_scene("start")
+    if scene is None:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Начальная сцена не найдена"
         )
 
     # Инициализируем состояние игрока
-    players_state[player_id] = {
-        "current_scene": "start",
-        "stats": data_service.get_initial_stats(),
-        "relationships": data_service.get_initial_relationships(),
-        "inventory": ["Брекер кодов", "Боевой нож"],
-        "choices_made": 0,
-        "started_at": datetime.now().isoformat(),
-        "visited_scenes": ["start"]
-    }
+    started_at = datetime.now()
+    player = new_game_state(started_at.isoformat())
+    players_state[player_id] = player
+    if game_event_log.record_start(player_id, scene.index, started_at):
+        players_state.mark_dirty(player_id)
 
     logger.info(f"🎮 Игрок {player_id} начал новую игру")
 
+    # Начальная проверка достижений
+    await achievement_tracker.on_change(player_id, player)
+    await publish_player(player_id, player, force=True)
+
+    # Игроки, вытесненные новым, сохраняются в БД
+    await players_state.spill_pending()
+
     return GameStartResponse(
         status="success",
-        scene=format_scene_response("start", scene_data),
-        stats=players_state[player_id]["stats"],
-        relationships=players_state[player_id]["relationships"]
+        scene=get_scene_response(scene),
+        stats=player.stats.to_dict(),
+        relationships=player.relationships.to_dict()
     )
 
 
@@ -186,53 +247,83 @@ async def make_choice(request: GameChoiceRequest):
     """
     Сделать выбор и перейти к следующей сцене.
 
+    С choice_index следующая сцена и изменения статистики берутся
+    из таблицы переходов текущей сцены; иначе - из next_scene и stats.
     Обновляет статистику и возвращает новую сцену.
     """
     player_id = request.player_id
-    next_scene_id = request.next_scene
+
+    if request.choice_index is None and settings.choice_index_only:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Выбор принимается только по choice_index"
+        )
 
     # Проверяем существование игрока
-    if player_id not in players_state:
+    player = await load_player(player_id)
+    if player is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Игрок не найден. Начните новую игру."
         )
 
-    player = players_state[player_id]
-
     # Получаем следующую сцену
-    scene_data = get_scene(next_scene_id)
-    if not scene_data:
+    graph = get_content().scene_graph
+    if request.choice_index is not None:
+        transition = resolve_transition(graph, player, request.choice_index)
+        next_scene_id = transition.next_scene
+        scene = None if transition.target == MISSING_SCENE else graph.nodes[transition.target]
+    else:
+        transition = None
+        # Без choice_index модель требует next_scene
+        next_scene_id = request.next_scene or ""
+        scene = graph.get(next_scene_id)
+    if scene is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Сцена '{next_scene_id}' не найдена"
         )
 
+    # Поля состояния, изменённые выбором (для проверки достижений)
+    changed_fields = []
+
     # Применяем изменения статистики
-    if request.stats:
-        player["stats"] = apply_stat_changes(player["stats"], request.stats)
+    if transition is not None:
+        stats_changed = player.stats.apply_deltas(transition.stats)
+    else:
+        stats_changed = player.stats.apply(request.stats)
+    if stats_changed:
+        changed_fields.append("stats")
 
     # Обновляем состояние игрока
-    player["current_scene"] = next_scene_id
-    player["choices_made"] += 1
-    if next_scene_id not in player.get("visited_scenes", []):
-        player.setdefault("visited_scenes", []).append(next_scene_id)
+    source_index = graph.index.get(player.current_scene, MISSING_SCENE)
+    ending_type = scene.ending_type
+    changed_fields += player.enter_scene(next_scene_id, ending_type)
 
     # Проверяем конец игры
-    game_over, reason = check_game_over(player["stats"])
-    ending_type = get_ending_type(next_scene_id) if is_ending_scene(next_scene_id) else None
+    game_over, reason = check_game_over(player.stats)
 
     if game_over:
         logger.info(f"💀 Игрок {player_id} проиграл: {reason}")
     elif ending_type:
         logger.info(f"🏆 Игрок {player_id} достиг концовки: {ending_type}")
 
+    if changed_fields:
+        await achievement_tracker.on_change(player_id, player, changed_fields)
+    # До записи в журнал: отклонённый выбор не должен попасть в историю
+    await publish_player(player_id, player)
+
+    snapshot_due = game_event_log.record_choice(player_id, source_index, request.choice_index)
+    players_state.record_change(player_id, dirty=snapshot_due)
+
+    await players_state.spill_pending()
+
     return GameChoiceResponse(
         status="success",
-        scene=format_scene_response(next_scene_id, scene_data),
-        stats=player["stats"],
-        relationships=player["relationships"],
-        choices_made=player["choices_made"],
+        scene=get_scene_response(scene),
+        stats=player.stats.to_dict(),
+        relationships=player.relationships.to_dict(),
+        choices_made=player.choices_made,
         game_over=game_over or bool(ending_type),
         ending_type=ending_type
     )
@@ -244,39 +335,46 @@ async def get_player_stats(player_id: str):
     """
     Получить текущую статистику и состояние игрока.
     """
-    if player_id not in players_state:
+    player = await load_player(player_id, fresh=False)
+    if player is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Игрок не найден"
         )
 
-    player = players_state[player_id]
-    game_over, _ = check_game_over(player["stats"])
+    game_over, _ = check_game_over(player.stats)
+    analysis = get_content().scene_analysis
 
     return PlayerStatsResponse(
-        current_scene=player["current_scene"],
-        stats=player["stats"],
-        relationships=player["relationships"],
-        inventory=player.get("inventory", []),
-        choices_made=player["choices_made"],
-        game_over=game_over
+        current_scene=player.current_scene,
+        stats=player.stats.to_dict(),
+        relationships=player.relationships.to_dict(),
+        inventory=list(player.inventory),
+        choices_made=player.choices_made,
+        game_over=game_over,
+        reachable_endings=[] if game_over else analysis.reachable_endings(player.current_scene)
     )
 
 
 @router.get("/scene/{scene_id}", response_model=SceneResponse,
             summary="Получить сцену")
-async def get_scene_by_id(scene_id: str):
+async def get_scene_by_id(scene_id: str) -> Response:
     """
     Получить данные конкретной сцены по ID.
     """
-    scene_data = get_scene(scene_id)
-    if not scene_data:
+    content = get_content()
+    scene = content.scene_graph.get(scene_id)
+    if scene is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Сцена '{scene_id}' не найдена"
         )
 
-    return format_scene_response(scene_id, scene_data)
+    payload = get_payload(
+        content, f"scene:{scene_id}",
+        lambda: get_scene_response(scene).model_dump(mode="json")
+    )
+    return payload_response(payload)
 
 
 @router.delete("/player/{player_id}",
@@ -285,13 +383,13 @@ async def delete_player(player_id: str):
     """
     Удалить данные игрока (сбросить прогресс).
     """
-    if player_id not in players_state:
+    if not await players_state.delete(player_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Игрок не найден"
         )
 
-    del players_state[player_id]
+    achievement_tracker.forget(player_id)
     logger.info(f"🗑️ Данные игрока {player_id} удалены")
 
     return {"status": "success", "message": "Прогресс игрока удалён"}
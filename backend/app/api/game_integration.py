@@ -39,7 +39,8 @@ async def get_player_state(
 ):
     """Получить полное состояние игрока со всеми механиками"""
     try:
-        state = integration.get_player_state(player_id)
+        async with integration.use_player(player_id):
+            state = integration.get_player_state(player_id)
         return {
             "status": "success",
             "data": state
@@ -56,7 +57,8 @@ async def craft_item(
 ):
     """Выполнить крафт для игрока"""
     try:
-        result = integration.craft_item(request.player_id, request.recipe_id)
+        async with integration.use_player(request.player_id):
+            result = integration.craft_item(request.player_id, request.recipe_id)
         
         if not result.get('success'):
             raise HTTPException(status_code=400, detail=result.get('error'))
@@ -79,11 +81,12 @@ async def start_combat(
 ):
     """Начать бой для игрока"""
     try:
-        result = integration.start_combat(
-            request.player_id,
-            request.enemy_name,
-            request.enemy_level
-        )
+        async with integration.use_player(request.player_id):
+            result = integration.start_combat(
+                request.player_id,
+                request.enemy_name,
+                request.enemy_level
+            )
         
         return {
             "status": "success",
@@ -0,0 +1,143 @@
+"""
+StarCourier Web - Lazy Routers
+Отложенный импорт редко используемых роутеров
+
+Роутер регистрируется заглушкой, которая совпадает со своим префиксом.
+Первый запрос к префиксу импортирует модуль, подключает его роутер
+к приложению обычным include_router, убирает заглушку и передаёт
+запрос дальше. LazyFastAPI перед генерацией OpenAPI подгружает все
+отложенные роутеры, чтобы документация оставалась полной.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import importlib
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, List, Optional, Union
+
+from fastapi import FastAPI
+from starlette.routing import BaseRoute, Match, NoMatchFound
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Теги OpenAPI (как в FastAPI.include_router)
+Tags = List[Union[str, Enum]]
+
+
+class LazyRouterRoute(BaseRoute):
+    """
+    Заглушка роутера, импортируемого при первом запросе
+
+    Args:
+        app: Приложение FastAPI
+        module_name: Модуль с атрибутом router
+        prefix: Префикс путей роутера
+        tags: Теги OpenAPI
+    """
+
+    def __init__(self, app: FastAPI, module_name: str, prefix: str,
+                 tags: Optional[Tags] = None) -> None:
+        self.app = app
+        self.module_name = module_name
+        self.prefix = prefix.rstrip("/")
+        self.tags: Tags = tags or []
+        self.loaded = False
+        self.import_ms: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def matches(self, scope: Scope) -> tuple:
+        if scope["type"] not in ("http", "websocket"):
+            return Match.NONE, {}
+        path = scope["path"]
+        if path == self.prefix or path.startswith(self.prefix + "/"):
+            return Match.FULL, {}
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, /, **path_params: Any) -> Any:
+        raise NoMatchFound(name, path_params)
+
+    def load(self) -> None:
+        """Импортировать модуль и подключить его роутер"""
+        with self._lock:
+            if self.loaded:
+                return
+
+            started = time.perf_counter()
+            module = importlib.import_module(self.module_name)
+            self.import_ms = round((time.perf_counter() - started) * 1000, 1)
+
+            self.app.include_router(module.router, prefix=self.prefix, tags=self.tags)
+            routes = self.app.router.routes
+            if self in routes:
+                routes.remove(self)
+            # Схема OpenAPI строится заново с новыми маршрутами
+            self.app.openapi_schema = None
+            self.loaded = True
+
+        logger.info(f"📥 Роутер {self.module_name} загружен по запросу ({self.import_ms} мс)")
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.load()
+        await self.app.router(scope, receive, send)
+
+
+class LazyFastAPI(FastAPI):
+    """Приложение, подгружающее отложенные роутеры перед построением OpenAPI"""
+
+    def openapi(self) -> Dict[str, Any]:
+        load_lazy_routers(self)
+        return super().openapi()
+
+
+def include_lazy_router(app: FastAPI, module_name: str, prefix: str,
+                        tags: Optional[Tags] = None, lazy: bool = True) -> None:
+    """
+    Подключить роутер с отложенным импортом
+
+    Args:
+        app: Приложение (LazyFastAPI - чтобы роутер попал в OpenAPI)
+        module_name: Модуль с атрибутом router
+        prefix: Префикс путей
+        tags: Теги OpenAPI
+        lazy: False — импортировать и подключить сразу
+    """
+    if not lazy:
+        module = importlib.import_module(module_name)
+        app.include_router(module.router, prefix=prefix, tags=tags)
+        return
+
+    route = LazyRouterRoute(app, module_name, prefix, tags)
+    app.router.routes.append(route)
+
+    if not hasattr(app.state, "lazy_routers"):
+        app.state.lazy_routers = []
+    app.state.lazy_routers.append(route)
+
+
+def lazy_routers(app: FastAPI) -> List[LazyRouterRoute]:
+    """Все отложенные роутеры приложения"""
+    return list(getattr(app.state, "lazy_routers", []))
+
+
+def load_lazy_routers(app: FastAPI) -> None:
+    """Загрузить все отложенные роутеры"""
+    for route in lazy_routers(app):
+        route.load()
+
+
+def get_lazy_router_status(app: FastAPI) -> List[Dict[str, Any]]:
+    """Состояние отложенных роутеров для диагностики"""
+    return [
+        {
+            "module": route.module_name,
+            "prefix": route.prefix,
+            "loaded": route.loaded,
+            "import_ms": route.import_ms,
+        }
+        for route in lazy_routers(app)
+    ]
@@ -14,6 +14,7 @@ from pathlib import Path
 from fastapi import APIRouter, Query
 
 from app.models.auth import LeaderboardEntry
+from app.services.content_store import content_store
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +27,7 @@ USERS_FILE: Path = DATA_DIR / "users.json"
 
 
 def _load_json(filepath: Path) -> dict:
-    """Загрузка JSON файла
+    """Загрузка JSON файла (перечитывается только при изменении)
     
     Args:
         filepath: Путь к JSON файлу
@@ -34,14 +35,7 @@ def _load_json(filepath: Path) -> dict:
     Returns:
         dict: Данные из файла или пустой словарь
     """
-    if not filepath.exists():
-        return {}
-    try:
-        import json
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception:
-        return {}
+    return content_store.read_runtime_json(filepath)
 
 
 # ============================================================================
@@ -7,34 +7,23 @@ API endpoints для системы квестов
 """
 
 import logging
-import json
-from typing import Dict, List, Optional
-from pathlib import Path
+from typing import Dict, List, Mapping, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 
 from app.services.auth_service import get_current_user
+from app.services.content_store import get_content
+from app.services.search_index import DEFAULT_SEARCH_LIMIT
 from app.database.models import User
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Путь к файлу с данными
-DATA_FILE = Path(__file__).parent.parent / "data" / "quests.json"
 
-
-def load_quests_data() -> dict:
-    """Загрузить данные о квестах из JSON"""
-    try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        logger.error("Quests data file not found")
-        return {}
-    except json.JSONDecodeError as e:
-        logger.error(f"Error parsing quests JSON: {e}")
-        return {}
+def load_quests_data() -> Mapping:
+    """Получить данные о квестах из хранилища контента"""
+    return get_content().quests
 
 
 @router.get("", response_model=Dict, summary="Получить все квесты")
@@ -170,40 +159,19 @@ async def get_quest(quest_id: str):
 @router.get("/search", response_model=List[Dict], summary="Поиск квестов")
 async def search_quests(
     query: str = Query(..., min_length=2),
-    chapter: Optional[int] = Query(None, ge=1, le=18)
+    chapter: Optional[int] = Query(None, ge=1, le=18),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=200)
 ):
     """
     Поиск квестов по названию или описанию.
     
+    Результаты отсортированы по релевантности: совпадения в названии выше.
+    
     - **query**: Поисковый запрос (минимум 2 символа)
     - **chapter**: Опционально, ограничить поиск конкретной главой
+    - **limit**: Максимум результатов
     """
-    data = load_quests_data()
-    results = []
-    query_lower = query.lower()
-    
-    for quest_id, quest in data.items():
-        if quest_id == "metadata":
-            continue
-        
-        # Фильтр по главе
-        if chapter and quest.get("chapter") != chapter:
-            continue
-        
-        name = quest.get("name", "").lower()
-        description = quest.get("description", "").lower()
-        
-        if query_lower in name or query_lower in description:
-            results.append({
-                "id": quest.get("id"),
-                "quest_id": quest_id,
-                "name": quest.get("name"),
-                "description": quest.get("description"),
-                "chapter": quest.get("chapter"),
-                "type": quest.get("type")
-            })
-    
-    return results
+    return get_content().quest_search.search(query, limit=limit, group=chapter)
 
 
 @router.get("/available", response_model=List[Dict], summary="Доступные квесты для игрока")
@@ -222,36 +190,12 @@ async def get_available_quests(
     - **path**: Выбранный путь (alliance/observer/independence)
     - **character_level**: Уровень персонажа (1-100)
     """
-    data = load_quests_data()
+    graph = get_content().quest_graph
     completed_quests_list = completed_quests.split(",") if completed_quests else []
     available = []
     
-    for quest_id, quest in data.items():
-        if quest_id == "metadata":
-            continue
-        
-        # Проверка главы
-        if quest.get("chapter") != current_chapter:
-            continue
-        
-        # Проверка пути
-        quest_path = quest.get("path")
-        if quest_path and path != quest_path:
-            continue
-        
-        # Проверка требуемых квестов
-        requires = quest.get("requires", [])
-        if isinstance(requires, str):
-            requires = [requires]
-        
-        if requires and not all(rq in completed_quests_list for rq in requires):
-            continue
-        
-        # Проверка уровня
-        level_req = quest.get("level_required", 1)
-        if character_level < level_req:
-            continue
-        
+    for quest_id in graph.available(current_chapter, completed_quests_list, path, character_level):
+        quest = graph.quests[quest_id]
         available.append({
             "id": quest.get("id"),
             "quest_id": quest_id,
@@ -358,9 +302,11 @@ async def get_quest_tree(quest_id: str):
     Получить дерево зависимостей квеста.
     
     Показывает, какие квесты требуются для этого квеста
-    и какие квесты разблокируются после его завершения.
+    (напрямую и транзитивно) и какие квесты разблокируются
+    после его завершения.
     """
-    data = load_quests_data()
+    content = get_content()
+    data = content.quests
     
     if quest_id not in data:
         raise HTTPException(
@@ -369,27 +315,21 @@ async def get_quest_tree(quest_id: str):
         )
     
     quest = data[quest_id]
+    graph = content.quest_graph
     
-    # Поиск квестов, которые требуют этот квест
     unlocks = []
-    for qid, q in data.items():
-        if qid == "metadata":
-            continue
-        
-        requires = q.get("requires", [])
-        if isinstance(requires, str):
-            requires = [requires]
-        
-        if quest_id in requires:
-            unlocks.append({
-                "id": q.get("id"),
-                "quest_id": qid,
-                "name": q.get("name")
-            })
+    for qid in graph.unlocks(quest_id):
+        q = graph.quests[qid]
+        unlocks.append({
+            "id": q.get("id"),
+            "quest_id": qid,
+            "name": q.get("name")
+        })
     
     return {
         "quest_id": quest_id,
         "name": quest.get("name"),
         "requires": quest.get("requires", []),
+        "all_requires": graph.prerequisites(quest_id),
         "unlocks": unlocks
     }
@@ -9,9 +9,10 @@ API endpoints для сцен (отладочные)
 import logging
 from typing import Dict
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Response, status
 
-from app.services.data_service import data_service
+from app.services.content_store import get_content
+from app.services.payload_cache import get_payload, payload_response
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +21,7 @@ router = APIRouter()
 
 @router.get("", response_model=Dict[str, str],
             summary="Получить список всех сцен")
-async def list_scenes() -> Dict[str, str]:
+async def list_scenes() -> Response:
     """
     Получить список всех сцен игры (только ID и названия).
 
@@ -29,7 +30,8 @@ async def list_scenes() -> Dict[str, str]:
     Returns:
         Dict[str, str]: Словарь {scene_id: scene_title}
     """
-    return data_service.get_scene_list()
+    content = get_content()
+    return payload_response(get_payload(content, "scenes", lambda: content.scene_titles))
 
 
 @router.get("/count",
@@ -41,9 +43,41 @@ async def get_scenes_count() -> Dict[str, int]:
     Returns:
         Dict с ключами total (всего сцен) и endings (количество финалов)
     """
-    scenes: Dict[str, dict] = data_service.get_scenes()
+    content = get_content()
     return {
-        "total": len(scenes),
-        "endings": sum(1 for s in scenes.values()
-                       if "конец" in s.get("title", "").lower())
+        "total": len(content.scenes),
+        "endings": content.endings_count
     }
+
+
+@router.get("/analysis",
+            summary="Анализ графа сцен")
+async def get_scenes_analysis() -> Response:
+    """
+    Статический анализ графа сцен, вычисленный при загрузке контента.
+
+    Returns:
+        Недостижимые сцены, переходы в отсутствующие сцены, тупики
+        и число сцен, из которых достижима каждая концовка
+    """
+    content = get_content()
+    return payload_response(
+        get_payload(content, "scenes:analysis", content.scene_analysis.summary)
+    )
+
+
+@router.get("/{scene_id}/analysis",
+            summary="Анализ сцены")
+async def get_scene_analysis(scene_id: str) -> Response:
+    """
+    Достижимость сцены, концовки, которые ещё можно получить из неё,
+    и границы характеристик игрока при входе в сцену.
+    """
+    content = get_content()
+    report = content.scene_analysis.scene_report(scene_id)
+    if report is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Сцена '{scene_id}' не найдена"
+        )
+    return payload_response(get_payload(content, f"scene:analysis:{scene_id}", lambda: report))
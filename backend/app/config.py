@@ -73,6 +73,34 @@ class Settings(BaseSettings):
     cache_type: str = "memory"  # redis, memory
     redis_url: str = "redis://localhost:6379/0"
     cache_ttl: int = 300  # Time to live в секундах
+    cache_max_size: int = 1000  # Записей в in-memory кэше
+    cache_sweep_interval: float = 1.0  # Период фоновой очистки истёкших записей, секунды (0 - выкл)
+    cache_sweep_batch: int = 1000  # Максимум записей, удаляемых за один шаг очистки
+    cache_ttl_jitter: float = 0.0  # Разброс TTL в долях (0.1 = ±10%), чтобы ключи не истекали разом
+    cache_stale_ttl: int = 0  # Окно stale-while-revalidate для get_or_set/@cached, секунды (0 - выкл)
+    cache_early_refresh_beta: float = 0.0  # Коэффициент раннего обновления XFetch (1.0 - стандарт, 0 - выкл)
+    cache_l1_size: int = 10000  # Ключей в L1 воркера перед Redis (0 - без L1)
+    cache_l1_ttl: int = 5  # Время жизни записи L1, секунды
+    cache_invalidation_channel: str = "sc:cache:invalidate"  # Канал pub/sub инвалидаций L1
+    
+    # ========================
+    # CONTENT SETTINGS
+    # ========================
+    
+    content_watch_enabled: bool = True  # Горячая перезагрузка app/data/*.json
+    content_watch_interval: float = 2.0  # Интервал опроса файлов в секундах
+    fast_json_enabled: bool = False  # orjson для предсериализованных ответов (если установлен)
+    etag_enabled: bool = True  # ETag / If-None-Match для эндпоинтов контента
+    content_cache_control: str = "public, max-age=0, must-revalidate"
+    content_bundle_enabled: bool = True  # Загрузка из app/data/content.bundle, если он актуален
+    content_preload_enabled: bool = False  # Загрузка контента при импорте (gunicorn --preload)
+    
+    # ========================
+    # STARTUP SETTINGS
+    # ========================
+    
+    lazy_routers_enabled: bool = True  # Импорт admin/data роутеров при первом запросе
+    import_report_enabled: bool = True  # Замер импортов при старте (/health/startup)
     
     # ========================
     # AUTHENTICATION SETTINGS
@@ -111,9 +139,24 @@ class Settings(BaseSettings):
     
     max_active_games: int = 1000
     session_timeout: int = 60  # минуты
+    choice_index_only: bool = False  # Принимать выбор только по choice_index (без next_scene/stats от клиента)
+    max_player_state_memory_mb: int = 0  # Оценка памяти состояний игроков, 0 - без ограничения
+    player_state_spill_enabled: bool = True  # Сохранять вытесненных игроков в PlayerStats
     save_progress_to_db: bool = False
     auto_save_enabled: bool = False
     auto_save_interval: int = 5  # минуты
+    auto_save_batch_size: int = 100  # Изменённых игроков до внеочередного сохранения
+    game_event_log_enabled: bool = False  # Журнал событий /start и /choose со снимками состояния
+    game_snapshot_interval: int = 20  # Событий игрока между снимками состояния
+    game_event_flush_interval: float = 1.0  # Период записи журнала событий, секунды
+    game_event_batch_size: int = 500  # Событий в буфере до внеочередной записи журнала
+    simulation_max_runs: int = 1000000  # Максимум прохождений в одной симуляции (admin)
+    simulation_batch_size: int = 100000  # Прохождений в одной партии симуляции
+    session_store_backend: str = "memory"  # memory, sqlite, redis (общее хранилище сессий воркеров)
+    session_store_url: str = ""  # Пути (sqlite) или адреса (redis) узлов через запятую
+    session_ring_replicas: int = 100  # Виртуальных точек узла на кольце консистентного хеширования
+    session_l1_size: int = 1000  # Горячих ключей в L1-кэше воркера (0 - без L1)
+    session_l1_ttl: float = 1.0  # Время жизни записи L1, секунды (допустимое отставание чтений)
     
     # ========================
     # EXTERNAL APIs
@@ -9,7 +9,7 @@ SQLAlchemy модели для базы данных
 from datetime import datetime
 from typing import Optional, List
 from sqlalchemy import (
-    Column, String, Integer, Boolean, DateTime, Text, JSON, ForeignKey, Index
+    Column, String, Integer, SmallInteger, Boolean, DateTime, Text, JSON, ForeignKey, Index
 )
 from sqlalchemy.orm import relationship, DeclarativeBase
 from sqlalchemy.ext.declarative import declared_attr
@@ -228,6 +228,39 @@ class AnalyticsEvent(Base):
         return f"<AnalyticsEvent(id={self.id}, type={self.event_type}, name={self.event_name})>"
 
 
+# Типы событий GameEvent
+GAME_EVENT_START = 0
+GAME_EVENT_CHOICE = 1
+
+
+class GameEvent(Base):
+    """
+    Журнал событий игр /api/game (только добавление)
+
+    Компактная запись: сцена и выбор хранятся индексами графа сцен,
+    по ним состояние игрока восстанавливается повтором событий
+    после последнего снимка в PlayerStats.
+    """
+    __tablename__ = "game_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    player_id = Column(String(36), nullable=False)
+
+    kind = Column(SmallInteger, nullable=False)  # 0 - начало игры, 1 - выбор
+    scene = Column(Integer, nullable=False)  # Индекс сцены, в которой сделан выбор
+    choice = Column(SmallInteger, nullable=False)  # Номер выбора, -1 - без номера
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Индексы
+    __table_args__ = (
+        Index('ix_game_events_player_id', player_id, id),
+    )
+
+    def __repr__(self):
+        return f"<GameEvent(id={self.id}, player_id={self.player_id}, kind={self.kind})>"
+
+
 class RateLimitEntry(Base):
     """Записи для rate limiting"""
     __tablename__ = "rate_limits"
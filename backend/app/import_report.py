@@ -0,0 +1,161 @@
+"""
+StarCourier Web - Import Report
+Отчёт о времени импорта модулей при старте приложения
+
+Аналог `python -X importtime`, доступный изнутри процесса: на время
+импорта приложения в sys.meta_path ставится finder, который оборачивает
+загрузчики модулей и замеряет собственное и накопленное время каждого
+импорта. Отчёт пишется в лог при старте и отдаётся /health/startup.
+
+Модуль не зависит от остального приложения и импортируется первым,
+до конфигурации: флаг замера читается прямо из окружения
+(SC_IMPORT_REPORT_ENABLED), поэтому pydantic и настройки тоже
+попадают в отчёт.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import importlib.abc
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+# Сколько самых медленных модулей попадает в отчёт
+DEFAULT_REPORT_LIMIT = 20
+
+# Переменная окружения флага settings.import_report_enabled
+ENABLED_ENV = "SC_IMPORT_REPORT_ENABLED"
+DISABLED_VALUES = frozenset({"0", "false", "no", "off", "f", "n"})
+
+
+def enabled_in_env() -> bool:
+    """Включён ли замер по окружению (до загрузки настроек; по умолчанию - да)"""
+    return os.environ.get(ENABLED_ENV, "").strip().lower() not in DISABLED_VALUES
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Загрузчик-обёртка, замеряющий выполнение модуля"""
+
+    def __init__(self, loader: Any, report: "ImportReport") -> None:
+        self._loader = loader
+        self._report = report
+
+    def create_module(self, spec: Any) -> Any:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: Any) -> None:
+        self._report._enter()
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._report._leave(module.__name__, time.perf_counter() - started)
+            # Модуль должен видеть свой настоящий загрузчик
+            module.__loader__ = self._loader
+            if module.__spec__ is not None:
+                module.__spec__.loader = self._loader
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Finder, подменяющий загрузчик найденных модулей на замеряющий"""
+
+    def __init__(self, report: "ImportReport") -> None:
+        self._report = report
+
+    def find_spec(self, fullname: str, path: Any = None, target: Any = None) -> Any:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self._report)
+            return spec
+        return None
+
+
+class ImportReport:
+    """
+    Замер импортов
+
+    Для каждого модуля хранится собственное время (без вложенных
+    импортов) и накопленное (вместе с ними), как в -X importtime.
+    """
+
+    def __init__(self) -> None:
+        self._finder = _TimingFinder(self)
+        self._lock = threading.Lock()
+        # Имя модуля -> (собственное время, накопленное время) в секундах
+        self._modules: Dict[str, tuple] = {}
+        # Время вложенных импортов для каждого уровня стека
+        self._stack: List[float] = []
+        self._started: float = 0.0
+        self._total: float = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Идёт ли замер"""
+        return self._finder in sys.meta_path
+
+    def start(self) -> None:
+        """Начать замер"""
+        if self.running:
+            return
+        self._started = time.perf_counter()
+        sys.meta_path.insert(0, self._finder)
+
+    def stop(self) -> None:
+        """Закончить замер"""
+        if not self.running:
+            return
+        sys.meta_path.remove(self._finder)
+        self._total += time.perf_counter() - self._started
+
+    def _enter(self) -> None:
+        with self._lock:
+            self._stack.append(0.0)
+
+    def _leave(self, name: str, elapsed: float) -> None:
+        with self._lock:
+            nested = self._stack.pop() if self._stack else 0.0
+            if self._stack:
+                self._stack[-1] += elapsed
+            self._modules[name] = (elapsed - nested, elapsed)
+
+    def summary(self, limit: int = DEFAULT_REPORT_LIMIT) -> Dict[str, Any]:
+        """
+        Сводка замера
+
+        Args:
+            limit: Сколько самых медленных модулей вернуть
+
+        Returns:
+            Общее время, число модулей и самые медленные модули
+            (по накопленному времени)
+        """
+        with self._lock:
+            modules = sorted(self._modules.items(), key=lambda item: item[1][1], reverse=True)
+
+        return {
+            "total_ms": round(self._total * 1000, 1),
+            "modules_count": len(modules),
+            "slowest": [
+                {
+                    "module": name,
+                    "self_ms": round(self_time * 1000, 2),
+                    "cumulative_ms": round(cumulative * 1000, 2),
+                }
+                for name, (self_time, cumulative) in modules[:limit]
+            ],
+        }
+
+
+# Глобальный экземпляр
+import_report = ImportReport()
@@ -6,38 +6,56 @@ StarCourier Web - FastAPI Backend
 Версия: 2.0.0
 """
 
+import gc
 import logging
 from contextlib import asynccontextmanager
 from datetime import datetime
 
+# Замер импортов запускается до импорта остального приложения,
+# включая конфигурацию: флаг читается из окружения
+from app.import_report import enabled_in_env, import_report
+if enabled_in_env():
+    import_report.start()
+
+# Импорт конфигурации
+from app.config import settings
+
+# Замер выключен только в .env - останавливаем его сразу
+if not settings.import_report_enabled:
+    import_report.stop()
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 
-# Импорт конфигурации
-from app.config import settings
-
 # Импорт роутеров
+from app.api.lazy import LazyFastAPI, get_lazy_router_status, include_lazy_router
 from app.api import (
     game, characters, scenes, websocket, auth, leaderboard,
-    achievements, analytics, admin, data, abilities, quests,
+    achievements, analytics, abilities, quests,
     game_mechanics, inventory, combat, game_integration
 )
 
 # Импорт сервисов
 from app.services import data_service
+from app.services.content_store import ContentWatcher, content_store
+from app.services.game_log import game_event_log
+from app.services.player_store import player_store
+from app.services.session_store import session_store
 
 # Импорт базы данных
 from app.database import init_db, close_db
 
 # Импорт middleware
-from app.middleware import RateLimitMiddleware, RequestLoggerMiddleware, SecurityMiddleware
+from app.middleware import (
+    ContentETagMiddleware, RateLimitMiddleware, RequestLoggerMiddleware, SecurityMiddleware
+)
 from app.middleware.rate_limit import RateLimiter, rate_limiter
 from app.middleware.performance import PerformanceMiddleware, metrics
 
 # Импорт кэша
-from app.services.cache_service import init_cache
+from app.services.cache_service import close_cache, init_cache
 
 # Импорт моделей
 from app.models import HealthCheckResponse, ErrorResponse
@@ -45,6 +63,9 @@ from app.models import HealthCheckResponse, ErrorResponse
 # Импорт обработчиков исключений
 from app.exceptions import register_exception_handlers
 
+import_report.stop()
+
+
 # ============================================================================
 # ЛОГИРОВАНИЕ
 # ============================================================================
@@ -56,6 +77,19 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# ============================================================================
+# ПРЕДЗАГРУЗКА КОНТЕНТА
+# ============================================================================
+
+if settings.content_preload_enabled:
+    # gunicorn --preload импортирует приложение в мастере до fork:
+    # снимок контента строится один раз и разделяется воркерами
+    # через copy-on-write. gc.freeze() исключает его из обхода сборщика
+    # мусора, который иначе трогал бы заголовки объектов и копировал страницы.
+    data_service.load_data()
+    gc.freeze()
+
+
 # ============================================================================
 # LIFESPAN
 # ============================================================================
@@ -77,14 +111,37 @@ async def lifespan(app: FastAPI):
     logger.info("⚡ Кэш инициализирован")
 
     # Предзагрузка данных
-    data_service.reload_data()
+    data_service.load_data()
     scenes_count = len(data_service.get_scenes())
     characters_count = len(data_service.get_characters())
     logger.info(f"📊 Загружено: {scenes_count} сцен, {characters_count} персонажей")
 
+    # Горячая перезагрузка контента
+    content_watcher = None
+    if settings.content_watch_enabled:
+        content_watcher = ContentWatcher(content_store, settings.content_watch_interval)
+        content_watcher.start()
+
+    # Отложенное сохранение прогресса игроков и журнал событий
+    player_store.start()
+    game_event_log.start()
+
+    if settings.import_report_enabled:
+        report = import_report.summary(limit=5)
+        slowest = ", ".join(
+            f"{item['module']} {item['cumulative_ms']} мс" for item in report["slowest"]
+        )
+        logger.info(f"⏱️ Импорт приложения: {report['total_ms']} мс ({slowest})")
+
     yield
 
     # Shutdown
+    if content_watcher:
+        await content_watcher.stop()
+    await player_store.close()
+    await game_event_log.close()
+    await session_store.close()
+    await close_cache()
     await close_db()
     logger.info("🛑 Остановка StarCourier Web...")
 
@@ -93,7 +150,7 @@ async def lifespan(app: FastAPI):
 # APP INITIALIZATION
 # ============================================================================
 
-app = FastAPI(
+app = LazyFastAPI(
     title="StarCourier Web API",
     description="""
     🚀 **Интерактивная текстовая RPG в космической тематике**
@@ -137,6 +194,10 @@ app.add_middleware(RateLimitMiddleware, rate_limiter=rate_limiter)
 # Request logger
 app.add_middleware(RequestLoggerMiddleware)
 
+# ETag для статического контента (304 отдаются до логирования и лимитов)
+if settings.etag_enabled:
+    app.add_middleware(ContentETagMiddleware, cache_control=settings.content_cache_control)
+
 # GZip сжатие
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
@@ -169,8 +230,6 @@ app.include_router(scenes.router, prefix="/api/scenes", tags=["📋 Сцены"]
 app.include_router(leaderboard.router, prefix="/api/leaderboard", tags=["🏆 Лидеры"])
 app.include_router(achievements.router, prefix="/api/achievements", tags=["🎖️ Достижения"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["📊 Аналитика"])
-app.include_router(admin.router, prefix="/api/admin", tags=["👑 Администрирование"])
-app.include_router(data.router, prefix="/api/data", tags=["📦 Данные"])
 app.include_router(abilities.router, prefix="/api/abilities", tags=["⚡ Способности"])
 app.include_router(quests.router, prefix="/api/quests", tags=["📜 Квесты"])
 app.include_router(game_mechanics.router, prefix="/api/game-mechanics", tags=["🎮 Игровые механики"])
@@ -179,6 +238,12 @@ app.include_router(combat.router, prefix="/api/combat", tags=["⚔️ Бой"])
 app.include_router(game_integration.router, prefix="/api/game-integration", tags=["🎮 Интеграция"])
 app.include_router(websocket.router, tags=["🔌 WebSocket"])
 
+# Редко используемые роутеры импортируются при первом запросе
+include_lazy_router(app, "app.api.admin", "/api/admin", ["👑 Администрирование"],
+                    lazy=settings.lazy_routers_enabled)
+include_lazy_router(app, "app.api.data", "/api/data", ["📦 Данные"],
+                    lazy=settings.lazy_routers_enabled)
+
 
 # ============================================================================
 # HEALTH CHECK
@@ -220,6 +285,21 @@ async def health_check_detailed():
     return await health_check_service.check_all()
 
 
+@app.get("/health/startup", tags=["🏥 Health"], summary="Диагностика старта")
+async def health_check_startup(limit: int = 20):
+    """
+    Диагностика холодного старта.
+
+    Включает:
+    - Время импорта модулей приложения (как python -X importtime)
+    - Отложенные роутеры и время их загрузки
+    """
+    return {
+        "imports": import_report.summary(limit) if settings.import_report_enabled else None,
+        "lazy_routers": get_lazy_router_status(app),
+    }
+
+
 @app.get("/metrics", tags=["📊 Metrics"], summary="Метрики производительности")
 async def get_metrics():
     """
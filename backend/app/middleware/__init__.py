@@ -6,11 +6,13 @@ StarCourier Web - Middleware Package
 Версия: 1.0.0
 """
 
+from app.middleware.etag import ContentETagMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware, RateLimiter
 from app.middleware.request_logger import RequestLoggerMiddleware
 from app.middleware.security import SecurityMiddleware
 
 __all__ = [
+    "ContentETagMiddleware",
     "RateLimitMiddleware",
     "RateLimiter",
     "RequestLoggerMiddleware",
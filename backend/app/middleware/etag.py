@@ -0,0 +1,108 @@
+"""
+StarCourier Web - Content ETag Middleware
+Условные GET-запросы для статического контента
+
+Ответы эндпоинтов контента зависят только от версии снимка
+и URL, поэтому ETag вычисляется из версии без чтения тела ответа.
+Запрос с совпадающим If-None-Match получает 304 до вызова обработчика.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import logging
+from typing import Callable, Iterable, Tuple
+
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.services.content_store import content_store
+from app.services.payload_cache import use_fast_json
+
+logger = logging.getLogger(__name__)
+
+# Эндпоинты, отдающие только данные из app/data/*.json
+CONTENT_PATH_PREFIXES: Tuple[str, ...] = (
+    "/api/abilities",
+    "/api/quests",
+    "/api/achievements",
+    "/api/scenes",
+    "/api/characters",
+)
+
+# Живое состояние игроков под префиксами контента: версия контента его не описывает
+CONTENT_PATH_EXCLUDES: Tuple[str, ...] = (
+    "/api/achievements/player/",
+)
+
+
+def content_etag() -> str:
+    """Строгий ETag текущей версии контента"""
+    # Энкодер влияет на байты ответа, поэтому входит в тег
+    encoder = "o" if use_fast_json() else "j"
+    return f'"{content_store.version}-{encoder}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Проверить заголовок If-None-Match
+
+    Для If-None-Match используется слабое сравнение: префикс W/ игнорируется.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ContentETagMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware для ETag / If-None-Match на эндпоинтах контента
+
+    Добавляет ETag и Cache-Control к успешным GET/HEAD ответам
+    и отвечает 304 Not Modified, если клиент уже имеет эту версию.
+    """
+
+    def __init__(
+        self,
+        app,
+        cache_control: str = "public, max-age=0, must-revalidate",
+        path_prefixes: Iterable[str] = CONTENT_PATH_PREFIXES,
+        exclude_prefixes: Iterable[str] = CONTENT_PATH_EXCLUDES
+    ) -> None:
+        super().__init__(app)
+        self.cache_control: str = cache_control
+        self.path_prefixes: Tuple[str, ...] = tuple(path_prefixes)
+        self.exclude_prefixes: Tuple[str, ...] = tuple(exclude_prefixes)
+
+    def is_content_path(self, path: str) -> bool:
+        """Зависит ли ответ только от версии контента"""
+        return path.startswith(self.path_prefixes) and not path.startswith(self.exclude_prefixes)
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        """Обработка запроса"""
+        if request.method not in ("GET", "HEAD") or not self.is_content_path(request.url.path):
+            return await call_next(request)
+
+        etag = content_etag()
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(
+                status_code=304,
+                headers={"ETag": etag, "Cache-Control": self.cache_control}
+            )
+
+        response = await call_next(request)
+
+        # Контент мог перезагрузиться во время обработки — тогда тег не ставим
+        if response.status_code == 200 and content_etag() == etag:
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = self.cache_control
+
+        return response
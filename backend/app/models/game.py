@@ -7,7 +7,7 @@ StarCourier Web - Pydantic Models
 """
 
 from typing import Dict, Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
 
 
@@ -61,9 +61,13 @@ class CharacterInfo(BaseModel):
 # GAME REQUEST/RESPONSE MODELS
 # ============================================================================
 
+# Совпадает с длиной колонок player_id (PlayerStats, GameEvent)
+PLAYER_ID_MAX_LENGTH = 36
+
 class GameStartRequest(BaseModel):
     """Модель запроса начала игры"""
-    player_id: str = Field(..., description="Уникальный ID игрока")
+    player_id: str = Field(..., min_length=1, max_length=PLAYER_ID_MAX_LENGTH,
+                           description="Уникальный ID игрока")
 
 
 class GameStartResponse(BaseModel):
@@ -75,11 +79,25 @@ class GameStartResponse(BaseModel):
 
 
 class GameChoiceRequest(BaseModel):
-    """Модель запроса выбора"""
-    player_id: str = Field(..., description="ID игрока")
-    next_scene: str = Field(..., description="ID следующей сцены")
+    """
+    Модель запроса выбора
+
+    Передаётся либо choice_index (сервер сам определяет следующую
+    сцену и изменения статистики), либо next_scene и stats.
+    """
+    player_id: str = Field(..., min_length=1, max_length=PLAYER_ID_MAX_LENGTH,
+                           description="ID игрока")
+    choice_index: Optional[int] = Field(None, ge=0, description="Номер выбора в текущей сцене")
+    next_scene: Optional[str] = Field(None, description="ID следующей сцены")
     stats: Optional[Dict[str, int]] = Field(None, description="Изменение статистики")
 
+    @model_validator(mode="after")
+    def choice_or_scene(self):
+        """Нужен номер выбора или ID следующей сцены"""
+        if self.choice_index is None and not self.next_scene:
+            raise ValueError("Укажите choice_index или next_scene")
+        return self
+
 
 class GameChoiceResponse(BaseModel):
     """Модель ответа на выбор"""
@@ -101,6 +119,7 @@ class PlayerStatsResponse(BaseModel):
     inventory: List[str]
     choices_made: int
     game_over: Optional[bool] = None
+    reachable_endings: Optional[List[str]] = None
 
 
 # ============================================================================
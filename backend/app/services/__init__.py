@@ -1,5 +1,6 @@
 # Services Module
 from .data_service import data_service, get_scenes, get_scene, get_characters, get_character
+from .content_store import content_store, get_content
 
 __all__ = [
     "data_service",
@@ -7,4 +8,6 @@ __all__ = [
     "get_scene",
     "get_characters",
     "get_character",
+    "content_store",
+    "get_content",
 ]
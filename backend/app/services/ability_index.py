@@ -0,0 +1,248 @@
+"""
+StarCourier Web - Ability Index
+Инвертированные индексы способностей
+
+Строятся один раз из abilities.json вместе со снимком контента.
+Каждая способность получает позицию в порядке обхода файла
+(ветка за веткой), поэтому ответы на основе индексов совпадают
+по составу и порядку с полным перебором.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Any, Collection, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Ветка с вложенными способностями путей (alliance/observer/independence)
+PATH_BRANCH = "path"
+
+# Диапазон глав для предрасчёта способностей путей
+CHAPTERS: range = range(1, 19)
+
+
+def _level_of(ability: Mapping[str, Any]) -> Optional[int]:
+    """Требуемый уровень способности (None, если не число)"""
+    level = ability.get("level_required", 1)
+    return level if isinstance(level, int) else None
+
+
+class AbilityIndex:
+    """
+    Индексы способностей
+
+    - id/ключ -> позиции (get)
+    - отсортированные массивы уровней для bisect (by_level, available)
+    - глава -> позиции (by_chapter, available)
+    - квест -> позиции (available)
+    """
+
+    def __init__(self, abilities: Mapping[str, Any]) -> None:
+        # Позиция -> (ветка, ключ, способность)
+        self.entries: List[Tuple[str, str, Mapping[str, Any]]] = []
+        self.branches: Tuple[str, ...] = tuple(
+            name for name, data in abilities.items()
+            if name != "metadata" and isinstance(data, Mapping)
+        )
+
+        ids: Dict[str, List[int]] = defaultdict(list)
+        chapters: Dict[int, List[int]] = defaultdict(list)
+        leveled: List[Tuple[int, int]] = []
+        regular_leveled: List[Tuple[int, int]] = []
+        chapter_free: List[int] = []
+        quest_free: List[int] = []
+        quests: Dict[str, List[int]] = defaultdict(list)
+        requirements: Dict[int, FrozenSet[str]] = {}
+        available_payloads: Dict[int, Mapping[str, Any]] = {}
+        path_start: Optional[int] = None
+
+        for branch_name in self.branches:
+            if branch_name == PATH_BRANCH:
+                path_start = len(self.entries)
+            for key, ability in abilities[branch_name].items():
+                position = len(self.entries)
+                self.entries.append((branch_name, key, ability))
+
+                ids[key].append(position)
+                ability_id = ability.get("id")
+                if ability_id is not None and ability_id != key:
+                    ids[ability_id].append(position)
+
+                level = _level_of(ability)
+                if level is not None:
+                    leveled.append((level, position))
+
+                ability_chapters = ability.get("chapters") or ()
+                for chapter in dict.fromkeys(ability_chapters):
+                    chapters[chapter].append(position)
+
+                if branch_name == PATH_BRANCH:
+                    continue
+
+                # Обычные способности участвуют в /available
+                if level is not None:
+                    regular_leveled.append((level, position))
+                if not ability_chapters:
+                    chapter_free.append(position)
+
+                required = frozenset(
+                    quest for quest in (ability.get("quest_unlock"), ability.get("quest_requirement"))
+                    if quest
+                )
+                if required:
+                    requirements[position] = required
+                    for quest in required:
+                        quests[quest].append(position)
+                else:
+                    quest_free.append(position)
+
+                available_payloads[position] = {
+                    "id": ability.get("id"),
+                    "name": ability.get("name"),
+                    "description": ability.get("description"),
+                    "branch": branch_name,
+                    "level_required": ability.get("level_required", 1)
+                }
+
+        leveled.sort()
+        regular_leveled.sort()
+
+        # Позиция ветки path в порядке файла (без ветки - после всех способностей)
+        self._path_start: int = len(self.entries) if path_start is None else path_start
+
+        self._ids: Dict[str, Tuple[int, ...]] = {k: tuple(v) for k, v in ids.items()}
+        self._levels: List[int] = [level for level, _ in leveled]
+        self._level_positions: List[int] = [position for _, position in leveled]
+        self._regular_levels: List[int] = [level for level, _ in regular_leveled]
+        self._regular_positions: List[int] = [position for _, position in regular_leveled]
+        self._chapters: Dict[int, Tuple[int, ...]] = {k: tuple(v) for k, v in chapters.items()}
+        self._chapter_sets: Dict[int, FrozenSet[int]] = {k: frozenset(v) for k, v in chapters.items()}
+        self._chapter_free: FrozenSet[int] = frozenset(chapter_free)
+        self._quests: Dict[str, FrozenSet[int]] = {k: frozenset(v) for k, v in quests.items()}
+        self._quest_free: FrozenSet[int] = frozenset(quest_free)
+        self._requirements: Dict[int, FrozenSet[str]] = requirements
+        self._available_payloads: Dict[int, Mapping[str, Any]] = available_payloads
+        self._path_unlocks: Dict[Tuple[str, int], Tuple[Mapping[str, Any], ...]] = (
+            self._build_path_unlocks(abilities.get(PATH_BRANCH))
+        )
+
+    @staticmethod
+    def _build_path_unlocks(paths: Any) -> Dict[Tuple[str, int], Tuple[Mapping[str, Any], ...]]:
+        """(путь, глава) -> способности пути, открываемые в главе"""
+        result: Dict[Tuple[str, int], Tuple[Mapping[str, Any], ...]] = {}
+        if not isinstance(paths, Mapping):
+            return result
+
+        for path, abilities in paths.items():
+            if not isinstance(abilities, Mapping):
+                continue
+            for chapter in CHAPTERS:
+                # Сохраняем поведение подстроки: chapter_1 совпадает с chapter_13
+                marker = f"chapter_{chapter}"
+                result[(path, chapter)] = tuple(
+                    {
+                        "id": ability.get("id"),
+                        "name": ability.get("name"),
+                        "description": ability.get("description"),
+                        "branch": PATH_BRANCH,
+                        "path": path
+                    }
+                    for ability in abilities.values()
+                    if path in ability.get("unlock", "") and marker in ability.get("unlock", "").lower()
+                )
+        return result
+
+    def _group_by_branch(self, positions: Collection[int]) -> Dict[str, Dict[str, Mapping[str, Any]]]:
+        """Сгруппировать позиции по веткам в порядке файла"""
+        result: Dict[str, Dict[str, Mapping[str, Any]]] = {}
+        for position in sorted(positions):
+            branch_name, key, ability = self.entries[position]
+            result.setdefault(branch_name, {})[key] = ability
+        return result
+
+    def get(self, ability_id: str, branch: Optional[str] = None) -> Optional[Mapping[str, Any]]:
+        """
+        Найти способность по id или ключу
+
+        Args:
+            ability_id: ID или ключ способности
+            branch: Ограничить поиск веткой
+
+        Returns:
+            Данные способности или None
+        """
+        for position in self._ids.get(ability_id, ()):
+            branch_name, _, ability = self.entries[position]
+            if branch is None or branch_name == branch:
+                return ability
+        return None
+
+    def by_level(self, min_level: int, max_level: int) -> Dict[str, Dict[str, Mapping[str, Any]]]:
+        """Способности с требуемым уровнем в диапазоне, по веткам"""
+        lo = bisect_left(self._levels, min_level)
+        hi = bisect_right(self._levels, max_level)
+        return self._group_by_branch(self._level_positions[lo:hi])
+
+    def by_chapter(self, chapter: int) -> Dict[str, Dict[str, Mapping[str, Any]]]:
+        """Способности главы, по веткам"""
+        return self._group_by_branch(self._chapters.get(chapter, ()))
+
+    def available(self, level: int, chapter: int, completed_quests: Collection[str],
+                  path: Optional[str] = None) -> List[Mapping[str, Any]]:
+        """
+        Способности, доступные персонажу
+
+        Args:
+            level: Уровень персонажа
+            chapter: Текущая глава
+            completed_quests: Завершённые квесты
+            path: Выбранный путь
+
+        Returns:
+            Список кратких описаний способностей в порядке файла
+        """
+        completed = frozenset(completed_quests)
+
+        eligible = set(self._regular_positions[:bisect_right(self._regular_levels, level)])
+        eligible &= self._chapter_free | self._chapter_sets.get(chapter, frozenset())
+
+        quest_ok = set(self._quest_free)
+        for quest in completed:
+            quest_ok.update(
+                position for position in self._quests.get(quest, ())
+                if self._requirements[position] <= completed
+            )
+        eligible &= quest_ok
+
+        result: List[Mapping[str, Any]] = []
+        path_abilities = self._path_unlocks.get((path, chapter), ()) if path else ()
+        path_added = False
+
+        for position in sorted(eligible):
+            # Способности пути выводятся на месте ветки path
+            if path_abilities and not path_added and position >= self._path_start:
+                result.extend(path_abilities)
+                path_added = True
+            result.append(self._available_payloads[position])
+
+        if path_abilities and not path_added:
+            result.extend(path_abilities)
+
+        return result
+
+
+def build_ability_index(abilities: Mapping[str, Any]) -> AbilityIndex:
+    """
+    Построить индекс способностей
+
+    Args:
+        abilities: Данные abilities.json
+
+    Returns:
+        AbilityIndex
+    """
+    return AbilityIndex(abilities)
@@ -0,0 +1,409 @@
+"""
+StarCourier Web - Achievement Rules
+Скомпилированные правила достижений
+
+Требования из achievements.json один раз превращаются в объекты-предикаты.
+Каждое правило знает, какие поля данных игрока оно читает; правила
+сгруппированы по этим полям. При проверке вычисляются только группы
+полей, присутствующих в данных игрока, а для остальных правил берётся
+заранее посчитанный результат на значениях по умолчанию.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AbstractSet, Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Количество сцен для all_scenes_visited (упрощённая проверка)
+ALL_SCENES_COUNT = 58
+
+# Поля данных игрока, которые читают правила
+FIELD_VISITED_SCENES = "visited_scenes"
+FIELD_DECISION_PATTERNS = "decision_patterns"
+FIELD_STATS = "stats"
+FIELD_RELATIONSHIPS = "relationships"
+FIELD_ENDING_TYPE = "ending_type"
+FIELD_PLAYTIME = "playtime_minutes"
+FIELD_GAMES_COMPLETED = "games_completed"
+
+# Результат правила: (разблокировано, текущий прогресс, максимум)
+RuleResult = Tuple[bool, Any, Any]
+
+
+def get_rarity(points: int) -> str:
+    """Определение редкости по очкам"""
+    if points <= 30:
+        return "common"
+    elif points <= 50:
+        return "uncommon"
+    elif points <= 75:
+        return "rare"
+    elif points <= 100:
+        return "epic"
+    else:
+        return "legendary"
+
+
+def count_visited(player: Mapping[str, Any]) -> int:
+    """Число различных посещённых сцен (битовое множество считается без копирования)"""
+    visited = player.get(FIELD_VISITED_SCENES, [])
+    if isinstance(visited, AbstractSet):
+        return len(visited)
+    return len(set(visited))
+
+
+# ============================================================================
+# RULES
+# ============================================================================
+
+class Rule:
+    """Базовое правило: неизвестный тип требования никогда не выполняется"""
+
+    fields: FrozenSet[str] = frozenset()
+
+    def __init__(self, requirement: Mapping[str, Any]) -> None:
+        self.requirement = requirement
+
+    def evaluate(self, player: Mapping[str, Any]) -> RuleResult:
+        return False, 0, 1
+
+
+class ScenesVisitedRule(Rule):
+    fields = frozenset({FIELD_VISITED_SCENES})
+
+    def __init__(self, requirement: Mapping[str, Any]) -> None:
+        super().__init__(requirement)
+        self.required = requirement.get("count", 1)
+
+    def evaluate(self, player: Mapping[str, Any]) -> RuleResult:
+        visited = count_visited(player)
+        return visited >= self.required, visited, self.required
+
+
+class AllScenesVisitedRule(Rule):
+    fields = frozenset({FIELD_VISITED_SCENES})
+
+    def evaluate(self, player: Mapping[str, Any]) -> RuleResult:
+        visited = count_visited(player)
+        return visited >= ALL_SCENES_COUNT, visited, ALL_SCENES_COUNT
+
+
+class ChoicePatternRule(Rule):
+    fields = frozenset({FIELD_DECISION_PATTERNS})
+
+    def __init__(self, requirement: Mapping[str, Any]) -> None:
+        super().__init__(requirement)
+        self.pattern = requirement.get("pattern", "")
+        self.required = requirement.get("count", 1)
+
+    def evaluate(self, player: Mapping[str, Any]) -> RuleResult:
+        current = player.get(FIELD_DECISION_PATTERNS, {}).get(self.pattern, 0)
+        return current >= self.required, current, self.required
+
+
+class FinalStatRule(Rule):
+    fields = frozenset({FIELD_STATS})
+
+    def __init__(self, requirement: Mapping[str, Any]) -> None:
+        super().__init__(requirement)
+        self.stat = requirement.get("stat", "")
+        self.min_val = requirement.get("min", 0)
+        self.max_val = requirement.get("max", 100)
+
+    def evaluate(self, player: Mapping[str, Any]) -> RuleResult:
+        value = player.get(FIELD_STATS, {}).get(self.stat, 0)
+        unlocked = False
+        if self.min_val > 0:
+            unlocked = value >= self.min_val
+        elif self.max_val < 100:
+            unlocked = value <= self.max_val and value > 0
+        return unlocked, value, 100
+
+
+class StatMaxedRule(Rule):
+    fields = frozenset({FIELD_STATS})
+
+    def __init__(self, requirement: Mapping[str, Any]) -> None:
+        super().__init__(requirement)
+        self.stat = requirement.get("stat", "")
+
+    def evaluate(self, player: Mapping[str, Any]) -> RuleResult:
+        value = player.get(FIELD_STATS, {}).get(self.stat, 0)
+        return value >= 100, value, 100
+
+
+class StatThresholdRule(Rule):
+    fields = frozenset({FIELD_STATS})
+
+    def __init__(self, requirement: Mapping[str, Any]) -> None:
+        super().__init__(requirement)
+        self.stat = requirement.get("stat", "")
+        self.min_val = requirement.get("min", 0)
+
+    def evaluate(self, player: Mapping[str, Any]) -> RuleResult:
+        value = player.get(FIELD_STATS, {}).get(self.stat, 0)
+        return value >= self.min_val, value, self.min_val
+
+
+class RelationshipMaxRule(Rule):
+    fields = frozenset({FIELD_RELATIONSHIPS})
+
+    def __init__(self, requirement: Mapping[str, Any]) -> None:
+        super().__init__(requirement)
+        self.character = requirement.get("character", "")
+
+    def evaluate(self, player: Mapping[str, Any]) -> RuleResult:
+        value = player.get(FIELD_RELATIONSHIPS, {}).get(self.character, 0)
+        return value >= 100, value, 100
+
+
+class EndingRule(Rule):
+    fields = frozenset({FIELD_ENDING_TYPE})
+
+    def __init__(self, requirement: Mapping[str, Any]) -> None:
+        super().__init__(requirement)
+        # Часть требований задаёт концовку через ending_id
+        self.ending = requirement.get("ending") or requirement.get("ending_id", "")
+
+    def evaluate(self, player: Mapping[str, Any]) -> RuleResult:
+        ending = player.get(FIELD_ENDING_TYPE, "")
+        return bool(ending) and ending == self.ending, 0, 1
+
+
+class PlaytimeRule(Rule):
+    fields = frozenset({FIELD_PLAYTIME})
+
+    def __init__(self, requirement: Mapping[str, Any]) -> None:
+        super().__init__(requirement)
+        self.max_minutes = requirement.get("max_minutes", 999)
+
+    def evaluate(self, player: Mapping[str, Any]) -> RuleResult:
+        playtime = player.get(FIELD_PLAYTIME, 0)
+        return playtime <= self.max_minutes and playtime > 0, playtime, self.max_minutes
+
+
+class NoPatternRule(Rule):
+    fields = frozenset({FIELD_DECISION_PATTERNS, FIELD_GAMES_COMPLETED})
+
+    def __init__(self, requirement: Mapping[str, Any]) -> None:
+        super().__init__(requirement)
+        self.pattern = requirement.get("pattern", "")
+
+    def evaluate(self, player: Mapping[str, Any]) -> RuleResult:
+        unlocked = (
+            player.get(FIELD_DECISION_PATTERNS, {}).get(self.pattern, 0) == 0
+            and player.get(FIELD_GAMES_COMPLETED, 0) > 0
+        )
+        return unlocked, 0, 1
+
+
+class GamesCompletedRule(Rule):
+    fields = frozenset({FIELD_GAMES_COMPLETED})
+
+    def __init__(self, requirement: Mapping[str, Any]) -> None:
+        super().__init__(requirement)
+        self.required = requirement.get("count", 1)
+
+    def evaluate(self, player: Mapping[str, Any]) -> RuleResult:
+        completed = player.get(FIELD_GAMES_COMPLETED, 0)
+        return completed >= self.required, completed, self.required
+
+
+# Тип требования -> класс правила
+RULE_TYPES: Dict[str, type] = {
+    "scenes_visited": ScenesVisitedRule,
+    "all_scenes_visited": AllScenesVisitedRule,
+    "choice_pattern": ChoicePatternRule,
+    "final_stat": FinalStatRule,
+    "stat_maxed": StatMaxedRule,
+    "stat_threshold": StatThresholdRule,
+    "relationship_max": RelationshipMaxRule,
+    "ending": EndingRule,
+    "playtime": PlaytimeRule,
+    "no_pattern": NoPatternRule,
+    "games_completed": GamesCompletedRule,
+}
+
+
+def compile_rule(requirement: Mapping[str, Any]) -> Rule:
+    """Скомпилировать требование достижения в правило"""
+    rule_type = requirement.get("type")
+    rule_class = RULE_TYPES.get(rule_type, Rule) if isinstance(rule_type, str) else Rule
+    return rule_class(requirement)
+
+
+def progress_entry(current: Any, maximum: Any) -> Dict[str, Any]:
+    """Запись прогресса для ответа API"""
+    return {
+        "current": current,
+        "max": maximum,
+        "percentage": min(100, (current / maximum * 100)) if maximum > 0 else 0
+    }
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+@dataclass(frozen=True)
+class CompiledAchievement:
+    """Достижение с правилом и готовыми данными для ответа"""
+    achievement_id: str
+    rule: Rule
+    points: int
+    info: Mapping[str, Any]
+    default_result: Optional[RuleResult]
+
+
+class AchievementRuleEngine:
+    """
+    Движок правил достижений
+
+    groups: поле данных игрока -> индексы достижений, читающих это поле.
+    """
+
+    def __init__(self, achievements: Mapping[str, Any],
+                 rarity_colors: Optional[Mapping[str, str]] = None,
+                 default_color: str = "#9ca3af") -> None:
+        rarity_colors = rarity_colors or {}
+        self.achievements: List[CompiledAchievement] = []
+        self.groups: Dict[str, Tuple[int, ...]] = {}
+        self._constant: List[int] = []
+
+        groups: Dict[str, List[int]] = {}
+        for achievement_id, achievement in achievements.items():
+            rule = compile_rule(achievement.get("requirement", {}))
+            points = achievement.get("points", 0)
+            rarity = get_rarity(points)
+
+            # Результат на пустых данных игрока (поля по умолчанию)
+            try:
+                default_result: Optional[RuleResult] = rule.evaluate({})
+            except Exception:
+                default_result = None
+
+            index = len(self.achievements)
+            self.achievements.append(CompiledAchievement(
+                achievement_id=achievement_id,
+                rule=rule,
+                points=points,
+                info={
+                    "id": achievement_id,
+                    "name": achievement.get("name"),
+                    "description": achievement.get("description"),
+                    "icon": achievement.get("icon"),
+                    "points": points,
+                    "rarity": rarity,
+                    "rarity_color": rarity_colors.get(rarity, default_color),
+                },
+                default_result=default_result,
+            ))
+
+            for player_field in rule.fields:
+                groups.setdefault(player_field, []).append(index)
+            if not rule.fields:
+                self._constant.append(index)
+
+        self.groups = {k: tuple(v) for k, v in groups.items()}
+
+    def __len__(self) -> int:
+        return len(self.achievements)
+
+    def indexes_for_fields(self, fields: Iterable[str]) -> List[int]:
+        """Индексы правил, читающих хотя бы одно из полей (по порядку файла)"""
+        indexes: Set[int] = set()
+        for player_field in fields:
+            indexes.update(self.groups.get(player_field, ()))
+        return sorted(indexes)
+
+    def evaluate(self, player: Mapping[str, Any],
+                 indexes: Optional[Iterable[int]] = None) -> List[RuleResult]:
+        """
+        Вычислить правила
+
+        Args:
+            player: Данные игрока
+            indexes: Какие правила вычислять (по умолчанию — группы полей из player)
+
+        Returns:
+            Результаты всех правил по порядку; невычисленные правила
+            получают результат на значениях по умолчанию
+        """
+        if indexes is None:
+            indexes = self.indexes_for_fields(player)
+
+        results: List[Optional[RuleResult]] = [
+            compiled.default_result for compiled in self.achievements
+        ]
+        for index in indexes:
+            results[index] = self.achievements[index].rule.evaluate(player)
+
+        # Правила, которые не удалось посчитать заранее
+        return [
+            self.achievements[index].rule.evaluate(player) if result is None else result
+            for index, result in enumerate(results)
+        ]
+
+    def check(self, player: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Проверить достижения игрока
+
+        Returns:
+            Ответ /api/achievements/check
+        """
+        return self.build_payload(self.evaluate(player))
+
+    def build_payload(self, results: List[RuleResult],
+                      unlocked_at: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+        """
+        Собрать ответ с разблокированными достижениями и прогрессом
+
+        Args:
+            results: Результаты всех правил по порядку
+            unlocked_at: Время разблокировки по ID (по умолчанию — текущее)
+        """
+        unlocked = []
+        progress = {}
+        now = datetime.utcnow().isoformat()
+        unlocked_at = unlocked_at or {}
+
+        for compiled, (is_unlocked, current, maximum) in zip(self.achievements, results):
+            progress[compiled.achievement_id] = progress_entry(current, maximum)
+            if is_unlocked:
+                unlocked.append({
+                    **compiled.info,
+                    "unlocked_at": unlocked_at.get(compiled.achievement_id, now)
+                })
+
+        # Сортировка разблокированных по очкам
+        unlocked.sort(key=lambda x: x["points"], reverse=True)
+
+        return {
+            "unlocked_count": len(unlocked),
+            "total_count": len(self.achievements),
+            "total_points": sum(a["points"] for a in unlocked),
+            "achievements": unlocked,
+            "progress": progress
+        }
+
+
+def build_achievement_engine(achievements: Mapping[str, Any],
+                             rarity_colors: Optional[Mapping[str, str]] = None,
+                             default_color: str = "#9ca3af") -> AchievementRuleEngine:
+    """
+    Скомпилировать правила достижений
+
+    Args:
+        achievements: Раздел "achievements" из achievements.json
+        rarity_colors: Цвета редкостей
+        default_color: Цвет неизвестной редкости
+
+    Returns:
+        AchievementRuleEngine
+    """
+    return AchievementRuleEngine(achievements, rarity_colors, default_color)
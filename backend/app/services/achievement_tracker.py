@@ -0,0 +1,164 @@
+"""
+StarCourier Web - Achievement Tracker
+Инкрементальная проверка достижений по событиям игры
+
+Для каждого игрока хранится вектор прогресса (результат каждого правила).
+Когда игровое событие меняет поля состояния (посещённые сцены,
+характеристики, концовка), пересчитываются только правила из групп
+этих полей. Новые достижения отправляются через NotificationService.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from app.services.achievement_rules import AchievementRuleEngine, RuleResult
+from app.services.content_store import get_content
+from app.services.notification_service import notification_service
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AchievementProgress:
+    """Прогресс достижений игрока"""
+    engine: AchievementRuleEngine
+    results: List[RuleResult]
+    # ID достижения -> время разблокировки (разблокировка необратима)
+    unlocked: Dict[str, str] = field(default_factory=dict)
+
+
+class AchievementTracker:
+    """
+    Трекер достижений
+
+    Держит вектор прогресса для каждого активного игрока и
+    пересчитывает только правила, затронутые изменёнными полями.
+    """
+
+    def __init__(self) -> None:
+        self._players: Dict[str, AchievementProgress] = {}
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def _progress_for(self, player_id: str, player: Mapping[str, Any]) -> AchievementProgress:
+        """Прогресс игрока; после перезагрузки контента вектор строится заново"""
+        engine = get_content().achievement_engine
+        progress = self._players.get(player_id)
+
+        if progress is None or progress.engine is not engine:
+            unlocked = progress.unlocked if progress else {}
+            progress = AchievementProgress(engine, engine.evaluate(player, range(len(engine))), unlocked)
+            self._players[player_id] = progress
+
+        return progress
+
+    async def on_change(
+        self,
+        player_id: str,
+        player: Mapping[str, Any],
+        changed_fields: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Обработать изменение состояния игрока
+
+        Args:
+            player_id: ID игрока (он же получатель уведомлений)
+            player: Текущее состояние игрока
+            changed_fields: Изменённые поля (None — пересчитать всё)
+
+        Returns:
+            Список новых достижений
+        """
+        is_new = player_id not in self._players
+        progress = self._progress_for(player_id, player)
+        engine = progress.engine
+
+        if changed_fields is not None and not is_new:
+            for index in engine.indexes_for_fields(changed_fields):
+                progress.results[index] = engine.achievements[index].rule.evaluate(player)
+        elif changed_fields is None and not is_new:
+            progress.results = engine.evaluate(player, range(len(engine)))
+
+        newly_unlocked = []
+        now = datetime.utcnow().isoformat()
+        for compiled, (is_unlocked, _, _) in zip(engine.achievements, progress.results):
+            if is_unlocked and compiled.achievement_id not in progress.unlocked:
+                progress.unlocked[compiled.achievement_id] = now
+                newly_unlocked.append({**compiled.info, "unlocked_at": now})
+
+        for achievement in newly_unlocked:
+            await self._notify(player_id, achievement)
+
+        return newly_unlocked
+
+    async def _notify(self, player_id: str, achievement: Mapping[str, Any]) -> None:
+        """Отправить уведомление о достижении"""
+        try:
+            await notification_service.notify_achievement(
+                player_id,
+                achievement.get("name", ""),
+                achievement.get("description", ""),
+                achievement.get("points", 0)
+            )
+        except Exception as e:
+            logger.error(f"❌ Ошибка уведомления о достижении для {player_id}: {e}")
+
+    def get_payload(self, player_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Состояние достижений игрока в формате /api/achievements/check
+
+        Returns:
+            Словарь или None, если игрок не отслеживается
+        """
+        progress = self._players.get(player_id)
+        if progress is None:
+            return None
+
+        results = [
+            (True, current, maximum) if compiled.achievement_id in progress.unlocked
+            else (is_unlocked, current, maximum)
+            for compiled, (is_unlocked, current, maximum)
+            in zip(progress.engine.achievements, progress.results)
+        ]
+        return progress.engine.build_payload(results, progress.unlocked)
+
+    def is_tracking(self, player_id: str) -> bool:
+        """Есть ли прогресс игрока в трекере"""
+        return player_id in self._players
+
+    def get_unlocked(self, player_id: str) -> Dict[str, str]:
+        """Разблокированные достижения игрока: ID -> время"""
+        progress = self._players.get(player_id)
+        return dict(progress.unlocked) if progress else {}
+
+    def restore(self, player_id: str, player: Mapping[str, Any],
+                unlocked: Iterable[str] = ()) -> None:
+        """
+        Восстановить прогресс игрока без повторных уведомлений
+
+        Args:
+            player_id: ID игрока
+            player: Состояние игрока
+            unlocked: ID ранее разблокированных достижений
+        """
+        engine = get_content().achievement_engine
+        now = datetime.utcnow().isoformat()
+        self._players[player_id] = AchievementProgress(
+            engine,
+            engine.evaluate(player, range(len(engine))),
+            {achievement_id: now for achievement_id in unlocked}
+        )
+
+    def forget(self, player_id: str) -> None:
+        """Удалить прогресс игрока"""
+        self._players.pop(player_id, None)
+
+
+# Глобальный экземпляр
+achievement_tracker = AchievementTracker()
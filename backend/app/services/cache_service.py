@@ -11,8 +11,13 @@ import logging
 import json
 import asyncio
 import hashlib
-from datetime import datetime, timedelta
-from typing import Optional, Any, Dict, List, Union
+import heapq
+import inspect
+import math
+import random
+import time
+import uuid
+from typing import Optional, Any, Callable, Dict, List, Tuple, Union
 from functools import wraps
 from collections import OrderedDict
 
@@ -29,100 +34,148 @@ class InMemoryCache:
     """
     In-memory кэш с LRU eviction и TTL
 
-    Используется как fallback, когда Redis недоступен
+    Используется как fallback, когда Redis недоступен.
+
+    Сроки жизни - по монотонным часам. Истечение проверяется лениво
+    при обращении к ключу, а истёкшие записи удаляются по min-куче
+    сроков: порциями не больше sweep_batch при каждой записи и в фоновой
+    очистке (CacheService). Каждая операция - O(log n) амортизированно
+    вместо полного просмотра кэша.
     """
 
-    def __init__(self, max_size: int = 1000, default_ttl: int = 300) -> None:
+    def __init__(self, max_size: int = 1000, default_ttl: int = 300,
+                 sweep_batch: int = 100,
+                 clock: Callable[[], float] = time.monotonic) -> None:
         self._cache: OrderedDict[str, Any] = OrderedDict()
-        self._expiry: Dict[str, datetime] = {}
+        self._expiry: Dict[str, float] = {}
+        # (срок, ключ); записи перезаписанных и удалённых ключей устаревают
+        # и пропускаются при извлечении
+        self._heap: List[Tuple[float, str]] = []
         self._max_size: int = max_size
         self._default_ttl: int = default_ttl
+        self._sweep_batch: int = sweep_batch
+        self._clock = clock
         self._hits: int = 0
         self._misses: int = 0
+        self._expired: int = 0
+
+    def _remove(self, key: str) -> None:
+        self._cache.pop(key, None)
+        self._expiry.pop(key, None)
+
+    def _is_expired(self, key: str, now: float) -> bool:
+        """Проверка срока ключа; истёкший удаляется"""
+        deadline = self._expiry.get(key)
+        if deadline is not None and deadline <= now:
+            self._remove(key)
+            self._expired += 1
+            return True
+        return False
+
+    def sweep(self, limit: Optional[int] = None) -> int:
+        """
+        Удаление истёкших записей по куче сроков
+
+        Args:
+            limit: Максимум удаляемых записей (None - все истёкшие)
+
+        Returns:
+            Количество удалённых записей
+        """
+        now = self._clock()
+        heap = self._heap
+        removed = 0
+        while heap and heap[0][0] <= now and (limit is None or removed < limit):
+            deadline, key = heapq.heappop(heap)
+            # Запись кучи актуальна, только если срок ключа не менялся
+            if self._expiry.get(key) == deadline:
+                self._remove(key)
+                self._expired += 1
+                removed += 1
+
+        # Устаревших записей стало больше, чем живых: пересобрать кучу
+        if len(heap) > 2 * len(self._expiry) + 64:
+            self._heap = [(deadline, key) for key, deadline in self._expiry.items()]
+            heapq.heapify(self._heap)
+        return removed
 
     def _evict_expired(self) -> None:
-        """Удаление истёкших записей"""
-        now = datetime.utcnow()
-        expired_keys = [
-            k for k, v in self._expiry.items()
-            if v < now
-        ]
-        for key in expired_keys:
-            self._cache.pop(key, None)
-            self._expiry.pop(key, None)
-    
+        """Удаление истёкших записей (ограниченной порцией)"""
+        self.sweep(self._sweep_batch)
+
     def _evict_lru(self):
         """Удаление старых записей при переполнении"""
         while len(self._cache) >= self._max_size:
             oldest_key = next(iter(self._cache))
-            self._cache.pop(oldest_key, None)
-            self._expiry.pop(oldest_key, None)
-    
+            self._remove(oldest_key)
+
     def get(self, key: str) -> Optional[Any]:
         """Получение значения из кэша"""
-        self._evict_expired()
-        
-        if key in self._cache:
+        if key in self._cache and not self._is_expired(key, self._clock()):
             self._hits += 1
             # Перемещение в конец (LRU)
             self._cache.move_to_end(key)
             return self._cache[key]
-        
+
         self._misses += 1
         return None
-    
+
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Установка значения в кэш
-        
+
         Args:
             key: Кэш ключ
             value: Значение для кэширования
             ttl: Время жизни в секундах (по умолчанию default_ttl)
         """
         self._evict_expired()
-        self._evict_lru()
+        if key not in self._cache:
+            self._evict_lru()
 
         ttl = ttl or self._default_ttl
+        deadline = self._clock() + ttl
         self._cache[key] = value
-        self._expiry[key] = datetime.utcnow() + timedelta(seconds=ttl)
+        self._cache.move_to_end(key)
+        self._expiry[key] = deadline
+        heapq.heappush(self._heap, (deadline, key))
 
     def delete(self, key: str) -> bool:
         """Удаление значения из кэша"""
         if key in self._cache:
-            del self._cache[key]
-            del self._expiry[key]
+            self._remove(key)
             return True
         return False
-    
+
     def clear(self) -> None:
         """Очистка всего кэша"""
         self._cache.clear()
         self._expiry.clear()
+        self._heap.clear()
 
     def exists(self, key: str) -> bool:
         """Проверка существования ключа"""
-        self._evict_expired()
-        return key in self._cache
-    
+        return key in self._cache and not self._is_expired(key, self._clock())
+
     def keys(self, pattern: str = None) -> List[str]:
         """Получение списка ключей"""
-        self._evict_expired()
+        self.sweep()
         if pattern:
             import fnmatch
             return [k for k in self._cache.keys() if fnmatch.fnmatch(k, pattern)]
         return list(self._cache.keys())
-    
+
     def get_stats(self) -> Dict[str, Any]:
         """Получение статистики кэша"""
         total = self._hits + self._misses
         hit_rate = self._hits / total if total > 0 else 0
-        
+
         return {
             "type": "memory",
             "size": len(self._cache),
             "max_size": self._max_size,
             "hits": self._hits,
             "misses": self._misses,
+            "expired": self._expired,
             "hit_rate": round(hit_rate, 4)
         }
 
@@ -252,6 +305,19 @@ class RedisCache:
         if client:
             await client.expire(key, ttl)
     
+    async def publish(self, channel: str, message: str) -> bool:
+        """Публикация сообщения в канал pub/sub"""
+        client = await self._get_client()
+        if not client:
+            return False
+        
+        try:
+            await client.publish(channel, message)
+            return True
+        except Exception as e:
+            logger.error(f"Redis publish error: {e}")
+            return False
+    
     def get_stats(self) -> Dict[str, Any]:
         """Получение статистики кэша"""
         total = self._hits + self._misses
@@ -266,6 +332,247 @@ class RedisCache:
         }
 
 
+# ============================================================================
+# TWO-TIER CACHE (L1 in-process + L2 Redis)
+# ============================================================================
+
+class TieredCache:
+    """
+    Двухуровневый кэш: L1 в памяти воркера перед Redis (L2)
+
+    Чтение сначала идёт в L1 (LRU с коротким TTL) и только при промахе -
+    в Redis. Запись и удаление идут в оба уровня, а другим воркерам
+    рассылается сообщение об инвалидации по pub/sub: они удаляют ключ
+    из своего L1. Если подписка потеряна, L1 очищается (сообщения могли
+    быть пропущены); отставание L1 в любом случае ограничено его TTL.
+
+    Значения из L1 отдаются без копирования, как и в InMemoryCache.
+
+    Args:
+        redis_cache: Кэш L2
+        l1_size: Максимум ключей в L1
+        l1_ttl: Время жизни записи L1 в секундах
+        channel: Канал сообщений об инвалидации
+    """
+
+    # Ключ сообщения "очистить всё"
+    FLUSH_ALL = "*"
+
+    def __init__(self, redis_cache: RedisCache, l1_size: int = 10000, l1_ttl: int = 5,
+                 channel: str = "sc:cache:invalidate",
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self._l2 = redis_cache
+        self._l1 = InMemoryCache(max_size=l1_size, default_ttl=l1_ttl, clock=clock)
+        self._l1_ttl = l1_ttl
+        self.channel = channel
+        # Сообщения своего воркера игнорируются
+        self._node = uuid.uuid4().hex
+        # Счётчик инвалидаций: значение, прочитанное из L2 до пришедшей
+        # инвалидации, не попадает в L1
+        self._epoch = 0
+        self._listener: Optional[asyncio.Task] = None
+        self._closing = False
+        self._subscribed = asyncio.Event()
+        self._sent = 0
+        self._received = 0
+
+    # ------------------------------------------------------------------
+    # Инвалидация
+    # ------------------------------------------------------------------
+
+    def _invalidate_local(self, key: str) -> None:
+        self._epoch += 1
+        if key == self.FLUSH_ALL:
+            self._l1.clear()
+        else:
+            self._l1.delete(key)
+
+    async def _broadcast(self, key: str) -> None:
+        if await self._l2.publish(self.channel, f"{self._node}|{key}"):
+            self._sent += 1
+
+    def handle_message(self, data: Union[str, bytes]) -> None:
+        """Обработать сообщение об инвалидации из канала"""
+        if isinstance(data, bytes):
+            data = data.decode()
+        node, _, key = data.partition("|")
+        if node == self._node or not key:
+            return
+        self._received += 1
+        self._invalidate_local(key)
+
+    async def _listen(self) -> None:
+        """Подписка на канал инвалидаций с переподключением"""
+        # Флаг, а не только отмена: ожидание с таймаутом может поглотить отмену
+        while not self._closing:
+            pubsub = None
+            try:
+                client = await self._l2._get_client()
+                if client is None:
+                    raise ConnectionError("Redis unavailable")
+                pubsub = client.pubsub()
+                await pubsub.subscribe(self.channel)
+                # Пока подписки не было, сообщения могли потеряться
+                self._invalidate_local(self.FLUSH_ALL)
+                self._subscribed.set()
+                while not self._closing:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None and message.get("type") == "message":
+                        self.handle_message(message["data"])
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self._subscribed.clear()
+                self._invalidate_local(self.FLUSH_ALL)
+                logger.warning(f"Cache invalidation subscription lost: {e}")
+                await asyncio.sleep(1.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.unsubscribe(self.channel)
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    def start(self) -> None:
+        """Запуск подписки на инвалидации"""
+        if self._listener is None or self._listener.done():
+            self._closing = False
+            self._listener = asyncio.create_task(self._listen())
+
+    async def wait_subscribed(self, timeout: float = 5.0) -> bool:
+        """Дождаться подписки на канал"""
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def close(self) -> None:
+        """Остановка подписки"""
+        self._closing = True
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._subscribed.clear()
+
+    # ------------------------------------------------------------------
+    # Интерфейс кэша
+    # ------------------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Получение значения: L1, затем Redis"""
+        value = self._l1.get(key)
+        if value is not None:
+            return value
+
+        epoch = self._epoch
+        value = await self._l2.get(key)
+        # Без подписки инвалидации не приходят: L1 не заполняется
+        if value is not None and epoch == self._epoch and self._subscribed.is_set():
+            self._l1.set(key, value, self._l1_ttl)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int = None):
+        """Установка значения в оба уровня с рассылкой инвалидации"""
+        await self._l2.set(key, value, ttl)
+        self._invalidate_local(key)
+        if self._subscribed.is_set():
+            self._l1.set(key, value, min(ttl, self._l1_ttl) if ttl else self._l1_ttl)
+        await self._broadcast(key)
+
+    async def delete(self, key: str) -> bool:
+        """Удаление из обоих уровней с рассылкой инвалидации"""
+        self._invalidate_local(key)
+        deleted = await self._l2.delete(key)
+        await self._broadcast(key)
+        return deleted
+
+    async def clear(self):
+        """Очистка обоих уровней у всех воркеров"""
+        self._invalidate_local(self.FLUSH_ALL)
+        await self._l2.clear()
+        await self._broadcast(self.FLUSH_ALL)
+
+    async def exists(self, key: str) -> bool:
+        """Проверка существования ключа"""
+        if self._l1.exists(key):
+            return True
+        return await self._l2.exists(key)
+
+    async def keys(self, pattern: str = "*") -> List[str]:
+        """Получение списка ключей (из Redis)"""
+        return await self._l2.keys(pattern)
+
+    async def incr(self, key: str) -> int:
+        """Инкремент значения"""
+        self._invalidate_local(key)
+        value = await self._l2.incr(key)
+        await self._broadcast(key)
+        return value
+
+    async def expire(self, key: str, ttl: int):
+        """Установка TTL для ключа"""
+        await self._l2.expire(key, ttl)
+
+    async def _get_client(self):
+        """Клиент Redis (для проверки подключения)"""
+        return await self._l2._get_client()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика по уровням"""
+        l1 = self._l1.get_stats()
+        l2 = self._l2.get_stats()
+        # Обращения к L2 - только промахи L1
+        hits = l1["hits"] + l2["hits"]
+        total = l1["hits"] + l1["misses"]
+        return {
+            "type": "redis+l1",
+            "connected": l2["connected"],
+            "hits": hits,
+            "misses": l2["misses"],
+            "hit_rate": round(hits / total, 4) if total else 0,
+            "tiers": {"l1": l1, "l2": l2},
+            "invalidation": {
+                "subscribed": self._subscribed.is_set(),
+                "sent": self._sent,
+                "received": self._received,
+            },
+        }
+
+
+# ============================================================================
+# REFRESH ENVELOPE
+# ============================================================================
+
+# Значение со сроком свежести для stale-while-revalidate и раннего обновления:
+# {ENVELOPE_MARKER: 1, "value": ..., "expires_at": ..., "delta": ...}
+# expires_at - время стены (общее для воркеров при Redis), delta - длительность
+# последнего вычисления в секундах. Физический TTL записи = TTL + окно устаревания.
+ENVELOPE_MARKER = "__sc_cache_envelope__"
+
+
+def is_envelope(entry: Any) -> bool:
+    """Запись кэша со сроком свежести"""
+    return isinstance(entry, dict) and ENVELOPE_MARKER in entry
+
+
+def should_refresh_early(remaining: float, delta: float, beta: float) -> bool:
+    """
+    Вероятностное раннее обновление (XFetch)
+
+    Вероятность растёт к концу срока свежести и с длительностью
+    вычисления: горячий ключ обновляется одним из запросов до истечения.
+    """
+    if beta <= 0 or delta <= 0:
+        return False
+    return delta * beta * -math.log(1.0 - random.random()) >= remaining
+
+
 # ============================================================================
 # CACHE SERVICE
 # ============================================================================
@@ -274,13 +581,27 @@ class CacheService:
     """
     Унифицированный сервис кэширования
     
-    Использует Redis, если доступен, иначе in-memory
+    Использует Redis, если доступен, иначе in-memory.
+    С Redis перед ним стоит L1 в памяти воркера (TieredCache),
+    если settings.cache_l1_size > 0.
     """
     
     def __init__(self):
         self._redis_cache = None
-        self._memory_cache = InMemoryCache()
+        self._memory_cache = InMemoryCache(
+            max_size=settings.cache_max_size,
+            default_ttl=settings.cache_ttl
+        )
         self._use_redis = settings.cache_enabled and settings.cache_type == "redis"
+        self._sweep_task: Optional[asyncio.Task] = None
+        # Ключ -> задача вычисления значения (single-flight)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._coalesced: int = 0
+        self._stale_served: int = 0
+        self._early_refreshes: int = 0
+        self._refresh_errors: int = 0
+        # Часы сроков свежести (время стены: сроки общие для воркеров)
+        self._clock: Callable[[], float] = time.time
     
     async def initialize(self):
         """Инициализация кэша"""
@@ -292,11 +613,49 @@ class CacheService:
                 if not client:
                     logger.warning("⚠️ Redis unavailable, using in-memory cache")
                     self._use_redis = False
+                elif settings.cache_l1_size > 0:
+                    self._redis_cache = TieredCache(
+                        self._redis_cache,
+                        l1_size=settings.cache_l1_size,
+                        l1_ttl=settings.cache_l1_ttl,
+                        channel=settings.cache_invalidation_channel
+                    )
+                    self._redis_cache.start()
+                    logger.info("⚡ L1 cache enabled in front of Redis")
             except Exception as e:
                 logger.warning(f"⚠️ Redis init failed: {e}, using in-memory cache")
                 self._use_redis = False
         else:
             logger.info("📦 Using in-memory cache")
+
+        if not self._use_redis and settings.cache_sweep_interval > 0:
+            self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self) -> None:
+        """Фоновая очистка истёкших записей in-memory кэша порциями"""
+        batch = settings.cache_sweep_batch
+        while True:
+            try:
+                removed = self._memory_cache.sweep(batch)
+                # Порция заполнена - продолжить, уступив event loop
+                await asyncio.sleep(0 if removed >= batch else settings.cache_sweep_interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Cache sweep error: {e}")
+                await asyncio.sleep(settings.cache_sweep_interval)
+
+    async def close(self):
+        """Остановка фоновой очистки и подписки на инвалидации"""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
+        if isinstance(self._redis_cache, TieredCache):
+            await self._redis_cache.close()
     
     @property
     def _cache(self):
@@ -318,12 +677,20 @@ class CacheService:
     
     # Синхронные методы для in-memory
     
+    def _unwrap(self, entry: Any) -> Optional[Any]:
+        """Значение записи; устаревшая запись со сроком свежести - промах"""
+        if not is_envelope(entry):
+            return entry
+        if entry["expires_at"] <= self._clock():
+            return None
+        return entry["value"]
+
     def get_sync(self, key: str) -> Optional[Any]:
         """Синхронное получение из in-memory кэша"""
         if self._use_redis:
             logger.warning("Sync get called with Redis cache - use async version")
             return None
-        return self._memory_cache.get(key)
+        return self._unwrap(self._memory_cache.get(key))
     
     def set_sync(self, key: str, value: Any, ttl: int = None):
         """Синхронная установка в in-memory кэш"""
@@ -332,11 +699,15 @@ class CacheService:
     
     # Асинхронные методы
     
-    async def get(self, key: str) -> Optional[Any]:
-        """Асинхронное получение из кэша"""
+    async def _get_raw(self, key: str) -> Optional[Any]:
+        """Запись кэша как есть (вместе со сроком свежести)"""
         if self._use_redis and self._redis_cache:
             return await self._redis_cache.get(key)
         return self._memory_cache.get(key)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Асинхронное получение из кэша"""
+        return self._unwrap(await self._get_raw(key))
     
     async def set(self, key: str, value: Any, ttl: int = None):
         """Асинхронная установка в кэш"""
@@ -364,42 +735,146 @@ class CacheService:
             return await self._redis_cache.exists(key)
         return self._memory_cache.exists(key)
     
+    @staticmethod
+    def jittered_ttl(ttl: int, jitter: float) -> int:
+        """
+        TTL со случайным разбросом ±jitter (доля), чтобы ключи, записанные
+        одновременно, не истекали одновременно
+        """
+        if not jitter or not ttl:
+            return ttl
+        return max(1, round(ttl * (1 + random.uniform(-jitter, jitter))))
+
     async def get_or_set(
         self, 
         key: str, 
         factory: callable,
-        ttl: int = None
+        ttl: int = None,
+        jitter: Optional[float] = None,
+        stale_ttl: Optional[int] = None,
+        early_refresh: Optional[float] = None
     ) -> Any:
         """
         Получение из кэша или вычисление и сохранение
         
+        Одновременные промахи по одному ключу объединяются (single-flight):
+        factory выполняется один раз, остальные запросы ждут её результат.
+        Исключение factory получают все ожидающие. Отмена одного
+        ожидающего не прерывает вычисление для остальных.
+        
+        Со stale_ttl значение после истечения TTL ещё stale_ttl секунд
+        отдаётся как есть, а одна фоновая задача его обновляет
+        (stale-while-revalidate). С early_refresh (beta XFetch, обычно 1.0)
+        горячий ключ обновляется в фоне с вероятностью, растущей к концу TTL.
+        
         Args:
             key: Ключ кэша
-            factory: Функция для вычисления значения (async)
+            factory: Функция для вычисления значения (sync или async)
             ttl: Время жизни в секундах
+            jitter: Разброс TTL в долях (по умолчанию settings.cache_ttl_jitter)
+            stale_ttl: Окно устаревания в секундах (по умолчанию settings.cache_stale_ttl)
+            early_refresh: Коэффициент раннего обновления
+                (по умолчанию settings.cache_early_refresh_beta, 0 - выкл)
         
         Returns:
             Значение из кэша или вычисленное
         """
+        if stale_ttl is None:
+            stale_ttl = settings.cache_stale_ttl
+        if early_refresh is None:
+            early_refresh = settings.cache_early_refresh_beta
+        options = (ttl, jitter, stale_ttl, early_refresh)
+        
         # Проверяем кэш
-        cached = await self.get(key)
+        cached = await self._get_raw(key)
         if cached is not None:
-            return cached
-        
-        # Вычисляем значение
-        if asyncio.iscoroutinefunction(factory):
-            value = await factory()
-        else:
-            value = factory()
+            if not is_envelope(cached):
+                return cached
+            remaining = cached["expires_at"] - self._clock()
+            if remaining <= 0:
+                # Устаревшее значение в пределах окна: отдаём и обновляем в фоне
+                self._stale_served += 1
+                self._start_flight(key, factory, options, background=True)
+            elif should_refresh_early(remaining, cached["delta"], early_refresh):
+                if self._start_flight(key, factory, options, background=True)[1]:
+                    self._early_refreshes += 1
+            return cached["value"]
         
-        # Сохраняем в кэш
-        await self.set(key, value, ttl)
+        task, started = self._start_flight(key, factory, options)
+        if not started:
+            self._coalesced += 1
+        return await asyncio.shield(task)
+
+    def _start_flight(self, key: str, factory: Callable[[], Any], options: Tuple[Any, ...],
+                      background: bool = False) -> Tuple[asyncio.Task, bool]:
+        """
+        Задача вычисления ключа (новая или уже идущая)
+
+        Args:
+            key: Ключ кэша
+            factory: Функция для вычисления значения
+            options: (ttl, jitter, stale_ttl, early_refresh)
+            background: Фоновое обновление (stale/early), результат никто не ждёт
+
+        Returns:
+            (задача, True если запущена сейчас)
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            return task, False
+        task = asyncio.create_task(self._compute(key, factory, *options))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish_flight(key, done, background))
+        return task, True
+
+    async def _compute(self, key: str, factory: Callable[[], Any], ttl: Optional[int],
+                       jitter: Optional[float], stale_ttl: int, early_refresh: float) -> Any:
+        """Вычисление значения и сохранение в кэш"""
+        started = time.perf_counter()
+        value = factory()
+        if inspect.isawaitable(value):
+            value = await value
+        delta = time.perf_counter() - started
         
+        ttl = self.jittered_ttl(
+            ttl or settings.cache_ttl,
+            settings.cache_ttl_jitter if jitter is None else jitter
+        )
+        if stale_ttl or early_refresh:
+            entry = {
+                ENVELOPE_MARKER: 1,
+                "value": value,
+                "expires_at": self._clock() + ttl,
+                "delta": delta,
+            }
+            await self.set(key, entry, ttl + stale_ttl)
+        else:
+            await self.set(key, value, ttl)
         return value
+
+    def _finish_flight(self, key: str, task: asyncio.Task, background: bool) -> None:
+        """Снять вычисление с учёта"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        # Исключение вычисления на промахе доставлено ожидающим;
+        # ошибку фонового обновления никто не получит - считаем и логируем
+        error = task.exception()
+        if error is not None and background:
+            self._refresh_errors += 1
+            logger.warning(f"Cache refresh failed for {key}: {error}")
     
     def get_stats(self) -> Dict[str, Any]:
         """Получение статистики кэша"""
-        return self._cache.get_stats()
+        return {
+            **self._cache.get_stats(),
+            "inflight": len(self._inflight),
+            "coalesced": self._coalesced,
+            "stale_served": self._stale_served,
+            "early_refreshes": self._early_refreshes,
+            "refresh_errors": self._refresh_errors,
+        }
 
 
 # ============================================================================
@@ -409,15 +884,25 @@ class CacheService:
 def cached(
     key_prefix: str = "",
     ttl: int = 300,
-    key_builder: callable = None
+    key_builder: callable = None,
+    jitter: Optional[float] = None,
+    stale_ttl: Optional[int] = None,
+    early_refresh: Optional[float] = None
 ):
     """
     Декоратор для кэширования результатов функций
     
+    Одновременные вызовы с одним ключом выполняют функцию один раз;
+    stale_ttl и early_refresh - см. CacheService.get_or_set.
+    
     Usage:
         @cached(key_prefix="user", ttl=60)
         async def get_user(user_id: str):
             ...
+        
+        @cached(key_prefix="leaderboard", ttl=300, stale_ttl=60, early_refresh=1.0)
+        async def get_leaderboard():
+            ...
     """
     def decorator(func):
         @wraps(func)
@@ -428,18 +913,14 @@ def cached(
             else:
                 cache_key = cache_service._make_key(key_prefix, *args, **kwargs)
             
-            # Проверка кэша
-            cached_value = await cache_service.get(cache_key)
-            if cached_value is not None:
-                return cached_value
-            
-            # Выполнение функции
-            result = await func(*args, **kwargs)
-            
-            # Сохранение в кэш
-            await cache_service.set(cache_key, result, ttl)
-            
-            return result
+            return await cache_service.get_or_set(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl,
+                jitter,
+                stale_ttl,
+                early_refresh
+            )
         
         return wrapper
     return decorator
@@ -459,3 +940,8 @@ cache_service = CacheService()
 async def init_cache():
     """Инициализация кэша при старте приложения"""
     await cache_service.initialize()
+
+
+async def close_cache():
+    """Остановка кэша при завершении приложения"""
+    await cache_service.close()
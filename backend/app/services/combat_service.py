@@ -6,11 +6,15 @@ StarCourier Web - Combat System
 Версия: 1.0.0
 """
 
-from typing import Dict, List, Optional, Any, Tuple
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
 from pydantic import BaseModel, Field, field_validator
 from enum import Enum
 from datetime import datetime
 import random
+import uuid
+
+from app.services.session_store import NS_COMBAT, SessionStore, register_codec, session_store
 
 
 # ============================================================================
@@ -149,6 +153,15 @@ class CombatState(BaseModel):
     rewards: Dict[str, Any] = Field(default_factory=dict, description="Награды")
 
 
+def _dump_combat(combat: CombatState) -> Dict[str, Any]:
+    """Бой в JSON-формате для общего хранилища сессий"""
+    return combat.model_dump(mode="json")
+
+
+# Бои в общем хранилище проходят валидацию модели
+register_codec(NS_COMBAT, _dump_combat, CombatState.model_validate)
+
+
 # ============================================================================
 # COMBAT MANAGER
 # ============================================================================
@@ -162,10 +175,68 @@ class CombatManager:
     - Обработка ходов
     - Расчёт урона
     - Проверка условий победы
+    
+    С общим хранилищем сессий бои видны всем воркерам: обработчик
+    загружает бой (load_combat), выполняет ходы и записывает его
+    обратно (save_combat).
+    
+    Args:
+        sessions: Хранилище сессий (None - бои только в памяти менеджера)
     """
     
-    def __init__(self):
+    def __init__(self, sessions: Optional[SessionStore] = None):
         self.combats: Dict[str, CombatState] = {}
+        self.sessions = sessions
+    
+    async def load_combat(self, combat_id: str, fresh: bool = True) -> Optional[CombatState]:
+        """
+        Загрузить бой из хранилища сессий
+        
+        Args:
+            combat_id: ID боя
+            fresh: True - бой подключается к менеджеру для ходов;
+                False - только чтение (допускается значение из L1-кэша)
+        """
+        if self.sessions is None:
+            return self.combats.get(combat_id)
+        
+        combat = await self.sessions.get(NS_COMBAT, combat_id, fresh=fresh)
+        if combat is None:
+            self.combats.pop(combat_id, None)
+        elif fresh:
+            self.combats[combat_id] = combat
+        return combat
+    
+    async def save_combat(self, combat_id: str) -> bool:
+        """Записать бой в хранилище сессий и отпустить его из памяти менеджера"""
+        if self.sessions is None:
+            return combat_id in self.combats
+        
+        combat = self.combats.pop(combat_id, None)
+        if combat is None:
+            return False
+        return await self.sessions.set(NS_COMBAT, combat_id, combat)
+    
+    def release_combat(self, combat_id: str) -> None:
+        """Отпустить загруженный бой без записи (копия в хранилище не меняется)"""
+        if self.sessions is not None:
+            self.combats.pop(combat_id, None)
+    
+    @asynccontextmanager
+    async def use_combat(self, combat_id: str) -> AsyncIterator[Optional[CombatState]]:
+        """
+        Бой для ходов: загружается и всегда отпускается из памяти менеджера
+        
+        При успешном выходе бой записывается в хранилище сессий,
+        при исключении отбрасывается без записи.
+        """
+        await self.load_combat(combat_id)
+        try:
+            yield self.combats.get(combat_id)
+        except BaseException:
+            self.release_combat(combat_id)
+            raise
+        await self.save_combat(combat_id)
     
     def start_combat(
         self,
@@ -174,7 +245,8 @@ class CombatManager:
         rewards: Optional[Dict[str, Any]] = None
     ) -> CombatState:
         """Начать бой"""
-        combat_id = f"combat_{datetime.utcnow().timestamp()}"
+        # Уникален между воркерами
+        combat_id = f"combat_{uuid.uuid4().hex[:16]}"
         
         combat = CombatState(
             id=combat_id,
@@ -615,6 +687,19 @@ def create_enemy_combatant(
     )
 
 
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+# Бои /api/combat в общем хранилище сессий
+combat_manager = CombatManager(sessions=session_store)
+
+
+def get_combat_manager() -> CombatManager:
+    """Получить менеджер боёв /api/combat"""
+    return combat_manager
+
+
 # ============================================================================
 # EXPORT
 # ============================================================================
@@ -637,6 +722,8 @@ __all__ = [
     
     # Manager
     'CombatManager',
+    'combat_manager',
+    'get_combat_manager',
     
     # Templates
     'create_player_combatant',
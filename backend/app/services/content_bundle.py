@@ -0,0 +1,226 @@
+"""
+StarCourier Web - Content Bundle
+Бинарный бандл контента для быстрого старта воркеров
+
+Бандл собирается заранее (офлайн) из JSON-файлов и содержит готовый
+снимок контента вместе со всеми индексами. При старте воркер
+отображает файл в память (mmap), проверяет заголовок и восстанавливает
+снимок без парсинга JSON и построения индексов.
+
+Формат файла:
+    заголовок  struct "<6sH4s16s16sQ"
+               magic, версия формата, MAGIC_NUMBER интерпретатора,
+               версия контента (хэш JSON), отпечаток кода индексов,
+               длина данных
+    данные     pickle снимка (protocol 5)
+
+Отпечаток - хэш исходников модулей, чьи классы попадают в снимок
+(INDEX_MODULES): после изменения их кода бандл пересобирается,
+а не распаковывается в объекты старой раскладки.
+
+Бандл доверенный: он собирается из файлов репозитория командой
+    python -m app.services.content_bundle
+и не должен приниматься из внешних источников.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import argparse
+import dataclasses
+import hashlib
+import importlib.util
+import logging
+import mmap
+import os
+import pickle
+import struct
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Имя файла бандла в каталоге данных
+BUNDLE_FILENAME = "content.bundle"
+
+BUNDLE_MAGIC = b"SCBNDL"
+BUNDLE_FORMAT_VERSION = 3
+BUNDLE_HEADER = struct.Struct("<6sH4s16s16sQ")
+
+# pickle совместим между версиями, но классы индексов — нет:
+# бандл, собранный другим интерпретатором, пересобирается
+PYTHON_TAG = importlib.util.MAGIC_NUMBER
+
+# Модули с классами, экземпляры которых хранятся в снимке
+INDEX_MODULES: Tuple[str, ...] = (
+    "app.services.content_store",
+    "app.services.scene_graph",
+    "app.services.scene_analysis",
+    "app.services.ability_index",
+    "app.services.search_index",
+    "app.services.quest_graph",
+    "app.services.achievement_rules",
+    "app.services.player_state",
+    "app.models.game",
+)
+
+
+@lru_cache(maxsize=1)
+def code_fingerprint() -> bytes:
+    """Отпечаток исходников INDEX_MODULES (16 байт)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in INDEX_MODULES:
+        spec = importlib.util.find_spec(name)
+        digest.update(name.encode())
+        if spec is not None and spec.origin:
+            digest.update(Path(spec.origin).read_bytes())
+    return digest.digest()
+
+
+class BundleError(ValueError):
+    """Бандл повреждён или несовместим"""
+
+
+# ============================================================================
+# WRITE
+# ============================================================================
+
+def write_bundle(snapshot: Any, path: Path) -> int:
+    """
+    Записать снимок контента в бандл
+
+    Запись атомарна: данные пишутся во временный файл и переименовываются.
+
+    Args:
+        snapshot: ContentSnapshot
+        path: Путь к файлу бандла
+
+    Returns:
+        Размер файла в байтах
+    """
+    # Кэш ответов не сохраняем — он заполняется на лету
+    snapshot = dataclasses.replace(snapshot, payloads={})
+    payload = pickle.dumps(snapshot, protocol=5)
+    version = snapshot.version.encode("ascii")[:16].ljust(16, b"\0")
+    header = BUNDLE_HEADER.pack(
+        BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION, PYTHON_TAG, version, code_fingerprint(),
+        len(payload)
+    )
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+    return len(header) + len(payload)
+
+
+# ============================================================================
+# READ
+# ============================================================================
+
+def read_bundle_version(path: Path) -> Optional[str]:
+    """Версия контента в бандле без загрузки данных (None, если бандла нет)"""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(BUNDLE_HEADER.size)
+    except OSError:
+        return None
+    try:
+        return _parse_header(header, None)[0]
+    except BundleError:
+        return None
+
+
+def _parse_header(buffer: Any, size: Optional[int]) -> Tuple[str, int]:
+    """Проверить заголовок и вернуть (версия контента, длина данных)"""
+    if len(buffer) < BUNDLE_HEADER.size:
+        raise BundleError("файл меньше заголовка")
+
+    magic, format_version, python_tag, version, code, length = BUNDLE_HEADER.unpack_from(buffer)
+    if magic != BUNDLE_MAGIC:
+        raise BundleError("неверная сигнатура")
+    if format_version != BUNDLE_FORMAT_VERSION:
+        raise BundleError(f"версия формата {format_version}, ожидается {BUNDLE_FORMAT_VERSION}")
+    if python_tag != PYTHON_TAG:
+        raise BundleError("бандл собран другой версией Python")
+    if code != code_fingerprint():
+        raise BundleError("бандл собран другой версией кода индексов")
+    if size is not None and BUNDLE_HEADER.size + length != size:
+        raise BundleError("размер данных не совпадает с заголовком")
+
+    return version.rstrip(b"\0").decode("ascii"), length
+
+
+def load_bundle(path: Path, expected_version: Optional[str] = None,
+                generation: int = 0) -> Optional[Any]:
+    """
+    Загрузить снимок из бандла
+
+    Args:
+        path: Путь к файлу бандла
+        expected_version: Версия контента JSON-файлов; устаревший бандл отклоняется
+        generation: Поколение для загруженного снимка
+
+    Returns:
+        ContentSnapshot или None, если бандла нет или он не подходит
+    """
+    started = time.perf_counter()
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            version, length = _parse_header(mapped, len(mapped))
+            if expected_version is not None and version != expected_version:
+                logger.info(f"📦 Бандл контента устарел ({version} != {expected_version}), читаем JSON")
+                return None
+            with memoryview(mapped) as view:
+                snapshot = pickle.loads(view[BUNDLE_HEADER.size:BUNDLE_HEADER.size + length])
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # Любая ошибка распаковки (в т.ч. TypeError от изменённых классов) - читаем JSON
+        logger.warning(f"⚠️ Бандл контента не загружен: {e}")
+        return None
+
+    logger.info(
+        f"📦 Контент загружен из бандла {path.name} "
+        f"(версия {version}, {(time.perf_counter() - started) * 1000:.1f} мс)"
+    )
+    return dataclasses.replace(
+        snapshot, generation=generation, loaded_at=time.time(), payloads={}
+    )
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv: Optional[list] = None) -> int:
+    """Собрать бандл из JSON-файлов контента"""
+    from app.services.content_store import DATA_DIR, ContentStore, ContentValidationError
+
+    parser = argparse.ArgumentParser(description="Сборка бинарного бандла контента StarCourier")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Каталог с JSON-файлами")
+    parser.add_argument("--output", type=Path, default=None, help="Путь к бандлу")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    output = args.output or args.data_dir / BUNDLE_FILENAME
+
+    store = ContentStore(args.data_dir, use_bundle=False)
+    try:
+        snapshot = store.reload()
+    except ContentValidationError as e:
+        logger.error(f"❌ Контент не прошёл проверку: {e}")
+        return 1
+
+    size = write_bundle(snapshot, output)
+    logger.info(f"✅ Бандл записан: {output} ({size / 1024:.1f} КБ, версия {snapshot.version})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
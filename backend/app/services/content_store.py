@@ -0,0 +1,603 @@
+"""
+StarCourier Web - Content Store
+Единое хранилище игрового контента (сцены, персонажи, способности, квесты, достижения)
+
+Контент загружается один раз и хранится в виде неизменяемого снимка
+с заранее построенными индексами. Все роутеры читают данные отсюда,
+а не парсят JSON на каждый запрос.
+
+Перезагрузка атомарна: новый снимок строится и проверяется в фоне,
+затем подменяется одним присваиванием ссылки. Запросы, уже получившие
+снимок, дорабатывают со старой версией.
+
+Автор: QuadDarv1ne
+Версия: 1.1.0
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from app.config import settings
+from app.services.ability_index import AbilityIndex, build_ability_index
+from app.services.achievement_rules import AchievementRuleEngine, build_achievement_engine
+from app.services.content_bundle import BUNDLE_FILENAME, load_bundle
+from app.services.quest_graph import QuestGraph, build_quest_graph
+from app.services.player_state import INITIAL_STATS
+from app.services.scene_analysis import SceneAnalysis, build_scene_analysis
+from app.services.scene_graph import SceneGraph, build_scene_graph
+from app.services.search_index import SearchIndex, build_ability_search, build_quest_search
+
+logger = logging.getLogger(__name__)
+
+# Базовый путь к данным
+DATA_DIR: Path = Path(__file__).parent.parent / "data"
+
+# Файлы контента: имя раздела -> имя файла
+CONTENT_FILES: Dict[str, str] = {
+    "scenes": "scenes.json",
+    "characters": "characters.json",
+    "abilities": "abilities.json",
+    "quests": "quests.json",
+    "achievements": "achievements.json",
+}
+
+# Служебные ключи characters.json, которые не являются персонажами
+NON_CHARACTER_KEYS = frozenset({"metadata", "player_template"})
+
+# Цвет редкости по умолчанию
+DEFAULT_RARITY_COLOR = "#9ca3af"
+
+# Строки не длиннее этого интернируются при заморозке контента
+INTERN_MAX_LENGTH = 64
+
+
+# ============================================================================
+# FROZEN CONTAINERS
+# ============================================================================
+
+class FrozenDict(dict):
+    """
+    Словарь только для чтения
+
+    Наследуется от dict, поэтому без дополнительной обработки
+    сериализуется json и FastAPI, но запрещает любые изменения.
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("Контент доступен только для чтения")
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    setdefault = _readonly
+    update = _readonly
+
+    def __or__(self, other: Any) -> Any:
+        # Объединение возвращает новый обычный dict
+        return dict.__or__(self, other)
+
+    def __ior__(self, other: Any) -> Any:
+        raise TypeError("Контент доступен только для чтения")
+
+    def popitem(self) -> Tuple[Any, Any]:
+        raise TypeError("Контент доступен только для чтения")
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """
+    Рекурсивно превратить JSON-данные в неизменяемые структуры
+
+    Ключи и короткие строки интернируются: ID сцен, имена характеристик
+    и типы повторяются во всех файлах и индексах и хранятся в одном экземпляре.
+    """
+    if isinstance(value, dict):
+        return FrozenDict(
+            (sys.intern(key) if isinstance(key, str) else key, freeze(item))
+            for key, item in value.items()
+        )
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, str) and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+# ============================================================================
+# VALIDATION
+# ============================================================================
+
+class ContentValidationError(ValueError):
+    """Контент не прошёл проверку и не может быть загружен"""
+
+    def __init__(self, errors: List[str]) -> None:
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+def validate_sources(sources: Mapping[str, Any]) -> None:
+    """
+    Проверить распарсенный контент перед подменой снимка
+
+    Args:
+        sources: Словарь {раздел: данные}
+
+    Raises:
+        ContentValidationError: Если контент повреждён
+    """
+    errors: List[str] = []
+
+    for section in CONTENT_FILES:
+        data = sources.get(section)
+        if not isinstance(data, dict) or not data:
+            errors.append(f"{CONTENT_FILES[section]}: пустой или некорректный файл")
+
+    scenes = sources.get("scenes")
+    if isinstance(scenes, dict) and scenes:
+        if "start" not in scenes:
+            errors.append("scenes.json: отсутствует начальная сцена 'start'")
+        for scene_id, scene in scenes.items():
+            if not isinstance(scene, dict):
+                errors.append(f"scenes.json: сцена '{scene_id}' не является объектом")
+                continue
+            choices = scene.get("choices", [])
+            if not isinstance(choices, list) or not all(
+                isinstance(choice, dict) and isinstance(choice.get("next"), str)
+                for choice in choices
+            ):
+                errors.append(f"scenes.json: некорректные выборы в сцене '{scene_id}'")
+
+    achievements = sources.get("achievements")
+    if isinstance(achievements, dict) and achievements:
+        if not isinstance(achievements.get("achievements"), dict):
+            errors.append("achievements.json: отсутствует раздел 'achievements'")
+
+    if errors:
+        raise ContentValidationError(errors)
+
+
+# ============================================================================
+# SNAPSHOT
+# ============================================================================
+
+@dataclass(frozen=True)
+class ContentSnapshot:
+    """Неизменяемый снимок контента с индексами"""
+    version: str
+    scenes: Mapping[str, Any]
+    characters: Mapping[str, Any]
+    abilities: Mapping[str, Any]
+    quests: Mapping[str, Any]
+    achievements: Mapping[str, Any]
+
+    # Индексы
+    scene_titles: Mapping[str, str]
+    endings_count: int
+    quest_index: Mapping[str, Any]
+    rarity_colors: Mapping[str, str]
+    scene_graph: SceneGraph
+    scene_analysis: SceneAnalysis
+    ability_index: AbilityIndex
+    ability_search: SearchIndex
+    quest_search: SearchIndex
+    quest_graph: QuestGraph
+    achievement_engine: AchievementRuleEngine
+
+    # Метаданные загрузки
+    generation: int = 0
+    loaded_at: float = field(default_factory=time.time)
+
+    # Сериализованные ответы этой версии (см. payload_cache)
+    payloads: Dict[str, bytes] = field(default_factory=dict, repr=False, compare=False)
+
+    def get_rarity_color(self, rarity: str) -> str:
+        """Цвет редкости достижения"""
+        return self.rarity_colors.get(rarity, DEFAULT_RARITY_COLOR)
+
+
+def build_snapshot(sources: Mapping[str, Any], version: str,
+                   generation: int = 0) -> ContentSnapshot:
+    """
+    Построить снимок контента из распарсенных JSON-данных
+
+    Args:
+        sources: Словарь {раздел: данные} для всех CONTENT_FILES
+        version: Версия контента (хэш файлов)
+        generation: Порядковый номер загрузки в этом процессе
+
+    Returns:
+        ContentSnapshot
+    """
+    scenes = freeze(sources.get("scenes") or {})
+    characters = freeze({
+        char_id: char_data
+        for char_id, char_data in (sources.get("characters") or {}).items()
+        if char_id not in NON_CHARACTER_KEYS
+    })
+    abilities = freeze(sources.get("abilities") or {})
+    quests = freeze(sources.get("quests") or {})
+    achievements = freeze(
+        sources.get("achievements") or {"achievements": {}, "categories": {}, "rarity": {}}
+    )
+
+    scene_titles = FrozenDict(
+        (scene_id, scene_data.get("title", "Без названия"))
+        for scene_id, scene_data in scenes.items()
+    )
+    endings_count = sum(
+        1 for scene_data in scenes.values()
+        if "конец" in scene_data.get("title", "").lower()
+    )
+    quest_index = FrozenDict(
+        (quest_id, quest) for quest_id, quest in quests.items() if quest_id != "metadata"
+    )
+    scene_graph = build_scene_graph(scenes)
+    rarity_colors = FrozenDict(
+        (rarity, info.get("color", DEFAULT_RARITY_COLOR))
+        for rarity, info in achievements.get("rarity", {}).items()
+    )
+
+    return ContentSnapshot(
+        version=version,
+        scenes=scenes,
+        characters=characters,
+        abilities=abilities,
+        quests=quests,
+        achievements=achievements,
+        scene_titles=scene_titles,
+        endings_count=endings_count,
+        quest_index=quest_index,
+        rarity_colors=rarity_colors,
+        scene_graph=scene_graph,
+        scene_analysis=build_scene_analysis(scene_graph, INITIAL_STATS),
+        ability_index=build_ability_index(abilities),
+        ability_search=build_ability_search(abilities),
+        quest_search=build_quest_search(quests),
+        quest_graph=build_quest_graph(quests),
+        achievement_engine=build_achievement_engine(
+            achievements.get("achievements", {}), rarity_colors, DEFAULT_RARITY_COLOR
+        ),
+        generation=generation,
+    )
+
+
+# ============================================================================
+# CONTENT STORE
+# ============================================================================
+
+class ContentStore:
+    """
+    Хранилище контента
+
+    Держит ссылку на текущий снимок. Снимок строится лениво
+    при первом обращении (из бандла, если он актуален) или явно
+    через reload() (всегда из JSON).
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR, use_bundle: Optional[bool] = None) -> None:
+        self._data_dir: Path = data_dir
+        self._use_bundle: bool = (
+            settings.content_bundle_enabled if use_bundle is None else use_bundle
+        )
+        # Откуда загружен текущий снимок: "bundle" или "json"
+        self._source: Optional[str] = None
+        self._snapshot: Optional[ContentSnapshot] = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._generation: int = 0
+        self._last_error: Optional[str] = None
+        self._runtime_files: Dict[Path, Tuple[float, Any]] = {}
+
+    @property
+    def data_dir(self) -> Path:
+        """Каталог с файлами контента"""
+        return self._data_dir
+
+    @property
+    def bundle_path(self) -> Path:
+        """Путь к бинарному бандлу контента"""
+        return self._data_dir / BUNDLE_FILENAME
+
+    def _read_files(self) -> Tuple[Dict[str, bytes], str, List[str]]:
+        """
+        Прочитать файлы контента без парсинга
+
+        Returns:
+            Кортеж (байты по разделам, хэш содержимого, ошибки)
+        """
+        digest = hashlib.sha256()
+        raw_files: Dict[str, bytes] = {}
+        errors: List[str] = []
+
+        for section, filename in CONTENT_FILES.items():
+            filepath = self._data_dir / filename
+            try:
+                raw = filepath.read_bytes()
+            except FileNotFoundError:
+                logger.error(f"❌ Файл не найден: {filepath}")
+                errors.append(f"{filename}: файл не найден")
+                continue
+
+            digest.update(filename.encode())
+            digest.update(raw)
+            raw_files[section] = raw
+
+        return raw_files, digest.hexdigest()[:16], errors
+
+    def _read_sources(self, strict: bool = False,
+                      files: Optional[Tuple[Dict[str, bytes], str, List[str]]] = None
+                      ) -> Tuple[Dict[str, Any], str]:
+        """
+        Прочитать и распарсить все файлы контента
+
+        Args:
+            strict: Бросать ContentValidationError вместо подстановки {}
+            files: Уже прочитанные файлы (результат _read_files)
+
+        Returns:
+            Кортеж (данные по разделам, хэш содержимого)
+        """
+        raw_files, version, errors = files or self._read_files()
+        errors = list(errors)
+        sources: Dict[str, Any] = {}
+
+        for section, filename in CONTENT_FILES.items():
+            raw = raw_files.get(section)
+            if raw is None:
+                sources[section] = {}
+                continue
+            try:
+                sources[section] = json.loads(raw.decode("utf-8-sig"))
+                logger.info(f"✅ Загружен файл: {filename}")
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                logger.error(f"❌ Ошибка парсинга JSON в {filename}: {e}")
+                errors.append(f"{filename}: {e}")
+                sources[section] = {}
+
+        if strict and errors:
+            raise ContentValidationError(errors)
+
+        return sources, version
+
+    def _next_generation(self) -> int:
+        self._generation += 1
+        return self._generation
+
+    def _build(self) -> ContentSnapshot:
+        """
+        Загрузить контент и построить снимок (без проверки)
+
+        Сначала пробуется бинарный бандл: если его версия совпадает
+        с хэшем JSON-файлов, снимок восстанавливается без парсинга
+        и построения индексов. Иначе снимок строится из JSON.
+        """
+        files = self._read_files()
+        generation = self._next_generation()
+        if self._use_bundle:
+            snapshot = load_bundle(self.bundle_path, files[1], generation)
+            if snapshot is not None:
+                self._source = "bundle"
+                return snapshot
+
+        sources, version = self._read_sources(files=files)
+        self._source = "json"
+        return build_snapshot(sources, version, generation)
+
+    @property
+    def snapshot(self) -> ContentSnapshot:
+        """Текущий снимок контента"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build()
+                snapshot = self._snapshot
+        return snapshot
+
+    def ensure_loaded(self) -> ContentSnapshot:
+        """Загрузить контент, если он ещё не загружен"""
+        return self.snapshot
+
+    @property
+    def is_loaded(self) -> bool:
+        """Загружен ли контент"""
+        return self._snapshot is not None
+
+    @property
+    def version(self) -> str:
+        """Версия текущего снимка"""
+        return self.snapshot.version
+
+    @property
+    def last_error(self) -> Optional[str]:
+        """Ошибка последней неудачной перезагрузки"""
+        return self._last_error
+
+    def reload(self) -> ContentSnapshot:
+        """
+        Перечитать контент и атомарно заменить снимок
+
+        Новый снимок строится и проверяется вне блокировки чтения.
+        Если контент не проходит проверку, текущий снимок остаётся.
+
+        Returns:
+            Актуальный снимок
+
+        Raises:
+            ContentValidationError: Если новый контент повреждён
+        """
+        with self._reload_lock:
+            try:
+                sources, version = self._read_sources(strict=True)
+                validate_sources(sources)
+            except ContentValidationError as e:
+                self._last_error = str(e)
+                logger.error(f"❌ Контент не прошёл проверку, оставлена прежняя версия: {e}")
+                raise
+
+            current = self._snapshot
+            if current is not None and current.version == version:
+                self._last_error = None
+                return current
+
+            snapshot = build_snapshot(sources, version, self._next_generation())
+            # Подмена одной операцией присваивания
+            self._snapshot = snapshot
+            self._source = "json"
+            self._last_error = None
+
+        logger.info(
+            f"🔄 Контент загружен (версия {snapshot.version}, поколение {snapshot.generation})"
+        )
+        return snapshot
+
+    async def reload_async(self) -> ContentSnapshot:
+        """Перезагрузить контент в отдельном потоке, не блокируя event loop"""
+        return await asyncio.to_thread(self.reload)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Состояние хранилища"""
+        snapshot = self._snapshot
+        return {
+            "loaded": snapshot is not None,
+            "version": snapshot.version if snapshot else None,
+            "generation": snapshot.generation if snapshot else 0,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "source": self._source,
+            "last_error": self._last_error,
+        }
+
+    def read_runtime_json(self, filepath: Path) -> Any:
+        """
+        Прочитать изменяемый JSON-файл (статистика, пользователи)
+
+        Файл парсится заново только при изменении mtime.
+
+        Args:
+            filepath: Путь к JSON файлу
+
+        Returns:
+            Данные из файла или пустой словарь
+        """
+        try:
+            mtime = filepath.stat().st_mtime
+        except OSError:
+            self._runtime_files.pop(filepath, None)
+            return {}
+
+        cached = self._runtime_files.get(filepath)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            data = freeze(json.loads(filepath.read_bytes().decode("utf-8-sig")))
+        except Exception as e:
+            logger.error(f"Ошибка загрузки {filepath.name}: {e}")
+            data = {}
+
+        self._runtime_files[filepath] = (mtime, data)
+        return data
+
+
+# ============================================================================
+# CONTENT WATCHER
+# ============================================================================
+
+class ContentWatcher:
+    """
+    Наблюдатель за файлами app/data/*.json
+
+    Периодически сравнивает mtime и размер файлов. Когда изменения
+    затихли (два одинаковых опроса подряд), перестраивает снимок
+    в отдельном потоке.
+    """
+
+    def __init__(self, store: "ContentStore", interval: float = 2.0) -> None:
+        self._store = store
+        self._interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def _signature(self) -> Tuple[Tuple[str, int, int], ...]:
+        """Отпечаток файлов контента"""
+        signature = []
+        for filename in CONTENT_FILES.values():
+            try:
+                stat = (self._store.data_dir / filename).stat()
+                signature.append((filename, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((filename, 0, 0))
+        return tuple(signature)
+
+    async def _watch_loop(self) -> None:
+        loaded = self._signature()
+        pending: Optional[Tuple[Tuple[str, int, int], ...]] = None
+
+        while True:
+            try:
+                await asyncio.sleep(self._interval)
+                current = self._signature()
+
+                if current == loaded:
+                    pending = None
+                    continue
+                if current != pending:
+                    # Файлы ещё пишутся - ждём следующего опроса
+                    pending = current
+                    continue
+
+                logger.info("👀 Обнаружено изменение контента, перезагрузка...")
+                try:
+                    await self._store.reload_async()
+                except ContentValidationError:
+                    pass
+                loaded = current
+                pending = None
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Content watcher error: {e}")
+
+    @property
+    def running(self) -> bool:
+        """Запущен ли наблюдатель"""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Запуск наблюдения"""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._watch_loop())
+        logger.info(f"👀 Наблюдение за контентом запущено (каждые {self._interval} сек)")
+
+    async def stop(self) -> None:
+        """Остановка наблюдения"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("👀 Наблюдение за контентом остановлено")
+
+
+# Глобальный экземпляр хранилища
+content_store: ContentStore = ContentStore()
+
+
+def get_content() -> ContentSnapshot:
+    """Получить текущий снимок контента"""
+    return content_store.snapshot
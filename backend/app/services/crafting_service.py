@@ -174,6 +174,33 @@ class CraftingManager:
             skill: CraftingStats() for skill in CraftingSkill
         }
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Рецепты и прогресс навыков в JSON-формате"""
+        return {
+            "recipes": [recipe.model_dump(mode="json") for recipe in self.recipes.values()],
+            "skill_levels": {skill.value: level for skill, level in self.skill_levels.items()},
+            "skill_exp": {skill.value: exp for skill, exp in self.skill_exp.items()},
+            "stats": {skill.value: stats.model_dump() for skill, stats in self.stats.items()},
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CraftingManager":
+        """Менеджер из JSON-формата (ошибка валидации для неверных данных)"""
+        crafting = cls()
+        for raw in data["recipes"]:
+            crafting.add_recipe(CraftingRecipe.model_validate(raw))
+        crafting.skill_levels.update(
+            (CraftingSkill(skill), int(level)) for skill, level in data["skill_levels"].items()
+        )
+        crafting.skill_exp.update(
+            (CraftingSkill(skill), int(exp)) for skill, exp in data["skill_exp"].items()
+        )
+        crafting.stats.update(
+            (CraftingSkill(skill), CraftingStats.model_validate(stats))
+            for skill, stats in data["stats"].items()
+        )
+        return crafting
+    
     def add_recipe(self, recipe: CraftingRecipe) -> None:
         """Добавить рецепт"""
         self.recipes[recipe.id] = recipe
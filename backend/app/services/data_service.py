@@ -2,87 +2,59 @@
 StarCourier Web - Data Service
 Сервис для загрузки и кэширования данных игры
 
+Данные хранятся в ContentStore, DataService - фасад над ним.
+При старте предпочитается бинарный бандл контента (app/data/content.bundle),
+если он соответствует JSON-файлам; иначе данные читаются из JSON.
+
 Автор: QuadDarv1ne
-Версия: 1.1.0
+Версия: 1.2.0
 """
 
-import json
 import logging
-from pathlib import Path
-from typing import Dict, Optional, Any
-from functools import lru_cache
+from typing import Dict, Optional, Any, Mapping
 
-logger = logging.getLogger(__name__)
+from app.services.content_store import ContentStore, ContentValidationError, content_store
+from app.services.player_state import INITIAL_STATS
 
-# Базовый путь к данным
-DATA_DIR: Path = Path(__file__).parent.parent / "data"
+logger = logging.getLogger(__name__)
 
 
 class DataService:
     """Сервис для работы с данными игры"""
 
-    def __init__(self) -> None:
-        self._scenes_cache: Optional[Dict[str, Any]] = None
-        self._characters_cache: Optional[Dict[str, Any]] = None
-        self._cache_valid: bool = False
+    def __init__(self, store: ContentStore = content_store) -> None:
+        self._store: ContentStore = store
 
-    def _load_json(self, filename: str) -> Dict[str, Any]:
-        """Загрузка JSON файла"""
-        filepath = DATA_DIR / filename
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            logger.info(f"✅ Загружен файл: {filename}")
-            return data
-        except FileNotFoundError:
-            logger.error(f"❌ Файл не найден: {filepath}")
-            return {}
-        except json.JSONDecodeError as e:
-            logger.error(f"❌ Ошибка парсинга JSON в {filename}: {e}")
-            return {}
-
-    def get_scenes(self) -> Dict[str, Any]:
+    @property
+    def store(self) -> ContentStore:
+        """Хранилище контента"""
+        return self._store
+
+    def get_scenes(self) -> Mapping[str, Any]:
         """Получить все сцены"""
-        if self._scenes_cache is None:
-            self._scenes_cache = self._load_json("scenes.json")
-        return self._scenes_cache
+        return self._store.snapshot.scenes
 
     def get_scene(self, scene_id: str) -> Optional[Dict[str, Any]]:
         """Получить конкретную сцену по ID"""
         scenes = self.get_scenes()
         return scenes.get(scene_id)
 
-    def get_characters(self) -> Dict[str, Any]:
+    def get_characters(self) -> Mapping[str, Any]:
         """Получить всех персонажей"""
-        if self._characters_cache is None:
-            self._characters_cache = self._load_json("characters.json")
-        return self._characters_cache
+        return self._store.snapshot.characters
 
     def get_character(self, character_id: str) -> Optional[Dict[str, Any]]:
         """Получить конкретного персонажа по ID"""
         characters = self.get_characters()
         return characters.get(character_id)
 
-    def get_scene_list(self) -> Dict[str, str]:
+    def get_scene_list(self) -> Mapping[str, str]:
         """Получить список всех сцен (ID + название)"""
-        scenes = self.get_scenes()
-        return {scene_id: scene_data.get("title", "Без названия")
-                for scene_id, scene_data in scenes.items()}
+        return self._store.snapshot.scene_titles
 
     def get_initial_stats(self) -> Dict[str, int]:
         """Получить начальную статистику игрока"""
-        return {
-            "health": 100,
-            "morale": 75,
-            "knowledge": 30,
-            "team": 50,
-            "danger": 0,
-            "security": 20,
-            "fuel": 100,
-            "money": 1000,
-            "psychic": 0,
-            "trust": 50
-        }
+        return dict(INITIAL_STATS)
 
     def get_initial_relationships(self) -> Dict[str, int]:
         """Получить начальные отношения с персонажами"""
@@ -94,19 +66,34 @@ class DataService:
         }
 
     def clear_cache(self) -> None:
-        """Очистить кэш"""
-        self._scenes_cache = None
-        self._characters_cache = None
-        self._cache_valid = False
-        logger.info("🗑️ Кэш данных очищен")
-
-    def reload_data(self) -> None:
-        """Перезагрузить все данные"""
-        self.clear_cache()
-        self.get_scenes()
-        self.get_characters()
-        self._cache_valid = True
+        """Очистить кэш
+
+        Снимок не обнуляется: контент перечитывается и подменяется атомарно,
+        чтобы параллельные запросы не увидели пустые данные.
+        """
+        self.reload_data()
+
+    def load_data(self) -> None:
+        """Загрузить данные при старте (из бандла, если он актуален)"""
+        self._store.ensure_loaded()
+        logger.info(f"📦 Источник контента: {self._store.get_status()['source']}")
+
+    def reload_data(self) -> bool:
+        """
+        Перезагрузить все данные
+
+        Returns:
+            False если новый контент не прошёл проверку (остался прежний)
+        """
+        try:
+            self._store.reload()
+        except ContentValidationError as e:
+            logger.error(f"❌ Перезагрузка данных отклонена: {'; '.join(e.errors)}")
+            # Остаётся прежний снимок; при первом запуске загружаем как есть
+            self._store.ensure_loaded()
+            return False
         logger.info("🔄 Данные перезагружены")
+        return True
 
 
 # Глобальный экземпляр сервиса
@@ -114,7 +101,7 @@ data_service: DataService = DataService()
 
 
 # Удобные функции-обёртки
-def get_scenes() -> Dict[str, Any]:
+def get_scenes() -> Mapping[str, Any]:
     """Получить все сцены"""
     return data_service.get_scenes()
 
@@ -124,7 +111,7 @@ def get_scene(scene_id: str) -> Optional[Dict[str, Any]]:
     return data_service.get_scene(scene_id)
 
 
-def get_characters() -> Dict[str, Any]:
+def get_characters() -> Mapping[str, Any]:
     """Получить всех персонажей"""
     return data_service.get_characters()
 
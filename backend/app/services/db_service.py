@@ -9,15 +9,15 @@ StarCourier Web - Database Service
 import logging
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
-from sqlalchemy import select, update, delete, and_, or_, func, desc
+from sqlalchemy import select, insert, update, delete, and_, or_, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.database.models import (
     User, PlayerStats, GameSession, Achievement, 
-    AnalyticsEvent, LeaderboardEntry, RateLimitEntry
+    AnalyticsEvent, LeaderboardEntry, RateLimitEntry, GameEvent, GAME_EVENT_START
 )
 from app.database.connection import get_or_create
 
@@ -196,6 +196,177 @@ class PlayerStatsService:
         return stats
 
 
+# ============================================================================
+# GAME STATE SERVICE
+# ============================================================================
+
+# Владелец записей PlayerStats для анонимных игр /api/game.
+# Зарезервирован: регистрация выдаёт uuid4 (нулевой UUID невозможен),
+# а username и email не проходят проверку формата при регистрации
+GUEST_USER_ID = "00000000-0000-0000-0000-000000000000"
+GUEST_USERNAME = "~guest"
+GUEST_EMAIL = "~guest@starcourier.invalid"
+
+# Поля состояния /api/game, которые хранятся в одноимённых колонках PlayerStats
+GAME_STATE_COLUMNS = (
+    "current_scene", "stats", "relationships", "inventory",
+    "choices_made", "visited_scenes", "ending_type", "achievements_unlocked",
+)
+
+
+class GameStateService:
+    """
+    Сохранение состояния игр /api/game в PlayerStats
+
+    Игрок /api/game идентифицируется только player_id, переданным клиентом,
+    поэтому сервис видит лишь записи гостевого пользователя (GUEST_USER_ID):
+    сохранения зарегистрированных пользователей с тем же player_id
+    не читаются, не перезаписываются и не удаляются.
+    """
+
+    @staticmethod
+    async def get_guest_user_id(session: AsyncSession) -> str:
+        """ID гостевого пользователя (создаётся при первом обращении)"""
+        await get_or_create(
+            session, User,
+            defaults={
+                "username": GUEST_USERNAME,
+                "email": GUEST_EMAIL,
+                "password_hash": "!",
+                "display_name": "Гость",
+            },
+            id=GUEST_USER_ID,
+        )
+        return GUEST_USER_ID
+
+    @staticmethod
+    async def save_states(session: AsyncSession, states: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Сохранить состояния нескольких игроков одной транзакцией
+
+        Args:
+            session: Сессия БД
+            states: player_id -> состояние игры
+
+        Returns:
+            Количество сохранённых записей (player_id, занятые
+            зарегистрированными пользователями, пропускаются)
+        """
+        if not states:
+            return 0
+
+        # player_id уникален среди всех пользователей: выбираем все записи,
+        # чтобы не создать дубликат чужого player_id
+        stmt = select(PlayerStats).where(PlayerStats.player_id.in_(list(states)))
+        existing = {str(row.player_id): row for row in (await session.execute(stmt)).scalars()}
+        guest_id = None
+        now = datetime.utcnow()
+        saved = 0
+
+        for player_id, state in states.items():
+            row = existing.get(player_id)
+            if row is not None and row.user_id != GUEST_USER_ID:
+                logger.warning(f"⚠️ player_id {player_id} занят пользователем, игра не сохранена")
+                continue
+            if row is None:
+                if guest_id is None:
+                    guest_id = await GameStateService.get_guest_user_id(session)
+                row = PlayerStats(id=str(uuid.uuid4()), user_id=guest_id, player_id=player_id)
+                session.add(row)
+
+            for column in GAME_STATE_COLUMNS:
+                if column in state:
+                    setattr(row, column, state[column])
+            row.flags = {**(row.flags or {}), "started_at": state.get("started_at")}
+            row.updated_at = now
+            saved += 1
+
+        await session.flush()
+        return saved
+
+    @staticmethod
+    async def load_state(session: AsyncSession, player_id: str) -> Optional[Dict[str, Any]]:
+        """Загрузить сохранённое состояние игры (None, если его нет)"""
+        result = await session.execute(
+            select(PlayerStats).where(
+                PlayerStats.player_id == player_id,
+                PlayerStats.user_id == GUEST_USER_ID
+            )
+        )
+        row = result.scalar_one_or_none()
+        if row is None:
+            return None
+
+        state = {column: getattr(row, column) for column in GAME_STATE_COLUMNS}
+        state["stats"] = dict(state["stats"] or {})
+        state["relationships"] = dict(state["relationships"] or {})
+        state["inventory"] = list(state["inventory"] or [])
+        state["visited_scenes"] = list(state["visited_scenes"] or [])
+        state["achievements_unlocked"] = list(state["achievements_unlocked"] or [])
+        state["choices_made"] = state["choices_made"] or 0
+        state["started_at"] = (getattr(row, "flags") or {}).get("started_at")
+        return state
+
+    @staticmethod
+    async def delete_state(session: AsyncSession, player_id: str) -> bool:
+        """Удалить сохранённое состояние игры"""
+        result = await session.execute(
+            delete(PlayerStats).where(
+                PlayerStats.player_id == player_id,
+                PlayerStats.user_id == GUEST_USER_ID
+            )
+        )
+        return result.rowcount > 0
+
+
+# ============================================================================
+# GAME EVENT SERVICE
+# ============================================================================
+
+class GameEventService:
+    """Журнал событий игр /api/game"""
+
+    @staticmethod
+    async def add_events(session: AsyncSession, events: List[Dict[str, Any]]) -> int:
+        """Добавить события одной вставкой"""
+        if not events:
+            return 0
+        await session.execute(insert(GameEvent), events)
+        return len(events)
+
+    @staticmethod
+    async def get_last_game(session: AsyncSession, player_id: str) -> List[Tuple[Any, ...]]:
+        """
+        События последней игры игрока
+
+        Returns:
+            Кортежи (kind, scene, choice, created_at) начиная с последнего
+            начала игры (пусто, если его нет)
+        """
+        start_id = (await session.execute(
+            select(func.max(GameEvent.id)).where(
+                and_(GameEvent.player_id == player_id, GameEvent.kind == GAME_EVENT_START)
+            )
+        )).scalar()
+        if start_id is None:
+            return []
+
+        stmt = (
+            select(GameEvent.kind, GameEvent.scene, GameEvent.choice, GameEvent.created_at)
+            .where(and_(GameEvent.player_id == player_id, GameEvent.id >= start_id))
+            .order_by(GameEvent.id)
+        )
+        return [tuple(row) for row in (await session.execute(stmt)).all()]
+
+    @staticmethod
+    async def delete_events(session: AsyncSession, player_id: str) -> int:
+        """Удалить события игрока"""
+        result = await session.execute(
+            delete(GameEvent).where(GameEvent.player_id == player_id)
+        )
+        return result.rowcount
+
+
 # ============================================================================
 # GAME SESSION SERVICE
 # ============================================================================
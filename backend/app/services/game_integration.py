@@ -4,12 +4,14 @@
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Any
 from dataclasses import dataclass, field
 
 from app.services.inventory_service import InventoryManager, Item, create_starter_items
 from app.services.crafting_service import CraftingManager, create_starter_recipes
-from app.services.combat_service import CombatManager, create_player_combatant
+from app.services.combat_service import CombatManager, CombatState, create_player_combatant
+from app.services.session_store import NS_INTEGRATION, SessionStore, register_codec, session_store
 
 logger = logging.getLogger('game_integration')
 
@@ -37,6 +39,35 @@ class PlayerGameData:
                 self.crafting.add_recipe(recipe)
         if self.combat is None:
             self.combat = CombatManager()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Данные игрока в JSON-формате"""
+        return {
+            'player_id': self.player_id,
+            'stats': dict(self.stats),
+            'inventory': self.inventory.to_dict(),
+            'crafting': self.crafting.to_dict(),
+            'combats': [combat.model_dump(mode='json') for combat in self.combat.combats.values()]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlayerGameData":
+        """Данные игрока из JSON-формата (ошибка для неверных данных)"""
+        combat = CombatManager()
+        for raw in data['combats']:
+            state = CombatState.model_validate(raw)
+            combat.combats[state.id] = state
+        return cls(
+            player_id=str(data['player_id']),
+            stats={str(stat): int(value) for stat, value in data['stats'].items()},
+            inventory=InventoryManager.from_dict(data['inventory']),
+            crafting=CraftingManager.from_dict(data['crafting']),
+            combat=combat
+        )
+
+
+# Игроки в общем хранилище сессий сериализуются в JSON
+register_codec(NS_INTEGRATION, PlayerGameData.to_dict, PlayerGameData.from_dict)
 
 
 class GameIntegrationService:
@@ -48,10 +79,57 @@ class GameIntegrationService:
     - Крафт
     - Бой
     - Основную статистику
+    
+    Игроки хранятся в общем хранилище сессий: обработчик загружает
+    игрока (load_player), работает с ним и записывает обратно (save_player).
+    
+    Args:
+        sessions: Хранилище сессий (None - игроки только в памяти сервиса)
     """
     
-    def __init__(self):
+    def __init__(self, sessions: Optional[SessionStore] = None):
         self.players: Dict[str, PlayerGameData] = {}
+        self.sessions = sessions
+    
+    async def load_player(self, player_id: str) -> PlayerGameData:
+        """Загрузить игрока из хранилища сессий (или создать нового)"""
+        if self.sessions is not None:
+            player = await self.sessions.get(NS_INTEGRATION, player_id)
+            if player is not None:
+                self.players[player_id] = player
+            else:
+                self.players.pop(player_id, None)
+        return self.get_or_create_player(player_id)
+    
+    async def save_player(self, player_id: str) -> bool:
+        """Записать игрока в хранилище сессий и отпустить его из памяти сервиса"""
+        if self.sessions is None:
+            return player_id in self.players
+        player = self.players.pop(player_id, None)
+        if player is None:
+            return False
+        return await self.sessions.set(NS_INTEGRATION, player_id, player)
+    
+    def release_player(self, player_id: str) -> None:
+        """Отпустить загруженного игрока без записи"""
+        if self.sessions is not None:
+            self.players.pop(player_id, None)
+    
+    @asynccontextmanager
+    async def use_player(self, player_id: str) -> AsyncIterator[PlayerGameData]:
+        """
+        Игрок для обработчика: загружается и всегда отпускается из памяти сервиса
+        
+        При успешном выходе игрок записывается в хранилище сессий,
+        при исключении отбрасывается без записи.
+        """
+        player = await self.load_player(player_id)
+        try:
+            yield player
+        except BaseException:
+            self.release_player(player_id)
+            raise
+        await self.save_player(player_id)
     
     def get_or_create_player(self, player_id: str) -> PlayerGameData:
         """Получить или создать игрока"""
@@ -167,7 +245,7 @@ class GameIntegrationService:
 
 
 # Глобальный экземпляр
-game_integration = GameIntegrationService()
+game_integration = GameIntegrationService(sessions=session_store)
 
 
 def get_game_integration() -> GameIntegrationService:
@@ -0,0 +1,448 @@
+"""
+StarCourier Web - Game Event Log
+Журнал событий игр /api/game со снимками состояния
+
+Каждый /start и /choose записывается компактным событием
+(игрок, индекс сцены, номер выбора, время) в таблицу game_events.
+События копятся в памяти и пишутся пачкой одной вставкой — по таймеру
+(game_event_flush_interval) и при накоплении game_event_batch_size.
+
+Полное состояние (снимок в PlayerStats) нужно только раз в
+game_snapshot_interval событий игрока, при его вытеснении и после
+выбора без номера (next_scene/stats от клиента), который нельзя
+повторить по таблице переходов.
+
+Игрок, которого нет в памяти (вытеснен или потерян при перезапуске),
+восстанавливается лениво при первом запросе: последний снимок +
+повтор событий его последней игры после снимка. Тот же журнал
+служит источником для аналитики прохождений.
+
+Если БД долго недоступна и буфер переполняется, старые события
+отбрасываются; для их игроков нужен полный снимок (on_drop).
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from app.config import settings
+from app.database.models import GAME_EVENT_CHOICE, GAME_EVENT_START
+from app.services.player_state import PlayerState, new_player_state
+from app.services.scene_graph import MISSING_SCENE, SceneGraph
+
+logger = logging.getLogger(__name__)
+
+# Начало новой игры
+START_SCENE = "start"
+STARTING_INVENTORY = ("Брекер кодов", "Боевой нож")
+
+# Номер выбора для переходов, заданных клиентом (next_scene/stats)
+NO_CHOICE = -1
+
+
+class LoggedEvent(NamedTuple):
+    """Событие журнала"""
+    kind: int
+    scene: int
+    choice: int
+    created_at: datetime
+
+
+def new_game_state(started_at: str) -> PlayerState:
+    """Состояние новой игры /api/game"""
+    from app.services.content_store import get_content
+    from app.services.data_service import data_service
+
+    return new_player_state(
+        stats=data_service.get_initial_stats(),
+        relationships=data_service.get_initial_relationships(),
+        graph=get_content().scene_graph,
+        start_scene=START_SCENE,
+        inventory=list(STARTING_INVENTORY),
+        started_at=started_at
+    )
+
+
+# ============================================================================
+# REPLAY
+# ============================================================================
+
+def apply_event(player: PlayerState, event: LoggedEvent, graph: SceneGraph) -> bool:
+    """
+    Повторить выбор из журнала
+
+    Returns:
+        False если событие нельзя повторить (выбор без номера или
+        сцена игрока не совпадает с записанной - контент изменился)
+    """
+    if event.choice == NO_CHOICE:
+        return False
+    node = graph.get(player.current_scene)
+    if node is None or node.index != event.scene:
+        return False
+    transition = node.transition(event.choice)
+    if transition is None or transition.target == MISSING_SCENE:
+        return False
+
+    player.stats.apply_deltas(transition.stats)
+    player.enter_scene(transition.next_scene, graph.nodes[transition.target].ending_type)
+    return True
+
+
+def replay(snapshot: Optional[PlayerState], events: Sequence[LoggedEvent],
+           graph: SceneGraph) -> Optional[PlayerState]:
+    """
+    Восстановить состояние по снимку и событиям последней игры
+
+    Args:
+        snapshot: Последний снимок (None, если его нет)
+        events: События последней игры, начиная с её начала
+        graph: Граф сцен текущего снимка контента
+
+    Returns:
+        Состояние игрока или None
+    """
+    if not events or events[0].kind != GAME_EVENT_START:
+        return snapshot
+
+    started_at = events[0].created_at.isoformat()
+    if snapshot is not None and snapshot.started_at == started_at:
+        # Снимок этой же игры: повторяются только выборы после него
+        player, skip = snapshot, snapshot.choices_made
+    elif snapshot is not None and (snapshot.started_at or "") > started_at:
+        # Начало более новой игры не успело попасть в журнал
+        return snapshot
+    else:
+        player, skip = new_game_state(started_at), 0
+
+    for event in events[1 + skip:]:
+        if not apply_event(player, event, graph):
+            logger.warning(
+                f"⚠️ Журнал игрока: событие не повторено, состояние восстановлено "
+                f"до {player.choices_made} выборов"
+            )
+            break
+    return player
+
+
+# ============================================================================
+# STORAGE
+# ============================================================================
+
+class GameEventStorage:
+    """Хранение событий в таблице game_events"""
+
+    async def save_many(self, events: List[Dict[str, Any]]) -> int:
+        """Записать события одной вставкой"""
+        from app.database.connection import database
+        from app.services.db_service import GameEventService
+
+        async with database.get_session() as session:
+            return await GameEventService.add_events(session, events)
+
+    async def load_last_game(self, player_id: str) -> List[LoggedEvent]:
+        """События последней игры игрока"""
+        from app.database.connection import database
+        from app.services.db_service import GameEventService
+
+        async with database.get_session() as session:
+            rows = await GameEventService.get_last_game(session, player_id)
+            return [LoggedEvent(*row) for row in rows]
+
+    async def delete(self, player_id: str) -> bool:
+        """Удалить события игрока"""
+        from app.database.connection import database
+        from app.services.db_service import GameEventService
+
+        async with database.get_session() as session:
+            return await GameEventService.delete_events(session, player_id) > 0
+
+
+# ============================================================================
+# EVENT LOG
+# ============================================================================
+
+class GameEventLog:
+    """
+    Буферизованный журнал событий игр
+
+    record_start/record_choice возвращают, нужно ли сохранить снимок
+    состояния игрока; с выключенным журналом - всегда True, и прогресс
+    сохраняется целиком, как раньше.
+
+    Args:
+        enabled: Вести журнал
+        snapshot_interval: Событий игрока между снимками состояния
+        flush_interval: Период записи в секундах (0 - только по порогу)
+        batch_size: Событий в буфере, запускающее запись
+        storage: Хранилище событий
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        snapshot_interval: int = 20,
+        flush_interval: float = 1.0,
+        batch_size: int = 500,
+        storage: Optional[GameEventStorage] = None
+    ) -> None:
+        self.enabled = enabled
+        self.snapshot_interval = snapshot_interval
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.storage = storage if storage is not None else GameEventStorage()
+
+        self._buffer: List[Dict[str, Any]] = []
+        # Событий игрока после последнего снимка
+        self._since_snapshot: Dict[str, int] = {}
+        self._drop_handlers: List[Callable[[str], None]] = []
+
+        self._write_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+        self._stats: Dict[str, int] = {
+            "recorded": 0,
+            "snapshots": 0,
+            "flushes": 0,
+            "flushed": 0,
+            "dropped": 0,
+            "write_errors": 0,
+            "replayed": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Запись событий
+    # ------------------------------------------------------------------
+
+    def _append(self, player_id: str, kind: int, scene: int, choice: int,
+                created_at: Optional[datetime]) -> None:
+        self._buffer.append({
+            "player_id": player_id,
+            "kind": kind,
+            "scene": scene,
+            "choice": choice,
+            "created_at": created_at or datetime.now(),
+        })
+        self._stats["recorded"] += 1
+
+        # Если БД недоступна, буфер не должен расти без ограничений
+        overflow = len(self._buffer) - self.batch_size * 10
+        if overflow > 0:
+            dropped = self._buffer[:overflow]
+            del self._buffer[:overflow]
+            self._stats["dropped"] += overflow
+            logger.warning(f"⚠️ Журнал игр переполнен: отброшено событий {overflow}")
+            self._snapshot_dropped(dict.fromkeys(event["player_id"] for event in dropped))
+
+        if self.batch_size and len(self._buffer) >= self.batch_size:
+            self._schedule_flush()
+
+    def on_drop(self, handler: Callable[[str], None]) -> None:
+        """Подписаться на потерю событий игрока (нужно сохранить его снимок)"""
+        self._drop_handlers.append(handler)
+
+    def _snapshot_dropped(self, player_ids: Iterable[str]) -> None:
+        """Отброшенные события заменяются полным снимком состояния игроков"""
+        for player_id in player_ids:
+            self._since_snapshot[player_id] = 0
+            self._stats["snapshots"] += 1
+            for handler in self._drop_handlers:
+                try:
+                    handler(player_id)
+                except Exception as e:
+                    logger.error(f"❌ Ошибка обработчика потери событий игрока {player_id}: {e}")
+
+    def _snapshot_due(self, player_id: str) -> bool:
+        """Сбросить счётчик, если пора сохранить снимок"""
+        count = self._since_snapshot.get(player_id, 0) + 1
+        if count >= self.snapshot_interval:
+            self._since_snapshot[player_id] = 0
+            self._stats["snapshots"] += 1
+            return True
+        self._since_snapshot[player_id] = count
+        return False
+
+    def record_start(self, player_id: str, scene_index: int,
+                     created_at: Optional[datetime] = None) -> bool:
+        """
+        Записать начало игры
+
+        Args:
+            player_id: ID игрока
+            scene_index: Индекс начальной сцены
+            created_at: Время начала (совпадает с started_at состояния)
+
+        Returns:
+            True если нужно сохранить снимок состояния
+        """
+        if not self.enabled:
+            return True
+        self._append(player_id, GAME_EVENT_START, scene_index, NO_CHOICE, created_at)
+        self._since_snapshot[player_id] = 0
+        return False
+
+    def record_choice(self, player_id: str, scene_index: int,
+                      choice_index: Optional[int]) -> bool:
+        """
+        Записать выбор
+
+        Args:
+            player_id: ID игрока
+            scene_index: Индекс сцены, в которой сделан выбор
+            choice_index: Номер выбора (None - переход задан клиентом)
+
+        Returns:
+            True если нужно сохранить снимок состояния
+        """
+        if not self.enabled:
+            return True
+        if choice_index is None:
+            self._append(player_id, GAME_EVENT_CHOICE, scene_index, NO_CHOICE, None)
+            # Такой выбор не повторить: сохраняется снимок
+            self._since_snapshot[player_id] = 0
+            self._stats["snapshots"] += 1
+            return True
+        self._append(player_id, GAME_EVENT_CHOICE, scene_index, choice_index, None)
+        return self._snapshot_due(player_id)
+
+    def forget(self, player_id: str) -> None:
+        """Сбросить счётчик игрока (снимок сохранён при вытеснении)"""
+        self._since_snapshot.pop(player_id, None)
+
+    # ------------------------------------------------------------------
+    # Работа с БД
+    # ------------------------------------------------------------------
+
+    def _schedule_flush(self) -> None:
+        """Запустить запись в фоне (если она ещё не идёт)"""
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_task = loop.create_task(self.flush())
+
+    async def flush(self) -> int:
+        """
+        Записать накопленные события
+
+        Returns:
+            Количество записанных событий
+        """
+        async with self._write_lock:
+            if not self._buffer:
+                return 0
+            batch, self._buffer = self._buffer, []
+            try:
+                saved = await self.storage.save_many(batch)
+            except Exception as e:
+                self._stats["write_errors"] += 1
+                logger.error(f"❌ Ошибка записи журнала игр: {e}")
+                # События не потеряны: попробуем в следующий раз
+                self._buffer[:0] = batch
+                return 0
+            self._stats["flushes"] += 1
+            self._stats["flushed"] += saved
+            return saved
+
+    async def rehydrate(self, player_id: str,
+                        snapshot: Optional[PlayerState]) -> Optional[PlayerState]:
+        """
+        Состояние игрока по снимку и журналу
+
+        Args:
+            player_id: ID игрока
+            snapshot: Последний снимок из PlayerStats (None, если его нет)
+        """
+        if not self.enabled:
+            return snapshot
+        from app.services.content_store import get_content
+
+        # События игрока могли ещё не попасть в БД
+        await self.flush()
+        events = await self.storage.load_last_game(player_id)
+        if events:
+            self._stats["replayed"] += 1
+        return replay(snapshot, events, get_content().scene_graph)
+
+    async def delete(self, player_id: str) -> bool:
+        """Удалить события игрока (из буфера и БД)"""
+        self.forget(player_id)
+        # Под блокировкой: неудачная запись возвращает пачку в буфер
+        async with self._write_lock:
+            before = len(self._buffer)
+            self._buffer = [event for event in self._buffer if event["player_id"] != player_id]
+            found = len(self._buffer) < before
+            return await self.storage.delete(player_id) or found
+
+    # ------------------------------------------------------------------
+    # Фоновая запись
+    # ------------------------------------------------------------------
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Game event log flush error: {e}")
+
+    @property
+    def running(self) -> bool:
+        """Запущена ли фоновая запись"""
+        return self._loop_task is not None and not self._loop_task.done()
+
+    def start(self) -> None:
+        """Запуск фоновой записи журнала"""
+        if self.running or not self.enabled or not self.flush_interval:
+            return
+        self._loop_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"📝 Журнал игр запущен (запись каждые {self.flush_interval} сек)")
+
+    async def close(self) -> None:
+        """Остановить фоновую запись и записать оставшиеся события"""
+        if self._loop_task:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+
+        saved = await self.flush()
+        if saved:
+            logger.info(f"📝 Записано событий журнала при остановке: {saved}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика журнала"""
+        return {
+            "enabled": self.enabled,
+            "buffered": len(self._buffer),
+            "snapshot_interval": self.snapshot_interval,
+            **self._stats,
+        }
+
+
+def create_game_event_log() -> GameEventLog:
+    """Журнал событий с параметрами из настроек"""
+    return GameEventLog(
+        enabled=settings.game_event_log_enabled,
+        snapshot_interval=settings.game_snapshot_interval,
+        flush_interval=settings.game_event_flush_interval,
+        batch_size=settings.game_event_batch_size,
+    )
+
+
+# Глобальный экземпляр
+game_event_log = create_game_event_log()
@@ -205,6 +205,26 @@ class InventoryManager:
         self.items: Dict[str, InventoryItem] = {}
         self.equipped: Dict[str, InventoryItem] = {}
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Инвентарь в JSON-формате (экипировка - ссылки на предметы)"""
+        return {
+            "max_weight": self.max_weight,
+            "max_slots": self.max_slots,
+            "items": [inv_item.model_dump(mode="json") for inv_item in self.items.values()],
+            "equipped": {slot: inv_item.item.id for slot, inv_item in self.equipped.items()},
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InventoryManager":
+        """Инвентарь из JSON-формата (ошибка валидации для неверных данных)"""
+        inventory = cls(max_weight=data["max_weight"], max_slots=data["max_slots"])
+        for raw in data["items"]:
+            inv_item = InventoryItem.model_validate(raw)
+            inventory.items[inv_item.item.id] = inv_item
+        for slot, item_id in data["equipped"].items():
+            inventory.equipped[slot] = inventory.items[item_id]
+        return inventory
+    
     def get_stats(self) -> InventoryStats:
         """Получить статистику инвентаря"""
         stats = InventoryStats(
@@ -0,0 +1,96 @@
+"""
+StarCourier Web - Payload Cache
+Предсериализованные ответы для статического контента
+
+Ответы, зависящие только от контента (сцены, персонажи, списки),
+кодируются в JSON один раз на версию снимка и дальше отдаются
+готовыми байтами, минуя pydantic и json.dumps.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import json
+import logging
+from typing import Any, Callable
+
+from fastapi import Response
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Быстрый JSON-энкодер (опционально; orjson используется только при ORJSON_AVAILABLE)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+# ============================================================================
+# ENCODING
+# ============================================================================
+
+def use_fast_json() -> bool:
+    """Включён ли быстрый энкодер"""
+    return settings.fast_json_enabled and ORJSON_AVAILABLE
+
+
+def encode_json(content: Any) -> bytes:
+    """
+    Закодировать данные в JSON
+
+    Формат совпадает с JSONResponse FastAPI (UTF-8, без пробелов).
+    При fast_json_enabled и установленном orjson используется orjson.
+
+    Args:
+        content: JSON-совместимые данные
+
+    Returns:
+        Байты JSON
+    """
+    if use_fast_json():
+        return orjson.dumps(content)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+def get_payload(snapshot: Any, key: str, build: Callable[[], Any]) -> bytes:
+    """
+    Получить сериализованный ответ из кэша снимка
+
+    Кэш живёт в самом снимке, поэтому после перезагрузки контента
+    устаревшие байты уходят вместе со старым снимком.
+
+    Args:
+        snapshot: Снимок контента (ContentSnapshot)
+        key: Ключ ответа, например "scene:start"
+        build: Функция, возвращающая JSON-совместимые данные
+
+    Returns:
+        Байты JSON
+    """
+    payloads = snapshot.payloads
+    data = payloads.get(key)
+    if data is None:
+        data = encode_json(build())
+        # Гонка безопасна: оба потока кодируют одни и те же данные
+        payloads[key] = data
+    return data
+
+
+def payload_response(data: bytes, status_code: int = 200) -> Response:
+    """Ответ с готовыми JSON-байтами"""
+    return Response(content=data, status_code=status_code, media_type=JSON_MEDIA_TYPE)
@@ -0,0 +1,415 @@
+"""
+StarCourier Web - Player State
+Компактное состояние игрока /api/game
+
+Вместо словаря словарей каждый игрок хранится объектом со __slots__:
+- характеристики и отношения - массивы array("i") в фиксированном
+  порядке ключей (порядок из get_initial_stats и characters.json);
+  раскладка ключей общая для всех игроков
+- посещённые сцены - битовая маска по индексам скомпилированного
+  графа сцен, проверка посещения O(1)
+
+На границе API (ответы, PlayerStats, правила достижений) состояние
+выглядит как прежний словарь: PlayerState реализует Mapping,
+а to_dict()/from_dict() переводят его в JSON-формат и обратно.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping, MutableMapping, Set
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Границы значений характеристик и отношений
+STAT_MIN = 0
+STAT_MAX = 100
+# Значение неизвестной характеристики до первого изменения
+STAT_DEFAULT = 50
+
+# Начальные характеристики игрока
+INITIAL_STATS: Dict[str, int] = {
+    "health": 100,
+    "morale": 75,
+    "knowledge": 30,
+    "team": 50,
+    "danger": 0,
+    "security": 20,
+    "fuel": 100,
+    "money": 1000,
+    "psychic": 0,
+    "trust": 50
+}
+
+
+def clamp_stat(value: int) -> int:
+    """Ограничить значение характеристики диапазоном 0..100"""
+    return max(STAT_MIN, min(STAT_MAX, value))
+
+
+# ============================================================================
+# STAT VECTOR
+# ============================================================================
+
+class StatLayout:
+    """Порядок ключей вектора характеристик (общий для всех игроков)"""
+
+    __slots__ = ("keys", "index")
+
+    def __init__(self, keys: Tuple[str, ...]) -> None:
+        self.keys = keys
+        self.index: Dict[str, int] = {key: i for i, key in enumerate(keys)}
+
+
+@lru_cache(maxsize=64)
+def get_layout(keys: Tuple[str, ...]) -> StatLayout:
+    """Раскладка для набора ключей (одинаковые наборы разделяют объект)"""
+    return StatLayout(tuple(sys.intern(key) for key in keys))
+
+
+class StatVector(MutableMapping):
+    """
+    Словарь «характеристика -> число» поверх array("i")
+
+    Ключи вне раскладки (например, характеристика, которой нет в
+    get_initial_stats, но которая пришла в изменениях) хранятся
+    в небольшом дополнительном словаре.
+    """
+
+    __slots__ = ("layout", "_data", "extra")
+
+    def __init__(self, layout: StatLayout, values: Iterable[int],
+                 extra: Optional[Dict[str, int]] = None) -> None:
+        self.layout = layout
+        self._data = array("i", values)
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "StatVector":
+        """Вектор из словаря (раскладка - порядок ключей словаря)"""
+        return cls(get_layout(tuple(data)), data.values())
+
+    def __getitem__(self, key: str) -> int:
+        i = self.layout.index.get(key)
+        if i is not None:
+            return self._data[i]
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: int) -> None:
+        i = self.layout.index.get(key)
+        if i is not None:
+            self._data[i] = value
+            return
+        if self.extra is None:
+            self.extra = {}
+        self.extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if self.extra is None or key not in self.extra:
+            raise TypeError("Характеристики раскладки нельзя удалить")
+        del self.extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.layout.keys
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return len(self._data) + (len(self.extra) if self.extra else 0)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.layout.index or (self.extra is not None and key in self.extra)
+
+    def apply(self, changes: Optional[Mapping[str, int]]) -> bool:
+        """
+        Применить изменения с ограничением 0..100 за один проход
+
+        Семантика совпадает с apply_stat_changes: неизвестная
+        характеристика отсчитывается от 50.
+
+        Returns:
+            True если были изменения
+        """
+        if not changes:
+            return False
+        return self.apply_deltas(changes.items())
+
+    def apply_deltas(self, deltas: Iterable[Tuple[str, int]]) -> bool:
+        """
+        Применить пары (характеристика, изменение) с ограничением 0..100
+
+        Используется для заранее скомпилированных переходов сцен.
+
+        Returns:
+            True если были изменения
+        """
+        index = self.layout.index
+        data = self._data
+        changed = False
+        for key, change in deltas:
+            changed = True
+            i = index.get(key)
+            if i is not None:
+                data[i] = clamp_stat(data[i] + change)
+            else:
+                current = self.extra.get(key, STAT_DEFAULT) if self.extra else STAT_DEFAULT
+                self[key] = clamp_stat(current + change)
+        return changed
+
+    def to_dict(self) -> Dict[str, int]:
+        """Обычный словарь для JSON"""
+        data = dict(zip(self.layout.keys, self._data))
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def size_bytes(self) -> int:
+        """Оценка памяти (раскладка общая и не учитывается)"""
+        size = sys.getsizeof(self._data) + 3 * 8 + 16
+        if self.extra:
+            size += sys.getsizeof(self.extra)
+        return size
+
+
+# ============================================================================
+# VISITED SCENES
+# ============================================================================
+
+class VisitedScenes(Set):
+    """
+    Множество посещённых сцен - битовая маска по индексам графа сцен
+
+    Ссылается на индекс и список сцен графа, с которым был построен,
+    поэтому остаётся корректным после перезагрузки контента.
+    """
+
+    __slots__ = ("scene_index", "scene_ids", "mask", "extra")
+
+    def __init__(self, scene_index: Mapping[str, int], scene_ids: Tuple[str, ...],
+                 mask: int = 0, extra: Optional[List[str]] = None) -> None:
+        self.scene_index = scene_index
+        self.scene_ids = scene_ids
+        self.mask = mask
+        self.extra = extra
+
+    @classmethod
+    def for_graph(cls, graph: Any, scenes: Iterable[str] = ()) -> "VisitedScenes":
+        """Пустое (или заполненное scenes) множество для графа сцен"""
+        visited = cls(graph.index, graph.scene_ids)
+        for scene_id in scenes:
+            visited.add(scene_id)
+        return visited
+
+    def __contains__(self, scene_id: object) -> bool:
+        if not isinstance(scene_id, str):
+            return False
+        i = self.scene_index.get(scene_id)
+        if i is not None:
+            return bool(self.mask >> i & 1)
+        return self.extra is not None and scene_id in self.extra
+
+    def __iter__(self) -> Iterator[str]:
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            yield self.scene_ids[low.bit_length() - 1]
+            mask ^= low
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return self.mask.bit_count() + (len(self.extra) if self.extra else 0)
+
+    def add(self, scene_id: str) -> bool:
+        """
+        Отметить сцену посещённой
+
+        Returns:
+            True если сцена посещена впервые
+        """
+        i = self.scene_index.get(scene_id)
+        if i is not None:
+            bit = 1 << i
+            if self.mask & bit:
+                return False
+            self.mask |= bit
+            return True
+        if self.extra is None:
+            self.extra = []
+        if scene_id in self.extra:
+            return False
+        self.extra.append(scene_id)
+        return True
+
+    def add_index(self, index: int) -> bool:
+        """Отметить посещённой сцену по индексу графа"""
+        bit = 1 << index
+        if self.mask & bit:
+            return False
+        self.mask |= bit
+        return True
+
+    def to_list(self) -> List[str]:
+        """Список ID для JSON (в порядке графа сцен)"""
+        return list(self)
+
+    def size_bytes(self) -> int:
+        """Оценка памяти (граф общий и не учитывается)"""
+        size = sys.getsizeof(self.mask) + 4 * 8 + 16
+        if self.extra:
+            size += sys.getsizeof(self.extra)
+        return size
+
+
+# ============================================================================
+# PLAYER STATE
+# ============================================================================
+
+# Поля состояния в JSON-формате (и в порядке итерации Mapping)
+STATE_FIELDS = (
+    "current_scene", "stats", "relationships", "inventory", "choices_made",
+    "started_at", "visited_scenes", "ending_type", "achievements_unlocked",
+)
+
+
+class PlayerState(Mapping):
+    """
+    Состояние игрока
+
+    Атрибуты доступны напрямую (player.stats.apply(...), player.visited),
+    а чтение по ключу (player["stats"], player.get("visited_scenes"))
+    сохраняет совместимость с кодом, работавшим со словарём.
+    """
+
+    __slots__ = (
+        "current_scene", "stats", "relationships", "inventory", "choices_made",
+        "started_at", "visited", "ending_type", "achievements_unlocked",
+    )
+
+    def __init__(
+        self,
+        current_scene: str,
+        stats: StatVector,
+        relationships: StatVector,
+        visited: VisitedScenes,
+        inventory: Optional[List[str]] = None,
+        choices_made: int = 0,
+        started_at: Optional[str] = None,
+        ending_type: Optional[str] = None,
+        achievements_unlocked: Optional[List[str]] = None
+    ) -> None:
+        self.current_scene = current_scene
+        self.stats = stats
+        self.relationships = relationships
+        self.visited = visited
+        self.inventory = inventory if inventory is not None else []
+        self.choices_made = choices_made
+        self.started_at = started_at
+        self.ending_type = ending_type
+        self.achievements_unlocked = achievements_unlocked
+
+    # Mapping: поле visited_scenes соответствует атрибуту visited
+    def __getitem__(self, key: str) -> Any:
+        if key == "visited_scenes":
+            return self.visited
+        if key in STATE_FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(STATE_FIELDS)
+
+    def __len__(self) -> int:
+        return len(STATE_FIELDS)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], graph: Any) -> "PlayerState":
+        """
+        Состояние из JSON-формата (PlayerStats, старые сохранения)
+
+        Args:
+            data: Словарь состояния
+            graph: Граф сцен текущего снимка контента
+        """
+        return cls(
+            current_scene=data.get("current_scene") or "start",
+            stats=StatVector.from_dict(data.get("stats") or {}),
+            relationships=StatVector.from_dict(data.get("relationships") or {}),
+            visited=VisitedScenes.for_graph(graph, data.get("visited_scenes") or ()),
+            inventory=list(data.get("inventory") or []),
+            choices_made=data.get("choices_made") or 0,
+            started_at=data.get("started_at"),
+            ending_type=data.get("ending_type"),
+            achievements_unlocked=list(data.get("achievements_unlocked") or []) or None,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Состояние в JSON-формате (копия)"""
+        return {
+            "current_scene": self.current_scene,
+            "stats": self.stats.to_dict(),
+            "relationships": self.relationships.to_dict(),
+            "inventory": list(self.inventory),
+            "choices_made": self.choices_made,
+            "started_at": self.started_at,
+            "visited_scenes": self.visited.to_list(),
+            "ending_type": self.ending_type,
+            "achievements_unlocked": list(self.achievements_unlocked or []),
+        }
+
+    def enter_scene(self, scene_id: str, ending_type: Optional[str] = None) -> List[str]:
+        """
+        Переход в сцену после выбора
+
+        Args:
+            scene_id: ID новой сцены
+            ending_type: Тип концовки сцены (если она финальная)
+
+        Returns:
+            Изменённые поля состояния (visited_scenes, ending_type)
+        """
+        changed = []
+        self.current_scene = scene_id
+        self.choices_made += 1
+        if self.visited.add(scene_id):
+            changed.append("visited_scenes")
+        if ending_type and self.ending_type != ending_type:
+            self.ending_type = ending_type
+            changed.append("ending_type")
+        return changed
+
+    def size_bytes(self) -> int:
+        """Оценка памяти состояния"""
+        size = sys.getsizeof(self) + sys.getsizeof(self.inventory)
+        size += sum(sys.getsizeof(item) for item in self.inventory)
+        return size + self.stats.size_bytes() + self.relationships.size_bytes() \
+            + self.visited.size_bytes()
+
+
+def new_player_state(stats: Mapping[str, int], relationships: Mapping[str, int],
+                     graph: Any, start_scene: str = "start",
+                     inventory: Optional[List[str]] = None,
+                     started_at: Optional[str] = None) -> PlayerState:
+    """
+    Состояние новой игры
+
+    Args:
+        stats: Начальные характеристики (порядок ключей задаёт раскладку)
+        relationships: Начальные отношения
+        graph: Граф сцен текущего снимка контента
+        start_scene: Начальная сцена (сразу отмечается посещённой)
+        inventory: Начальный инвентарь
+        started_at: Время начала игры
+    """
+    return PlayerState(
+        current_scene=start_scene,
+        stats=StatVector.from_dict(stats),
+        relationships=StatVector.from_dict(relationships),
+        visited=VisitedScenes.for_graph(graph, (start_scene,)),
+        inventory=inventory,
+        started_at=started_at,
+    )
@@ -0,0 +1,652 @@
+"""
+StarCourier Web - Player Store
+Ограниченное хранилище состояния активных игр /api/game
+
+Состояния игроков лежат в памяти в порядке последнего обращения (LRU).
+Хранилище ограничено:
+- числом игроков (settings.max_active_games)
+- временем простоя (settings.session_timeout)
+- оценкой занимаемой памяти (settings.max_player_state_memory_mb)
+
+Вытесненные игроки сбрасываются в PlayerStats и при следующем
+запросе восстанавливаются из БД, поэтому их игру можно продолжить.
+С журналом событий (settings.game_event_log_enabled) запись PlayerStats
+служит снимком, а восстановление дополнительно повторяет события
+после него (см. game_log).
+
+При settings.save_progress_to_db изменения пишутся отложенно
+(write-behind): make_choice только помечает игрока изменённым,
+а изменённые игроки сохраняются пачкой одной транзакцией — по таймеру
+(auto_save_interval), при накоплении auto_save_batch_size изменений
+и при остановке приложения.
+
+С общим хранилищем сессий (settings.session_store_backend = sqlite/redis)
+источник истины - оно: load читает состояние оттуда, publish записывает
+изменения, поэтому запрос игрока может попасть на любой воркер.
+publish пишет только поверх версии, загруженной воркером: если игрока
+успел изменить другой воркер, запись отклоняется (StaleStateError).
+Память воркера остаётся рабочим набором; в БД при вытеснении и
+автосохранении пишется состояние из общего хранилища, а не копия воркера.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.config import settings
+from app.services.game_log import GameEventLog, game_event_log
+from app.services.player_state import PlayerState
+from app.services.session_store import NS_GAME, SessionStore, register_codec, session_store
+
+logger = logging.getLogger(__name__)
+
+# Попыток записи новой игры поверх версий других воркеров
+PUBLISH_ATTEMPTS = 3
+
+# Причины вытеснения
+EVICT_LRU = "lru"
+EVICT_IDLE = "idle"
+EVICT_MEMORY = "memory"
+
+
+def estimate_size(value: Any) -> int:
+    """Приблизительный размер JSON-подобной структуры в байтах"""
+    if isinstance(value, PlayerState):
+        return value.size_bytes()
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + estimate_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += estimate_size(item)
+    return size
+
+
+def copy_state(state: Any) -> Dict[str, Any]:
+    """Копия состояния в JSON-формате для записи"""
+    if isinstance(state, PlayerState):
+        return state.to_dict()
+    return {
+        key: value.copy() if isinstance(value, (dict, list)) else value
+        for key, value in state.items()
+    }
+
+
+def _load_session_state(data: Any) -> Dict[str, Any]:
+    """Состояние из общего хранилища сессий (только словарь с полями состояния)"""
+    if not isinstance(data, dict) or not isinstance(data.get("current_scene"), str):
+        raise ValueError("не состояние игры")
+    return data
+
+
+# В общем хранилище лежит JSON-формат состояния (PlayerState.to_dict)
+register_codec(NS_GAME, copy_state, _load_session_state)
+
+
+class StaleStateError(Exception):
+    """Состояние игрока изменено другим воркером после загрузки"""
+
+
+class GameStatePersistence:
+    """
+    Сохранение состояний игр в PlayerStats
+
+    Args:
+        event_log: Журнал событий для восстановления после снимка
+    """
+
+    def __init__(self, event_log: Optional[GameEventLog] = None) -> None:
+        self.event_log = event_log
+
+    async def save_many(self, states: Dict[str, Dict[str, Any]]) -> int:
+        """Сохранить состояния одной транзакцией"""
+        from app.database.connection import database
+        from app.services.db_service import GameStateService
+
+        async with database.get_session() as session:
+            return await GameStateService.save_states(session, states)
+
+    async def load(self, player_id: str) -> Optional[PlayerState]:
+        """Загрузить состояние игрока"""
+        from app.database.connection import database
+        from app.services.content_store import get_content
+        from app.services.db_service import GameStateService
+
+        async with database.get_session() as session:
+            data = await GameStateService.load_state(session, player_id)
+        snapshot = None if data is None else PlayerState.from_dict(data, get_content().scene_graph)
+        if self.event_log is not None:
+            return await self.event_log.rehydrate(player_id, snapshot)
+        return snapshot
+
+    async def delete(self, player_id: str) -> bool:
+        """Удалить сохранённое состояние игрока"""
+        from app.database.connection import database
+        from app.services.db_service import GameStateService
+
+        async with database.get_session() as session:
+            found = await GameStateService.delete_state(session, player_id)
+        if self.event_log is not None:
+            found = await self.event_log.delete(player_id) or found
+        return found
+
+
+class PlayerStore:
+    """
+    Хранилище состояний игроков с вытеснением
+
+    Синхронный интерфейс словаря (in, [], []=, del) работает только
+    с памятью. Асинхронные методы load/delete/spill_pending дополнительно
+    обращаются к БД: восстанавливают и сбрасывают вытесненных игроков.
+
+    Args:
+        max_players: Максимум игроков в памяти (0 - без ограничения)
+        idle_timeout: Время простоя до вытеснения в секундах (0 - без ограничения)
+        max_memory_bytes: Ограничение оценки памяти (0 - без ограничения)
+        persistence: Хранилище для вытесненных игроков (None - не сохранять)
+        write_behind: Отложенно сохранять изменённых игроков
+        flush_interval: Период автосохранения в секундах (0 - только по порогу)
+        flush_threshold: Число изменённых игроков, запускающее сохранение
+        sessions: Общее хранилище сессий воркеров (None - только память процесса)
+    """
+
+    def __init__(
+        self,
+        max_players: int = 1000,
+        idle_timeout: float = 3600,
+        max_memory_bytes: int = 0,
+        persistence: Optional[GameStatePersistence] = None,
+        write_behind: bool = False,
+        flush_interval: float = 0,
+        flush_threshold: int = 100,
+        sessions: Optional[SessionStore] = None,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_players = max_players
+        self.idle_timeout = idle_timeout
+        self.max_memory_bytes = max_memory_bytes
+        self.persistence = persistence
+        self.write_behind = write_behind and persistence is not None
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.sessions = sessions
+        self._clock = clock
+
+        # player_id -> состояние, от давно не использованных к свежим
+        self._players: "OrderedDict[str, PlayerState]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self._memory: int = 0
+
+        # Вытесненные игроки, ещё не записанные в БД
+        self._pending_spill: "OrderedDict[str, PlayerState]" = OrderedDict()
+        # Игроки в памяти, изменённые после последнего сохранения (упорядоченное множество)
+        self._dirty: Dict[str, None] = {}
+        # Версии состояний в общем хранилище, от которых отталкиваются копии в памяти
+        self._versions: Dict[str, int] = {}
+        # Обработчики вытеснения: (player_id, состояние)
+        self._evict_handlers: List[Callable[[str, PlayerState], None]] = []
+
+        self._write_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._autosave_task: Optional[asyncio.Task] = None
+
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "restored": 0,
+            "evicted_lru": 0,
+            "evicted_idle": 0,
+            "evicted_memory": 0,
+            "spilled": 0,
+            "flushes": 0,
+            "flushed": 0,
+            "write_errors": 0,
+            "published": 0,
+            "conflicts": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Интерфейс словаря
+    # ------------------------------------------------------------------
+
+    def __contains__(self, player_id: object) -> bool:
+        return player_id in self._players
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._players))
+
+    def __getitem__(self, player_id: str) -> PlayerState:
+        state = self._players[player_id]
+        self._touch(player_id)
+        return state
+
+    def __setitem__(self, player_id: str, state: PlayerState) -> None:
+        self._pending_spill.pop(player_id, None)
+        self._players[player_id] = state
+        self._touch(player_id)
+        self._resize(player_id)
+        self._enforce_limits(keep=player_id)
+
+    def __delitem__(self, player_id: str) -> None:
+        del self._players[player_id]
+        self._dirty.pop(player_id, None)
+        self._versions.pop(player_id, None)
+        self._last_access.pop(player_id, None)
+        self._memory -= self._sizes.pop(player_id, 0)
+
+    def get(self, player_id: str, default: Any = None) -> Any:
+        """Состояние игрока в памяти или default"""
+        if player_id not in self._players:
+            return default
+        return self[player_id]
+
+    # ------------------------------------------------------------------
+    # Учёт обращений и памяти
+    # ------------------------------------------------------------------
+
+    def _touch(self, player_id: str) -> None:
+        self._players.move_to_end(player_id)
+        self._last_access[player_id] = self._clock()
+
+    def _resize(self, player_id: str) -> None:
+        size = estimate_size(self._players[player_id])
+        self._memory += size - self._sizes.get(player_id, 0)
+        self._sizes[player_id] = size
+
+    def record_change(self, player_id: str, dirty: bool = True) -> None:
+        """
+        Отметить изменение состояния игрока (обращение, новый размер, запись)
+
+        Args:
+            player_id: ID игрока
+            dirty: Сохранить состояние (False - изменение уже есть в журнале событий)
+        """
+        if player_id not in self._players:
+            return
+        self._touch(player_id)
+        self._resize(player_id)
+        if dirty:
+            self.mark_dirty(player_id)
+        self._enforce_limits(keep=player_id)
+
+    def mark_dirty(self, player_id: str) -> None:
+        """Пометить игрока для отложенного сохранения"""
+        if not self.write_behind or player_id not in self._players:
+            return
+        self._dirty[player_id] = None
+        if self.flush_threshold and len(self._dirty) >= self.flush_threshold:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Запустить сохранение в фоне (если оно ещё не идёт)"""
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_task = loop.create_task(self.flush())
+
+    @property
+    def memory_bytes(self) -> int:
+        """Оценка памяти, занятой состояниями"""
+        return self._memory
+
+    # ------------------------------------------------------------------
+    # Вытеснение
+    # ------------------------------------------------------------------
+
+    def on_evict(self, handler: Callable[[str, PlayerState], None]) -> None:
+        """Подписаться на вытеснение игроков (вызывается до сброса в БД)"""
+        self._evict_handlers.append(handler)
+
+    def _evict(self, player_id: str, reason: str) -> None:
+        state = self._players[player_id]
+        del self[player_id]
+        self._stats[f"evicted_{reason}"] += 1
+
+        for handler in self._evict_handlers:
+            try:
+                handler(player_id, state)
+            except Exception as e:
+                logger.error(f"❌ Ошибка обработчика вытеснения игрока {player_id}: {e}")
+
+        if self.persistence is not None:
+            self._pending_spill[player_id] = state
+            # Если БД недоступна, очередь не должна расти без ограничений
+            while self.max_players and len(self._pending_spill) > self.max_players:
+                lost_id, _ = self._pending_spill.popitem(last=False)
+                self._stats["write_errors"] += 1
+                logger.warning(f"⚠️ Прогресс игрока {lost_id} не сохранён: переполнена очередь")
+
+        logger.debug(f"♻️ Игрок {player_id} вытеснен из памяти ({reason})")
+
+    def _enforce_limits(self, keep: Optional[str] = None) -> None:
+        """
+        Вытеснить игроков сверх ограничений
+
+        Порядок LRU совпадает с порядком простоя, поэтому просроченные
+        игроки всегда в начале очереди и проверка стоит O(вытесненных).
+        """
+        if self.idle_timeout:
+            deadline = self._clock() - self.idle_timeout
+            while self._players:
+                player_id = next(iter(self._players))
+                if player_id == keep or self._last_access[player_id] > deadline:
+                    break
+                self._evict(player_id, EVICT_IDLE)
+
+        while self.max_players and len(self._players) > self.max_players:
+            self._evict(self._oldest(keep), EVICT_LRU)
+
+        while self.max_memory_bytes and self._memory > self.max_memory_bytes and len(self._players) > 1:
+            self._evict(self._oldest(keep), EVICT_MEMORY)
+
+    def _oldest(self, keep: Optional[str]) -> str:
+        """Самый давно использованный игрок, кроме keep"""
+        for player_id in self._players:
+            if player_id != keep:
+                return player_id
+        # Остался только keep
+        return next(iter(self._players))
+
+    def sweep(self) -> int:
+        """Вытеснить простаивающих игроков; возвращает число вытесненных"""
+        before = len(self._players)
+        self._enforce_limits()
+        return before - len(self._players)
+
+    # ------------------------------------------------------------------
+    # Работа с БД
+    # ------------------------------------------------------------------
+
+    async def _write(self, include_dirty: bool) -> int:
+        """
+        Записать вытесненных (и изменённых) игроков одной транзакцией
+
+        Returns:
+            Количество записанных игроков
+        """
+        if self.persistence is None:
+            return 0
+
+        async with self._write_lock:
+            dirty = [player_id for player_id in self._dirty if player_id in self._players] \
+                if include_dirty else []
+            if not dirty and not self._pending_spill:
+                return 0
+
+            for player_id in dirty:
+                del self._dirty[player_id]
+            spilled = dict(self._pending_spill)
+            batch = {player_id: copy_state(self._players[player_id]) for player_id in dirty}
+            batch.update((player_id, copy_state(state)) for player_id, state in spilled.items())
+
+            try:
+                if self.sessions is not None:
+                    await self._use_shared_states(self.sessions, batch)
+                saved = await self.persistence.save_many(batch)
+            except Exception as e:
+                self._stats["write_errors"] += 1
+                logger.error(f"❌ Ошибка сохранения состояния игроков: {e}")
+                # Изменения не потеряны: попробуем в следующий раз
+                for player_id in dirty:
+                    if player_id in self._players:
+                        self._dirty[player_id] = None
+                return 0
+
+            for player_id, state in spilled.items():
+                if self._pending_spill.get(player_id) is state:
+                    del self._pending_spill[player_id]
+            self._stats["spilled"] += len(spilled)
+            if dirty:
+                self._stats["flushes"] += 1
+                self._stats["flushed"] += len(dirty)
+            return saved
+
+    async def _use_shared_states(self, sessions: SessionStore,
+                                 batch: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Заменить копии воркера состоянием из общего хранилища
+
+        Другой воркер мог продвинуть игру дальше: в БД пишется последняя
+        опубликованная версия. Копия воркера остаётся, только если
+        в хранилище игрока уже нет (сессия истекла).
+        """
+        player_ids = list(batch)
+        shared = await asyncio.gather(
+            *(sessions.get(NS_GAME, player_id) for player_id in player_ids)
+        )
+        for player_id, data in zip(player_ids, shared):
+            if data is not None:
+                batch[player_id] = data
+
+    async def spill_pending(self) -> int:
+        """Записать вытесненных игроков в БД"""
+        if not self._pending_spill:
+            return 0
+        return await self._write(include_dirty=False)
+
+    async def flush(self) -> int:
+        """Записать изменённых и вытесненных игроков в БД"""
+        return await self._write(include_dirty=True)
+
+    async def load(self, player_id: str, fresh: bool = True) -> Optional[PlayerState]:
+        """
+        Состояние игрока с восстановлением вытесненных
+
+        Args:
+            player_id: ID игрока
+            fresh: Для общего хранилища - читать мимо L1-кэша
+                (False допустимо для запросов только на чтение)
+
+        Returns:
+            Состояние или None, если игрок неизвестен
+        """
+        if self.sessions is not None:
+            shared = await self._load_shared(self.sessions, player_id, fresh)
+            if shared is not None:
+                return shared
+
+        state = self._players.get(player_id)
+        if state is not None:
+            self._stats["hits"] += 1
+            self._touch(player_id)
+            return state
+
+        self._stats["misses"] += 1
+        state = self._pending_spill.pop(player_id, None)
+        if state is None and self.persistence is not None:
+            try:
+                state = await self.persistence.load(player_id)
+            except Exception as e:
+                logger.error(f"❌ Ошибка загрузки состояния игрока {player_id}: {e}")
+                state = None
+
+        if state is None:
+            return None
+
+        self._stats["restored"] += 1
+        self[player_id] = state
+        logger.info(f"♻️ Игрок {player_id} восстановлен")
+        return state
+
+    async def _load_shared(self, sessions: SessionStore, player_id: str,
+                           fresh: bool) -> Optional[PlayerState]:
+        """
+        Состояние из общего хранилища (заменяет копию в памяти)
+
+        Если в хранилище игрока нет (удалён на другом воркере или сессия
+        истекла), копия в памяти устарела и отбрасывается - дальше
+        состояние восстанавливается из БД.
+        """
+        from app.services.content_store import get_content
+
+        data, version = await sessions.get_versioned(NS_GAME, player_id, fresh=fresh)
+        if data is None:
+            if player_id in self._players:
+                del self[player_id]
+            return None
+
+        self._stats["hits"] += 1
+        current = self._players.get(player_id)
+        if current is not None and self._versions.get(player_id) == version:
+            # Копия в памяти актуальна
+            self._touch(player_id)
+            return current
+        state = PlayerState.from_dict(data, get_content().scene_graph)
+        self[player_id] = state
+        self._versions[player_id] = version
+        return state
+
+    async def publish(self, player_id: str, force: bool = False) -> bool:
+        """
+        Записать состояние игрока в общее хранилище сессий
+
+        Запись идёт поверх версии, загруженной этим воркером (compare-and-set).
+
+        Args:
+            player_id: ID игрока
+            force: Записать поверх любой версии (новая игра)
+
+        Returns:
+            True если состояние записано, False при ошибке хранилища
+
+        Raises:
+            StaleStateError: Игрока изменил другой воркер; копия в памяти
+                отброшена, следующий load прочитает актуальное состояние
+        """
+        if self.sessions is None or player_id not in self._players:
+            return False
+        data = copy_state(self._players[player_id])
+        version = self._versions.get(player_id, 0)
+        for _ in range(PUBLISH_ATTEMPTS if force else 1):
+            written = await self.sessions.compare_and_set(NS_GAME, player_id, data, version)
+            if written is None:
+                return False
+            if written:
+                self._versions[player_id] = version + 1
+                self._stats["published"] += 1
+                return True
+            _, version = await self.sessions.get_versioned(NS_GAME, player_id)
+
+        self._stats["conflicts"] += 1
+        del self[player_id]
+        raise StaleStateError(f"Игрок {player_id} изменён другим воркером")
+
+    async def delete(self, player_id: str) -> bool:
+        """
+        Удалить игрока из памяти и БД
+
+        Returns:
+            True если игрок был известен
+        """
+        found = player_id in self._players
+        if found:
+            del self[player_id]
+        found = self._pending_spill.pop(player_id, None) is not None or found
+        if self.sessions is not None:
+            found = await self.sessions.delete(NS_GAME, player_id) or found
+
+        if self.persistence is not None:
+            # После идущей записи, чтобы она не вернула удалённую строку
+            async with self._write_lock:
+                try:
+                    found = await self.persistence.delete(player_id) or found
+                except Exception as e:
+                    logger.error(f"❌ Ошибка удаления состояния игрока {player_id}: {e}")
+
+        return found
+
+    # ------------------------------------------------------------------
+    # Автосохранение
+    # ------------------------------------------------------------------
+
+    async def _autosave_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                self.sweep()
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Player store autosave error: {e}")
+
+    @property
+    def running(self) -> bool:
+        """Запущено ли автосохранение"""
+        return self._autosave_task is not None and not self._autosave_task.done()
+
+    def start(self) -> None:
+        """Запуск автосохранения по таймеру"""
+        if self.running or not self.write_behind or not self.flush_interval:
+            return
+        self._autosave_task = asyncio.create_task(self._autosave_loop())
+        logger.info(f"💾 Автосохранение игроков запущено (каждые {self.flush_interval} сек)")
+
+    async def close(self) -> None:
+        """Остановить автосохранение и записать всё несохранённое"""
+        if self._autosave_task:
+            self._autosave_task.cancel()
+            try:
+                await self._autosave_task
+            except asyncio.CancelledError:
+                pass
+            self._autosave_task = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+
+        saved = await self.flush()
+        if saved:
+            logger.info(f"💾 Сохранено игроков при остановке: {saved}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика хранилища"""
+        return {
+            "active_players": len(self._players),
+            "max_players": self.max_players,
+            "idle_timeout": self.idle_timeout,
+            "memory_bytes": self._memory,
+            "max_memory_bytes": self.max_memory_bytes,
+            "pending_spill": len(self._pending_spill),
+            "dirty": len(self._dirty),
+            "write_behind": self.write_behind,
+            "shared_sessions": self.sessions is not None,
+            **self._stats,
+        }
+
+
+def create_player_store() -> PlayerStore:
+    """Хранилище игроков с ограничениями из настроек"""
+    return PlayerStore(
+        max_players=settings.max_active_games,
+        idle_timeout=settings.session_timeout * 60,
+        max_memory_bytes=settings.max_player_state_memory_mb * 1024 * 1024,
+        persistence=(
+            GameStatePersistence(game_event_log if game_event_log.enabled else None)
+            if settings.player_state_spill_enabled or settings.save_progress_to_db
+            or game_event_log.enabled else None
+        ),
+        write_behind=settings.save_progress_to_db,
+        flush_interval=settings.auto_save_interval * 60 if settings.auto_save_enabled else 0,
+        flush_threshold=settings.auto_save_batch_size,
+        # In-process бэкенд не нужен: память процесса и есть хранилище
+        sessions=session_store if session_store.shared else None,
+    )
+
+
+# Глобальный экземпляр
+player_store = create_player_store()
@@ -0,0 +1,194 @@
+"""
+StarCourier Web - Quest Graph
+Скомпилированный граф зависимостей квестов
+
+Строится один раз из quests.json вместе со снимком контента.
+Каждое имя квеста получает бит, требования квеста хранятся маской,
+поэтому проверка доступности — одна побитовая операция.
+Также вычисляются прямые и обратные рёбра, топологический порядок
+и транзитивные предпосылки.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import logging
+from collections import deque
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _requires_of(quest: Mapping[str, Any]) -> Tuple[str, ...]:
+    """Список требуемых квестов (строка приводится к списку)"""
+    requires = quest.get("requires", [])
+    if isinstance(requires, str):
+        requires = [requires]
+    return tuple(requires or ())
+
+
+class QuestGraph:
+    """
+    DAG квестов
+
+    Массивы выровнены по индексу квеста (порядок quests.json):
+    quest_ids[i], requires[i], dependents[i], require_masks[i], closure_masks[i].
+    Биты 0..n-1 соответствуют квестам, дальше идут имена из requires,
+    которых нет в quests.json (их тоже можно передать как завершённые).
+    """
+
+    def __init__(self, quests: Mapping[str, Any]) -> None:
+        self.quests: Dict[str, Mapping[str, Any]] = {
+            quest_id: quest for quest_id, quest in quests.items()
+            if quest_id != "metadata" and isinstance(quest, Mapping)
+        }
+        self.quest_ids: Tuple[str, ...] = tuple(self.quests)
+        self.index: Dict[str, int] = {quest_id: i for i, quest_id in enumerate(self.quest_ids)}
+
+        self.requires: Tuple[Tuple[str, ...], ...] = tuple(
+            _requires_of(quest) for quest in self.quests.values()
+        )
+
+        # Биты для всех имён, встречающихся в требованиях
+        self.bits: Dict[str, int] = dict(self.index)
+        for requires in self.requires:
+            for name in requires:
+                self.bits.setdefault(name, len(self.bits))
+
+        self.require_masks: Tuple[int, ...] = tuple(
+            self.encode(requires) for requires in self.requires
+        )
+
+        dependents: List[List[int]] = [[] for _ in self.quest_ids]
+        for i, requires in enumerate(self.requires):
+            for name in dict.fromkeys(requires):
+                if name in self.index:
+                    dependents[self.index[name]].append(i)
+        self.dependents: Tuple[Tuple[int, ...], ...] = tuple(tuple(d) for d in dependents)
+
+        self.topological_order: Tuple[int, ...] = self._topological_sort()
+        self.closure_masks: Tuple[int, ...] = self._transitive_closure()
+
+        # Квесты по главам для /available
+        by_chapter: Dict[Any, List[int]] = {}
+        for i, quest in enumerate(self.quests.values()):
+            by_chapter.setdefault(quest.get("chapter"), []).append(i)
+        self.by_chapter: Dict[Any, Tuple[int, ...]] = {k: tuple(v) for k, v in by_chapter.items()}
+
+    def __len__(self) -> int:
+        return len(self.quest_ids)
+
+    def _topological_sort(self) -> Tuple[int, ...]:
+        """Топологический порядок (алгоритм Кана)"""
+        in_degree = [
+            sum(1 for name in dict.fromkeys(requires) if name in self.index)
+            for requires in self.requires
+        ]
+        queue = deque(i for i, degree in enumerate(in_degree) if degree == 0)
+        order: List[int] = []
+
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for dependent in self.dependents[i]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    queue.append(dependent)
+
+        if len(order) < len(self.quest_ids):
+            cyclic = [i for i, degree in enumerate(in_degree) if degree > 0]
+            logger.warning(f"⚠️ Цикл в зависимостях квестов: {[self.quest_ids[i] for i in cyclic]}")
+            order.extend(cyclic)
+
+        return tuple(order)
+
+    def _transitive_closure(self) -> Tuple[int, ...]:
+        """Маски всех (транзитивных) предпосылок каждого квеста"""
+        closure = [0] * len(self.quest_ids)
+        for i in self.topological_order:
+            mask = self.require_masks[i]
+            for name in self.requires[i]:
+                j = self.index.get(name)
+                if j is not None:
+                    mask |= closure[j]
+            closure[i] = mask
+        return tuple(closure)
+
+    def encode(self, names: Iterable[str]) -> int:
+        """Закодировать набор квестов в битовую маску"""
+        mask = 0
+        for name in names:
+            bit = self.bits.get(name)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def decode(self, mask: int) -> List[str]:
+        """Квесты из битовой маски (в порядке битов)"""
+        return [name for name, bit in self.bits.items() if mask >> bit & 1]
+
+    def is_unlocked(self, quest_id: str, completed_mask: int) -> bool:
+        """Выполнены ли все прямые требования квеста"""
+        i = self.index.get(quest_id)
+        return i is not None and self.require_masks[i] & ~completed_mask == 0
+
+    def unlocks(self, quest_id: str) -> List[str]:
+        """Квесты, напрямую требующие данный квест"""
+        i = self.index.get(quest_id)
+        if i is None:
+            return []
+        return [self.quest_ids[j] for j in self.dependents[i]]
+
+    def prerequisites(self, quest_id: str) -> List[str]:
+        """Все транзитивные предпосылки квеста в топологическом порядке"""
+        i = self.index.get(quest_id)
+        if i is None:
+            return []
+        mask = self.closure_masks[i]
+        prerequisites = [self.quest_ids[j] for j in self.topological_order if mask >> j & 1]
+        # Требования на квесты, которых нет в quests.json
+        prerequisites.extend(
+            name for name, bit in self.bits.items() if bit >= len(self.quest_ids) and mask >> bit & 1
+        )
+        return prerequisites
+
+    def available(self, chapter: int, completed_quests: Iterable[str],
+                  path: Optional[str] = None, level: int = 1) -> List[str]:
+        """
+        Квесты главы, доступные игроку
+
+        Args:
+            chapter: Текущая глава
+            completed_quests: Завершённые квесты
+            path: Выбранный путь
+            level: Уровень персонажа
+
+        Returns:
+            ID квестов в порядке quests.json
+        """
+        completed_mask = self.encode(completed_quests)
+        result = []
+        for i in self.by_chapter.get(chapter, ()):
+            if self.require_masks[i] & ~completed_mask:
+                continue
+            quest = self.quests[self.quest_ids[i]]
+            quest_path = quest.get("path")
+            if quest_path and path != quest_path:
+                continue
+            if level < quest.get("level_required", 1):
+                continue
+            result.append(self.quest_ids[i])
+        return result
+
+
+def build_quest_graph(quests: Mapping[str, Any]) -> QuestGraph:
+    """
+    Построить граф квестов
+
+    Args:
+        quests: Данные quests.json
+
+    Returns:
+        QuestGraph
+    """
+    return QuestGraph(quests)
@@ -0,0 +1,295 @@
+"""
+StarCourier Web - Scene Analysis
+Статический анализ графа сцен
+
+Строится один раз вместе со снимком контента:
+- сцены, недостижимые из начальной
+- выборы, ведущие в отсутствующие сцены
+- тупики (нет переходов в существующие сцены и это не концовка)
+- границы характеристик при входе в каждую сцену (динамика по интервалам)
+- концовки, достижимые из каждой сцены (битовая маска по типам концовок);
+  выборы, которые по границам характеристик всегда заканчивают игру,
+  не учитываются
+
+Ответ на «может ли игрок ещё получить концовку X» - одна побитовая
+операция, границы характеристик - поиск по индексу.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import logging
+from collections import deque
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+from app.services.player_state import STAT_DEFAULT, STAT_MIN, clamp_stat
+from app.services.scene_graph import MISSING_SCENE, SceneGraph
+
+logger = logging.getLogger(__name__)
+
+# Характеристики, обнуление которых заканчивает игру (как check_game_over)
+GAME_OVER_STATS = ("health", "morale")
+
+# Границы характеристики: (минимум, максимум)
+StatRange = Tuple[int, int]
+
+
+class SceneAnalysis:
+    """
+    Результаты анализа графа сцен
+
+    Массивы выровнены по индексу сцены графа:
+    reachable[i], ending_masks[i], stat_bounds[i].
+
+    Args:
+        graph: Скомпилированный граф сцен
+        initial_stats: Начальные характеристики игрока
+        start_scene: ID начальной сцены
+    """
+
+    def __init__(self, graph: SceneGraph, initial_stats: Mapping[str, int],
+                 start_scene: str = "start") -> None:
+        self.graph = graph
+        self.start = graph.index.get(start_scene, MISSING_SCENE)
+
+        # Типы концовок получают биты
+        self.ending_types: Tuple[str, ...] = tuple(sorted(
+            {ending for ending in graph.ending_types if ending}
+        ))
+        self.ending_bits: Dict[str, int] = {
+            ending: 1 << i for i, ending in enumerate(self.ending_types)
+        }
+
+        # Характеристики: начальные, затем встречающиеся только в выборах
+        stat_names = list(initial_stats)
+        for node in graph.nodes:
+            for transition in node.transitions:
+                for stat, _ in transition.stats:
+                    if stat not in initial_stats and stat not in stat_names:
+                        stat_names.append(stat)
+        self.stat_names: Tuple[str, ...] = tuple(stat_names)
+        self.stat_index: Dict[str, int] = {stat: i for i, stat in enumerate(stat_names)}
+
+        self.reachable: Tuple[bool, ...] = self._reachability()
+        self.missing_targets: Tuple[Tuple[str, int, str], ...] = tuple(
+            (node.scene_id, i, transition.next_scene)
+            for node in graph.nodes
+            for i, transition in enumerate(node.transitions)
+            if transition.target == MISSING_SCENE
+        )
+        self.dead_ends: Tuple[str, ...] = tuple(
+            node.scene_id for node in graph.nodes
+            if not node.ending_type and all(t == MISSING_SCENE for t in node.targets)
+        )
+        # Выборы (сцена, номер), после которых игра заканчивается на любом пути
+        self.fatal_choices: Set[Tuple[int, int]] = set()
+        self.stat_bounds: Tuple[Optional[Tuple[StatRange, ...]], ...] = \
+            self._stat_bounds(initial_stats)
+        self.ending_masks: Tuple[int, ...] = self._ending_masks()
+
+    # ------------------------------------------------------------------
+    # Вычисление
+    # ------------------------------------------------------------------
+
+    def _successors(self, idx: int) -> List[int]:
+        """Существующие сцены, достижимые выбором (из концовки переходов нет)"""
+        if self.graph.ending_types[idx]:
+            return []
+        return [t for t in self.graph.adjacency[idx] if t != MISSING_SCENE]
+
+    def _reachability(self) -> Tuple[bool, ...]:
+        """Обход в ширину от начальной сцены"""
+        reachable = [False] * len(self.graph)
+        if self.start == MISSING_SCENE:
+            return tuple(reachable)
+        reachable[self.start] = True
+        queue = deque([self.start])
+        while queue:
+            for target in self._successors(queue.popleft()):
+                if not reachable[target]:
+                    reachable[target] = True
+                    queue.append(target)
+        return tuple(reachable)
+
+    def _ending_masks(self) -> Tuple[int, ...]:
+        """
+        Концовки, достижимые из каждой сцены
+
+        Обратный обход от сцен каждой концовки: маска распространяется
+        на предшественников, пока добавляет новые биты (циклы допустимы).
+        """
+        predecessors: List[List[int]] = [[] for _ in range(len(self.graph))]
+        for idx in range(len(self.graph)):
+            if self.graph.ending_types[idx]:
+                continue
+            for j, target in enumerate(self.graph.adjacency[idx]):
+                if target != MISSING_SCENE and (idx, j) not in self.fatal_choices:
+                    predecessors[target].append(idx)
+
+        masks = [
+            self.ending_bits[ending] if ending else 0
+            for ending in self.graph.ending_types
+        ]
+        queue = deque(i for i, mask in enumerate(masks) if mask)
+        while queue:
+            idx = queue.popleft()
+            for source in predecessors[idx]:
+                merged = masks[source] | masks[idx]
+                if merged != masks[source]:
+                    masks[source] = merged
+                    queue.append(source)
+        return tuple(masks)
+
+    def _stat_bounds(self, initial_stats: Mapping[str, int]
+                     ) -> Tuple[Optional[Tuple[StatRange, ...]], ...]:
+        """
+        Границы характеристик при входе в сцену по всем путям от начала
+
+        Интервал каждой характеристики переносится по переходу
+        (ограничение 0..100 монотонно, поэтому образ интервала - интервал)
+        и объединяется в целевой сцене. Пути с обнулённым здоровьем
+        или моралью заканчиваются, дальше переносятся только живые.
+        Значения ограничены, поэтому итерации сходятся.
+        """
+        if self.start == MISSING_SCENE:
+            return (None,) * len(self.graph)
+        bounds: List[Optional[List[List[int]]]] = [None] * len(self.graph)
+
+        initial = [initial_stats.get(stat, STAT_DEFAULT) for stat in self.stat_names]
+        bounds[self.start] = [[value, value] for value in initial]
+        game_over = [self.stat_index[stat] for stat in GAME_OVER_STATS if stat in self.stat_index]
+
+        queue = deque([self.start])
+        queued = {self.start}
+        while queue:
+            idx = queue.popleft()
+            queued.discard(idx)
+            if self.graph.ending_types[idx]:
+                continue
+            source = bounds[idx]
+            # В очередь попадают только сцены с уже известными границами
+            if source is None:
+                continue
+            for j, transition in enumerate(self.graph.nodes[idx].transitions):
+                if transition.target == MISSING_SCENE:
+                    continue
+                entered = [list(pair) for pair in source]
+                for stat, change in transition.stats:
+                    pair = entered[self.stat_index[stat]]
+                    pair[0], pair[1] = clamp_stat(pair[0] + change), clamp_stat(pair[1] + change)
+
+                # Переход только для путей, переживших выбор
+                if any(entered[k][1] <= 0 for k in game_over):
+                    self.fatal_choices.add((idx, j))
+                    continue
+                # Границы источника расширились: выбор снова может быть живым
+                self.fatal_choices.discard((idx, j))
+                for k in game_over:
+                    entered[k][0] = max(entered[k][0], STAT_MIN + 1)
+
+                target = bounds[transition.target]
+                if target is None:
+                    bounds[transition.target] = entered
+                    changed = True
+                else:
+                    changed = False
+                    for pair, new in zip(target, entered):
+                        if new[0] < pair[0]:
+                            pair[0], changed = new[0], True
+                        if new[1] > pair[1]:
+                            pair[1], changed = new[1], True
+                if changed and transition.target not in queued:
+                    queued.add(transition.target)
+                    queue.append(transition.target)
+
+        return tuple(
+            None if scene is None else tuple((lo, hi) for lo, hi in scene)
+            for scene in bounds
+        )
+
+    # ------------------------------------------------------------------
+    # Запросы
+    # ------------------------------------------------------------------
+
+    def is_reachable(self, scene_id: str) -> bool:
+        """Достижима ли сцена из начальной"""
+        idx = self.graph.index.get(scene_id)
+        return idx is not None and self.reachable[idx]
+
+    def can_reach_ending(self, scene_id: str, ending_type: str) -> bool:
+        """Можно ли из сцены прийти к концовке"""
+        idx = self.graph.index.get(scene_id)
+        bit = self.ending_bits.get(ending_type)
+        return idx is not None and bit is not None and bool(self.ending_masks[idx] & bit)
+
+    def reachable_endings(self, scene_id: str) -> List[str]:
+        """Концовки, достижимые из сцены"""
+        idx = self.graph.index.get(scene_id)
+        if idx is None:
+            return []
+        mask = self.ending_masks[idx]
+        return [ending for ending in self.ending_types if mask & self.ending_bits[ending]]
+
+    def stat_range(self, scene_id: str, stat: str) -> Optional[StatRange]:
+        """Границы характеристики при входе в сцену (None - сцена недостижима)"""
+        idx = self.graph.index.get(scene_id)
+        k = self.stat_index.get(stat)
+        if idx is None or k is None:
+            return None
+        bounds = self.stat_bounds[idx]
+        return None if bounds is None else bounds[k]
+
+    def scene_report(self, scene_id: str) -> Optional[Dict[str, Any]]:
+        """Анализ одной сцены"""
+        idx = self.graph.index.get(scene_id)
+        if idx is None:
+            return None
+        bounds = self.stat_bounds[idx]
+        return {
+            "scene_id": scene_id,
+            "reachable": self.reachable[idx],
+            "reachable_endings": self.reachable_endings(scene_id),
+            "stat_bounds": None if bounds is None else {
+                stat: {"min": lo, "max": hi} for stat, (lo, hi) in zip(self.stat_names, bounds)
+            },
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Сводка проблем контента"""
+        return {
+            "scenes": len(self.graph),
+            "reachable": sum(self.reachable),
+            "unreachable": [
+                scene_id for scene_id, ok in zip(self.graph.scene_ids, self.reachable) if not ok
+            ],
+            "missing_targets": [
+                {"scene_id": scene_id, "choice_index": i, "next": next_scene}
+                for scene_id, i, next_scene in self.missing_targets
+            ],
+            "dead_ends": list(self.dead_ends),
+            "endings": {
+                ending: sum(1 for mask in self.ending_masks if mask & bit)
+                for ending, bit in self.ending_bits.items()
+            },
+            "start_can_finish": bool(self.start != MISSING_SCENE and self.ending_masks[self.start]),
+        }
+
+
+def build_scene_analysis(graph: SceneGraph, initial_stats: Mapping[str, int]) -> SceneAnalysis:
+    """
+    Проанализировать граф сцен
+
+    Args:
+        graph: Скомпилированный граф сцен
+        initial_stats: Начальные характеристики игрока
+
+    Returns:
+        SceneAnalysis
+    """
+    analysis = SceneAnalysis(graph, initial_stats)
+    logger.debug(
+        f"Анализ сцен: недостижимо {len(graph) - sum(analysis.reachable)}, "
+        f"переходов в отсутствующие сцены {len(analysis.missing_targets)}, "
+        f"тупиков {len(analysis.dead_ends)}"
+    )
+    return analysis
@@ -0,0 +1,240 @@
+"""
+StarCourier Web - Scene Graph
+Скомпилированный граф сцен
+
+Строится один раз из scenes.json вместе со снимком контента:
+сцены получают целочисленные индексы, переходы хранятся массивами
+индексов, типы концовок и готовые ответы API вычисляются заранее.
+Обработчик выбора выполняет только поиск по словарю и массивам.
+
+Таблица переходов (CompiledScene.transitions) позволяет серверу
+самому определить следующую сцену и изменения характеристик
+по номеру выбора, не доверяя клиенту.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import logging
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.models.game import Choice, SceneResponse
+
+logger = logging.getLogger(__name__)
+
+# Изменения характеристик перехода: пары (характеристика, изменение)
+StatDeltas = Tuple[Tuple[str, int], ...]
+
+# Индекс перехода в отсутствующую сцену
+MISSING_SCENE = -1
+
+# Ключевые слова финальных сцен (подстрока в ID сцены)
+ENDING_KEYWORDS: Tuple[str, ...] = (
+    "ancient_awakening", "hide_artifact", "artifact_destruction",
+    "defend_station", "victory", "game_over",
+)
+
+# Ключевое слово -> тип концовки
+ENDING_TYPES: Dict[str, str] = {
+    "ancient_awakening": "awakening",
+    "hide_artifact": "guardian",
+    "artifact_destruction": "sacrifice",
+    "defend_station": "combat_victory",
+    "game_over": "defeat",
+}
+
+
+# ============================================================================
+# ENDING DETECTION
+# ============================================================================
+
+def is_ending_scene(scene_id: str) -> bool:
+    """Проверка, является ли сцена финальной
+
+    Args:
+        scene_id: ID сцены для проверки
+
+    Returns:
+        True если сцена финальная
+    """
+    return any(keyword in scene_id for keyword in ENDING_KEYWORDS)
+
+
+def get_ending_type(scene_id: str) -> Optional[str]:
+    """Определить тип концовки
+
+    Args:
+        scene_id: ID сцены
+
+    Returns:
+        Тип концовки или None
+    """
+    for key, ending_type in ENDING_TYPES.items():
+        if key in scene_id:
+            return ending_type
+    return None
+
+
+# ============================================================================
+# COMPILED GRAPH
+# ============================================================================
+
+@dataclass(frozen=True, slots=True)
+class Transition:
+    """Переход по выбору: целевая сцена и изменения характеристик"""
+    target: int
+    next_scene: str
+    stats: StatDeltas
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledScene:
+    """Скомпилированная сцена"""
+    index: int
+    scene_id: str
+    choices: Tuple[Choice, ...]
+    response: Optional[SceneResponse]
+    targets: Tuple[int, ...]
+    is_ending: bool
+    ending_type: Optional[str]
+    transitions: Tuple[Transition, ...] = ()
+
+    def transition(self, choice_index: int) -> Optional[Transition]:
+        """Переход по номеру выбора или None"""
+        if 0 <= choice_index < len(self.transitions):
+            return self.transitions[choice_index]
+        return None
+
+
+class SceneGraph:
+    """
+    Граф сцен с целочисленными индексами
+
+    Атрибуты-массивы выровнены по индексу сцены:
+    scene_ids[i], nodes[i], adjacency[i], ending_types[i].
+    """
+
+    __slots__ = ("scene_ids", "index", "nodes", "adjacency", "ending_types")
+
+    def __init__(self, nodes: Tuple[CompiledScene, ...]) -> None:
+        self.nodes: Tuple[CompiledScene, ...] = nodes
+        self.scene_ids: Tuple[str, ...] = tuple(node.scene_id for node in nodes)
+        self.index: Dict[str, int] = {node.scene_id: node.index for node in nodes}
+        self.adjacency: Tuple[Tuple[int, ...], ...] = tuple(node.targets for node in nodes)
+        self.ending_types: Tuple[Optional[str], ...] = tuple(node.ending_type for node in nodes)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, scene_id: object) -> bool:
+        return scene_id in self.index
+
+    def get(self, scene_id: str) -> Optional[CompiledScene]:
+        """Скомпилированная сцена по ID или None"""
+        idx = self.index.get(scene_id)
+        return None if idx is None else self.nodes[idx]
+
+    def successors(self, scene_id: str) -> Tuple[str, ...]:
+        """ID существующих сцен, достижимых одним выбором"""
+        idx = self.index.get(scene_id)
+        if idx is None:
+            return ()
+        return tuple(self.scene_ids[t] for t in self.adjacency[idx] if t != MISSING_SCENE)
+
+
+def _compile_choices(scene_data: Mapping[str, Any]) -> Tuple[Choice, ...]:
+    """Собрать объекты выборов сцены"""
+    return tuple(
+        Choice(
+            text=choice.get("text", ""),
+            next=choice.get("next", ""),
+            stats=choice.get("stats"),
+            difficulty=choice.get("difficulty")
+        )
+        for choice in scene_data.get("choices", [])
+    )
+
+
+def _compile_deltas(stats: Any) -> StatDeltas:
+    """
+    Числовые изменения характеристик выбора
+
+    Нечисловые значения (флаги пути и концовки) пропускаются,
+    логические приводятся к int, как при валидации Dict[str, int].
+    """
+    if not isinstance(stats, Mapping):
+        return ()
+    return tuple(
+        (sys.intern(stat), int(change))
+        for stat, change in stats.items()
+        if isinstance(change, int)
+    )
+
+
+def compile_scene_response(scene_id: str, scene_data: Mapping[str, Any],
+                           choices: Optional[Tuple[Choice, ...]] = None) -> SceneResponse:
+    """Собрать ответ API для сцены"""
+    if choices is None:
+        choices = _compile_choices(scene_data)
+    return SceneResponse(
+        id=scene_id,
+        title=scene_data.get("title", "Без названия"),
+        text=scene_data.get("text", ""),
+        image=scene_data.get("image", "🎮"),
+        character=scene_data.get("character", "Система"),
+        choices=list(choices)
+    )
+
+
+def build_scene_graph(scenes: Mapping[str, Any]) -> SceneGraph:
+    """
+    Скомпилировать граф сцен
+
+    Args:
+        scenes: Сцены из scenes.json
+
+    Returns:
+        SceneGraph
+    """
+    index = {scene_id: i for i, scene_id in enumerate(scenes)}
+    nodes = []
+    missing = 0
+
+    for scene_id, scene_data in scenes.items():
+        transitions = tuple(
+            Transition(
+                target=index.get(choice.get("next", ""), MISSING_SCENE),
+                next_scene=choice.get("next", ""),
+                stats=_compile_deltas(choice.get("stats")),
+            )
+            for choice in scene_data.get("choices", [])
+        )
+        targets = tuple(transition.target for transition in transitions)
+        missing += targets.count(MISSING_SCENE)
+        ending = is_ending_scene(scene_id)
+        try:
+            choices = _compile_choices(scene_data)
+            response = compile_scene_response(scene_id, scene_data, choices)
+        except ValidationError as e:
+            # Сцена не укладывается в модель ответа: собирается по запросу, как раньше
+            logger.warning(f"⚠️ Сцена '{scene_id}' не скомпилирована: {e.error_count()} ошибок")
+            choices, response = (), None
+        nodes.append(CompiledScene(
+            index=index[scene_id],
+            scene_id=scene_id,
+            choices=choices,
+            response=response,
+            targets=targets,
+            is_ending=ending,
+            ending_type=get_ending_type(scene_id) if ending else None,
+            transitions=transitions,
+        ))
+
+    if missing:
+        logger.debug(f"Граф сцен: {missing} переходов ведут в отсутствующие сцены")
+
+    return SceneGraph(tuple(nodes))
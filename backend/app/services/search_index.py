@@ -0,0 +1,206 @@
+"""
+StarCourier Web - Search Index
+Полнотекстовый поиск по способностям и квестам
+
+Индекс строится один раз вместе со снимком контента: названия
+и описания нормализуются (casefold, ё -> е) и разбиваются на
+триграммы. Запрос находит кандидатов по пересечению триграмм,
+проверяет вхождение подстроки и ранжирует результаты.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import logging
+import re
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Лимит результатов поиска по умолчанию
+DEFAULT_SEARCH_LIMIT = 50
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+# ============================================================================
+# TEXT NORMALIZATION
+# ============================================================================
+
+def normalize(text: str) -> str:
+    """Привести текст к виду для поиска (регистр, ё -> е)"""
+    return text.casefold().replace("ё", "е")
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбить нормализованный текст на токены"""
+    return TOKEN_PATTERN.findall(text)
+
+
+def trigrams(text: str) -> Set[str]:
+    """Триграммы строки"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+EMPTY_POSTING = array("I")
+
+
+def _compact(postings: Dict[str, Set[int]]) -> Dict[str, array]:
+    """Превратить множества постингов в отсортированные массивы"""
+    return {sys.intern(key): array("I", sorted(doc_ids)) for key, doc_ids in postings.items()}
+
+@dataclass(frozen=True, slots=True)
+class SearchDocument:
+    """Документ индекса"""
+    payload: Mapping[str, Any]
+    name: str
+    description: str
+    name_tokens: FrozenSet[str]
+    group: Any = None
+
+
+class SearchIndex:
+    """
+    Индекс поиска по названию и описанию
+
+    Постинги триграмма -> документы отбирают кандидатов для подстроки,
+    токены названия документа ранжируют совпадения целых слов.
+
+    После построения постинги хранятся отсортированными массивами
+    array("I"): это в разы компактнее множеств, а индекс живёт
+    в каждом воркере.
+    """
+
+    def __init__(self, documents: Iterable[Tuple[Mapping[str, Any], str, str, Any]]) -> None:
+        self.documents: List[SearchDocument] = []
+        trigram_postings: Dict[str, Set[int]] = {}
+
+        for payload, name, description, group in documents:
+            name = normalize(name or "")
+            description = normalize(description or "")
+            if not name and not description:
+                continue
+
+            doc_id = len(self.documents)
+            name_tokens = frozenset(tokenize(name))
+            self.documents.append(SearchDocument(payload, name, description, name_tokens, group))
+
+            for trigram in trigrams(name) | trigrams(description):
+                trigram_postings.setdefault(trigram, set()).add(doc_id)
+
+        self._trigrams: Dict[str, array] = _compact(trigram_postings)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _candidates(self, query: str) -> Iterable[int]:
+        """Документы, которые могут содержать запрос"""
+        query_trigrams = trigrams(query)
+        if not query_trigrams:
+            return range(len(self.documents))
+
+        postings = sorted(
+            (self._trigrams.get(trigram, EMPTY_POSTING) for trigram in query_trigrams), key=len
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return candidates
+
+    def _score(self, doc: SearchDocument, query: str, query_tokens: List[str]) -> int:
+        """Релевантность документа (0 - нет совпадения)"""
+        score = 0
+        if query in doc.name:
+            score += 10
+            if doc.name.startswith(query):
+                score += 5
+            score += 3 * sum(1 for token in query_tokens if token in doc.name_tokens)
+        if query in doc.description:
+            score += 1
+        return score
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT,
+               group: Optional[Any] = None) -> List[Mapping[str, Any]]:
+        """
+        Найти документы, содержащие запрос в названии или описании
+
+        Args:
+            query: Поисковый запрос
+            limit: Максимум результатов
+            group: Ограничить поиск группой (ветка, глава)
+
+        Returns:
+            Список payload, отсортированный по релевантности
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        query_tokens = tokenize(query)
+
+        scored = []
+        for doc_id in self._candidates(query):
+            doc = self.documents[doc_id]
+            if group is not None and doc.group != group:
+                continue
+            score = self._score(doc, query, query_tokens)
+            if score:
+                scored.append((-score, doc_id))
+
+        scored.sort()
+        return [self.documents[doc_id].payload for _, doc_id in scored[:limit]]
+
+
+# ============================================================================
+# BUILDERS
+# ============================================================================
+
+def build_ability_search(abilities: Mapping[str, Any]) -> SearchIndex:
+    """Индекс поиска способностей (группа - ветка)"""
+    def documents():
+        for branch_name, branch in abilities.items():
+            if branch_name == "metadata" or not isinstance(branch, Mapping):
+                continue
+            for key, ability in branch.items():
+                name = ability.get("name")
+                description = ability.get("description")
+                if not isinstance(name, str) and not isinstance(description, str):
+                    continue
+                payload = {
+                    "id": ability.get("id"),
+                    "key": key,
+                    "name": name,
+                    "description": description,
+                    "branch": branch_name,
+                    "level_required": ability.get("level_required")
+                }
+                yield payload, name, description, branch_name
+
+    return SearchIndex(documents())
+
+
+def build_quest_search(quests: Mapping[str, Any]) -> SearchIndex:
+    """Индекс поиска квестов (группа - глава)"""
+    def documents():
+        for quest_id, quest in quests.items():
+            if quest_id == "metadata" or not isinstance(quest, Mapping):
+                continue
+            payload = {
+                "id": quest.get("id"),
+                "quest_id": quest_id,
+                "name": quest.get("name"),
+                "description": quest.get("description"),
+                "chapter": quest.get("chapter"),
+                "type": quest.get("type")
+            }
+            yield payload, quest.get("name"), quest.get("description"), quest.get("chapter")
+
+    return SearchIndex(documents())
@@ -0,0 +1,763 @@
+"""
+StarCourier Web - Session Store
+Общее хранилище игровых сессий для нескольких воркеров
+
+Состояния /api/game (PlayerStore), игроков /api/game-integration
+(GameIntegrationService) и боёв /api/combat (CombatManager) хранятся
+в одном хранилище. Бэкенд выбирается настройкой session_store_backend:
+- memory - в памяти процесса (один воркер, значения без сериализации)
+- sqlite - файл SQLite, общий для воркеров одной машины
+- redis  - Redis-совместимый сервер (общий для нескольких машин)
+
+В session_store_url можно перечислить несколько адресов через запятую:
+ключи распределяются между узлами консистентным хешированием, поэтому
+добавление узла переносит лишь ~1/N ключей.
+
+Перед удалёнными бэкендами стоит L1 - небольшой LRU-кэш горячих ключей
+в памяти воркера. Чтение-изменение-запись всегда идёт в бэкенд
+(fresh=True); L1 обслуживает только чтения, которым допустимо отставание
+до session_l1_ttl секунд (опрос статистики, состояния боя).
+
+Значения для удалённых бэкендов сериализуются в JSON кодеком своего
+пространства имён (register_codec): из хранилища читаются только данные,
+а не объекты, поэтому запись в него не даёт выполнить код в воркере.
+Значения без кодека и нераспознанные записи отвергаются.
+
+Каждая запись несёт версию: compare_and_set пишет только поверх той
+версии, от которой отталкивался воркер, поэтому параллельные изменения
+одной сессии на разных воркерах не затирают друг друга молча.
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Пространства имён ключей
+NS_GAME = "game"
+NS_INTEGRATION = "integration"
+NS_COMBAT = "combat"
+
+# Префикс ключей в общих бэкендах
+KEY_PREFIX = "sc:session:"
+
+
+def make_key(namespace: str, key: str) -> str:
+    """Ключ хранилища для пространства имён"""
+    return f"{KEY_PREFIX}{namespace}:{key}"
+
+
+# ============================================================================
+# SERIALIZATION
+# ============================================================================
+
+# Кодеки пространств имён: (значение -> JSON-структура, JSON-структура -> значение)
+SessionCodec = Tuple[Callable[[Any], Any], Callable[[Any], Any]]
+
+_codecs: Dict[str, SessionCodec] = {}
+
+
+def register_codec(namespace: str, dump: Callable[[Any], Any],
+                   load: Callable[[Any], Any]) -> None:
+    """
+    Зарегистрировать сериализацию значений пространства имён
+
+    Args:
+        namespace: Пространство имён
+        dump: Значение -> JSON-совместимая структура
+        load: JSON-структура -> значение (ошибка - запись отвергается)
+    """
+    _codecs[namespace] = (dump, load)
+
+
+def _get_codec(namespace: str) -> SessionCodec:
+    codec = _codecs.get(namespace)
+    if codec is None:
+        raise ValueError(f"Нет кодека для пространства имён сессий '{namespace}'")
+    return codec
+
+
+def encode_value(namespace: str, value: Any, version: int = 0) -> bytes:
+    """Запись общего бэкенда: строка версии и JSON значения"""
+    dump, _ = _get_codec(namespace)
+    body = json.dumps(dump(value), ensure_ascii=False, separators=(",", ":"))
+    return f"{version}\n{body}".encode()
+
+
+def _split_record(raw: Any) -> Tuple[int, bytes]:
+    if isinstance(raw, str):
+        raw = raw.encode()
+    if not isinstance(raw, bytes):
+        raise ValueError(f"Неизвестный формат сессии: {type(raw).__name__}")
+    header, sep, body = raw.partition(b"\n")
+    if not sep or not header.isdigit():
+        raise ValueError("Неизвестный формат сессии")
+    return int(header), body
+
+
+def record_version(raw: Any) -> int:
+    """Версия записи общего бэкенда (0 - нераспознанная запись)"""
+    try:
+        return _split_record(raw)[0]
+    except ValueError:
+        return 0
+
+
+def decode_value(namespace: str, raw: Any) -> Tuple[Any, int]:
+    """Значение и версия записи общего бэкенда (ValueError для чужих данных)"""
+    _, load = _get_codec(namespace)
+    version, body = _split_record(raw)
+    return load(json.loads(body)), version
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class SessionBackend(ABC):
+    """
+    Бэкенд хранилища сессий
+
+    shared=False - значения хранятся как есть в памяти процесса
+    (пары (версия, объект)), shared=True - значения приходят
+    сериализованными (bytes, см. encode_value).
+    """
+
+    name = "base"
+    shared = True
+
+    @property
+    def node_id(self) -> str:
+        """Имя узла на кольце консистентного хеширования"""
+        return self.name
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Значение ключа или None"""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Записать значение со временем жизни в секундах (0 - бессрочно)"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Удалить ключ; True если он был"""
+
+    @abstractmethod
+    async def compare_and_set(self, key: str, value: Any, ttl: float, expected: int) -> bool:
+        """
+        Атомарно записать значение, если версия текущего равна expected
+
+        Args:
+            expected: Ожидаемая версия (0 - ключа нет)
+
+        Returns:
+            True если значение записано
+        """
+
+    def version_of(self, value: Any) -> int:
+        """Версия хранимого значения"""
+        return record_version(value)
+
+    async def close(self) -> None:
+        """Освободить соединения"""
+
+
+class MemorySessionBackend(SessionBackend):
+    """
+    Хранилище в памяти процесса
+
+    Истёкшие записи удаляются при чтении и раз в purge_every записей.
+    """
+
+    name = "memory"
+    shared = False
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic,
+                 purge_every: int = 1000) -> None:
+        self._data: Dict[str, Tuple[Any, float]] = {}
+        self._clock = clock
+        self._purge_every = purge_every
+        self._writes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at and expires_at <= self._clock():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (value, self._clock() + ttl if ttl else 0)
+        self._writes += 1
+        if self._purge_every and self._writes % self._purge_every == 0:
+            self.purge()
+
+    async def delete(self, key: str) -> bool:
+        return self._data.pop(key, None) is not None
+
+    async def compare_and_set(self, key: str, value: Any, ttl: float, expected: int) -> bool:
+        current = await self.get(key)
+        if (0 if current is None else self.version_of(current)) != expected:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    def version_of(self, value: Any) -> int:
+        return value[0]
+
+    def purge(self) -> int:
+        """Удалить истёкшие записи"""
+        now = self._clock()
+        expired = [key for key, (_, expires_at) in self._data.items()
+                   if expires_at and expires_at <= now]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    Хранилище в файле SQLite (WAL), общее для воркеров одной машины
+
+    Запросы выполняются в потоке, чтобы не блокировать event loop.
+    Срок жизни хранится во времени стены: монотонные часы у процессов разные.
+
+    Args:
+        path: Путь к файлу базы
+        purge_every: Удалять истёкшие строки раз в столько записей
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, purge_every: int = 1000) -> None:
+        self.path = path
+        self._purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def node_id(self) -> str:
+        return f"sqlite:{self.path}"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM sessions WHERE key = ? AND (expires_at = 0 OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def _set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl if ttl else 0)
+            )
+            self._writes += 1
+            if self._purge_every and self._writes % self._purge_every == 0:
+                conn.execute(
+                    "DELETE FROM sessions WHERE expires_at != 0 AND expires_at <= ?",
+                    (time.time(),)
+                )
+
+    def _compare_and_set(self, key: str, value: bytes, ttl: float, expected: int) -> bool:
+        with self._lock:
+            conn = self._connect()
+            # Блокировка записи на время проверки - атомарно и для других процессов
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT value FROM sessions WHERE key = ? AND (expires_at = 0 OR expires_at > ?)",
+                    (key, time.time())
+                ).fetchone()
+                if (0 if row is None else self.version_of(row[0])) != expected:
+                    conn.execute("ROLLBACK")
+                    return False
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, time.time() + ttl if ttl else 0)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def _delete(self, key: str) -> bool:
+        with self._lock:
+            cursor = self._connect().execute("DELETE FROM sessions WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def delete(self, key: str) -> bool:
+        return await asyncio.to_thread(self._delete, key)
+
+    async def compare_and_set(self, key: str, value: bytes, ttl: float, expected: int) -> bool:
+        return await asyncio.to_thread(self._compare_and_set, key, value, ttl, expected)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+
+class RedisSessionBackend(SessionBackend):
+    """
+    Хранилище в Redis-совместимом сервере
+
+    Требует установки: pip install redis
+    (или готового клиента с методами get/set(px=)/delete/eval - например,
+    локальной заглушки в тестах)
+
+    Args:
+        url: Адрес сервера
+        client: Готовый асинхронный клиент (вместо подключения по url)
+    """
+
+    name = "redis"
+
+    # Проверка версии и запись одной командой на сервере (см. encode_value)
+    COMPARE_AND_SET_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+local version = 0
+if current then
+    version = tonumber(string.match(current, '^(%d+)\\n')) or 0
+end
+if version ~= tonumber(ARGV[2]) then
+    return 0
+end
+if tonumber(ARGV[3]) > 0 then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[3])
+else
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+    def __init__(self, url: str = "", client: Any = None) -> None:
+        self.url = url
+        self._client = client
+
+    @property
+    def node_id(self) -> str:
+        return self.url or self.name
+
+    def _get_client(self) -> Any:
+        if self._client is None:
+            import redis.asyncio as redis
+            self._client = redis.from_url(self.url)
+        return self._client
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._get_client().get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if ttl:
+            await self._get_client().set(key, value, px=max(1, int(ttl * 1000)))
+        else:
+            await self._get_client().set(key, value)
+
+    async def delete(self, key: str) -> bool:
+        return await self._get_client().delete(key) > 0
+
+    async def compare_and_set(self, key: str, value: bytes, ttl: float, expected: int) -> bool:
+        px = max(1, int(ttl * 1000)) if ttl else 0
+        return bool(await self._get_client().eval(
+            self.COMPARE_AND_SET_SCRIPT, 1, key, value, expected, px
+        ))
+
+    async def close(self) -> None:
+        if self._client is not None and hasattr(self._client, "aclose"):
+            await self._client.aclose()
+        self._client = None
+
+
+# ============================================================================
+# CONSISTENT HASHING
+# ============================================================================
+
+class HashRing:
+    """
+    Кольцо консистентного хеширования
+
+    Каждый узел занимает replicas точек на кольце; ключ принадлежит
+    первой точке по часовой стрелке. При добавлении или удалении узла
+    переезжают только ключи его точек.
+
+    Args:
+        nodes: Имена узлов
+        replicas: Виртуальных точек на узел
+    """
+
+    def __init__(self, nodes: Sequence[str], replicas: int = 100) -> None:
+        if not nodes:
+            raise ValueError("Кольцу нужен хотя бы один узел")
+        self.nodes: Tuple[str, ...] = tuple(nodes)
+        self.replicas = max(1, replicas)
+        points = sorted(
+            (self._hash(f"{node}#{i}"), n)
+            for n, node in enumerate(self.nodes)
+            for i in range(self.replicas)
+        )
+        self._points: List[int] = [point for point, _ in points]
+        self._owners: List[int] = [owner for _, owner in points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+    def node_index(self, key: str) -> int:
+        """Номер узла, которому принадлежит ключ"""
+        if len(self.nodes) == 1:
+            return 0
+        i = bisect.bisect(self._points, self._hash(key))
+        return self._owners[i % len(self._points)]
+
+    def node_for(self, key: str) -> str:
+        """Имя узла, которому принадлежит ключ"""
+        return self.nodes[self.node_index(key)]
+
+
+# ============================================================================
+# L1 CACHE
+# ============================================================================
+
+class HotKeyCache:
+    """
+    L1-кэш горячих ключей перед удалённым бэкендом
+
+    LRU с коротким временем жизни; хранит сериализованные значения,
+    поэтому читатели не делят изменяемые объекты.
+
+    Args:
+        max_size: Максимум ключей (0 - кэш выключен)
+        ttl: Время жизни записи в секундах
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= self._clock():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: str, value: bytes) -> None:
+        if not self.enabled:
+            return
+        self._data[key] = (value, self._clock() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+# ============================================================================
+# SESSION STORE
+# ============================================================================
+
+class SessionStore:
+    """
+    Хранилище сессий поверх одного или нескольких узлов
+
+    Ошибки бэкенда не пробрасываются: чтение возвращает None,
+    запись логируется (как у RedisCache).
+
+    Args:
+        backends: Узлы хранилища (больше одного - консистентное хеширование)
+        default_ttl: Время жизни сессии в секундах (0 - бессрочно)
+        l1_size: Размер L1-кэша горячих ключей
+        l1_ttl: Время жизни записи L1 в секундах
+        replicas: Виртуальных точек на узел кольца
+    """
+
+    def __init__(
+        self,
+        backends: Sequence[SessionBackend],
+        default_ttl: float = 3600,
+        l1_size: int = 1000,
+        l1_ttl: float = 1.0,
+        replicas: int = 100,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if not backends:
+            raise ValueError("Хранилищу сессий нужен хотя бы один бэкенд")
+        self.backends: Tuple[SessionBackend, ...] = tuple(backends)
+        self.default_ttl = default_ttl
+        self.ring = HashRing([backend.node_id for backend in self.backends], replicas)
+        # L1 нужен только перед удалёнными узлами
+        self.l1 = HotKeyCache(l1_size if self.shared else 0, l1_ttl, clock)
+
+        self._stats: Dict[str, int] = {
+            "gets": 0,
+            "l1_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "deletes": 0,
+            "errors": 0,
+            "conflicts": 0,
+        }
+
+    @property
+    def shared(self) -> bool:
+        """Видно ли состояние другим процессам"""
+        return any(backend.shared for backend in self.backends)
+
+    def backend_for(self, key: str) -> SessionBackend:
+        """Узел, которому принадлежит ключ"""
+        return self.backends[self.ring.node_index(key)]
+
+    def _pack(self, backend: SessionBackend, namespace: str, value: Any, version: int) -> Any:
+        if backend.shared:
+            return encode_value(namespace, value, version)
+        return (version, value)
+
+    def _unpack(self, backend: SessionBackend, namespace: str, stored: Any) -> Tuple[Any, int]:
+        if backend.shared:
+            return decode_value(namespace, stored)
+        return stored[1], stored[0]
+
+    async def get(self, namespace: str, key: str, fresh: bool = True) -> Optional[Any]:
+        """
+        Значение сессии
+
+        Args:
+            namespace: Пространство имён (NS_GAME, NS_INTEGRATION, NS_COMBAT)
+            key: ID сессии
+            fresh: Читать из бэкенда (False - допускается значение из L1)
+
+        Returns:
+            Значение или None
+        """
+        value, _ = await self.get_versioned(namespace, key, fresh)
+        return value
+
+    async def get_versioned(self, namespace: str, key: str,
+                            fresh: bool = True) -> Tuple[Optional[Any], int]:
+        """
+        Значение сессии и его версия (для compare_and_set)
+
+        Returns:
+            (значение, версия); (None, 0) если сессии нет
+        """
+        full_key = make_key(namespace, key)
+        backend = self.backend_for(full_key)
+        self._stats["gets"] += 1
+
+        stored = None if fresh else self.l1.get(full_key)
+        if stored is not None:
+            self._stats["l1_hits"] += 1
+        else:
+            try:
+                stored = await backend.get(full_key)
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"❌ Ошибка чтения сессии {full_key} ({backend.name}): {e}")
+                return None, 0
+            if stored is None:
+                self._stats["misses"] += 1
+                self.l1.discard(full_key)
+                return None, 0
+            if backend.shared:
+                self.l1.put(full_key, stored)
+
+        try:
+            return self._unpack(backend, namespace, stored)
+        except Exception as e:
+            self._stats["errors"] += 1
+            self.l1.discard(full_key)
+            logger.error(f"❌ Сессия {full_key} отвергнута: {e}")
+            return None, 0
+
+    async def set(self, namespace: str, key: str, value: Any,
+                  ttl: Optional[float] = None) -> bool:
+        """
+        Записать сессию без проверки версии (версия записи - 0)
+
+        Returns:
+            True если запись удалась
+        """
+        full_key = make_key(namespace, key)
+        backend = self.backend_for(full_key)
+        ttl = self.default_ttl if ttl is None else ttl
+        self._stats["sets"] += 1
+
+        try:
+            stored = self._pack(backend, namespace, value, 0)
+            await backend.set(full_key, stored, ttl)
+        except Exception as e:
+            self._stats["errors"] += 1
+            self.l1.discard(full_key)
+            logger.error(f"❌ Ошибка записи сессии {full_key} ({backend.name}): {e}")
+            return False
+        if backend.shared:
+            self.l1.put(full_key, stored)
+        return True
+
+    async def compare_and_set(self, namespace: str, key: str, value: Any, version: int,
+                              ttl: Optional[float] = None) -> Optional[bool]:
+        """
+        Записать сессию с версией version + 1, если в хранилище всё ещё version
+
+        Args:
+            version: Версия, прочитанная get_versioned (0 - сессии не было)
+
+        Returns:
+            True - записано, False - сессию изменил другой воркер,
+            None - ошибка бэкенда
+        """
+        full_key = make_key(namespace, key)
+        backend = self.backend_for(full_key)
+        ttl = self.default_ttl if ttl is None else ttl
+        self._stats["sets"] += 1
+
+        try:
+            stored = self._pack(backend, namespace, value, version + 1)
+            written = await backend.compare_and_set(full_key, stored, ttl, version)
+        except Exception as e:
+            self._stats["errors"] += 1
+            self.l1.discard(full_key)
+            logger.error(f"❌ Ошибка записи сессии {full_key} ({backend.name}): {e}")
+            return None
+        if not written:
+            self._stats["conflicts"] += 1
+            self.l1.discard(full_key)
+            return False
+        if backend.shared:
+            self.l1.put(full_key, stored)
+        return True
+
+    async def delete(self, namespace: str, key: str) -> bool:
+        """Удалить сессию; True если она была"""
+        full_key = make_key(namespace, key)
+        backend = self.backend_for(full_key)
+        self._stats["deletes"] += 1
+        self.l1.discard(full_key)
+        try:
+            return await backend.delete(full_key)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"❌ Ошибка удаления сессии {full_key} ({backend.name}): {e}")
+            return False
+
+    async def close(self) -> None:
+        """Закрыть соединения бэкендов"""
+        self.l1.clear()
+        for backend in self.backends:
+            try:
+                await backend.close()
+            except Exception as e:
+                logger.error(f"❌ Ошибка закрытия хранилища сессий ({backend.name}): {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика хранилища"""
+        return {
+            "backend": self.backends[0].name,
+            "nodes": len(self.backends),
+            "shared": self.shared,
+            "l1_size": len(self.l1),
+            "l1_max_size": self.l1.max_size,
+            **self._stats,
+        }
+
+
+def create_backends(backend: str, url: str) -> List[SessionBackend]:
+    """
+    Узлы хранилища по настройкам
+
+    Args:
+        backend: memory, sqlite или redis
+        url: Пути (sqlite) или адреса (redis) через запятую
+    """
+    if backend == "memory":
+        return [MemorySessionBackend()]
+    targets = [target.strip() for target in url.split(",") if target.strip()]
+    if backend == "sqlite":
+        return [SQLiteSessionBackend(path) for path in targets or ["./sessions.db"]]
+    if backend == "redis":
+        return [RedisSessionBackend(target) for target in targets or [settings.redis_url]]
+    raise ValueError(f"Неизвестный бэкенд хранилища сессий: {backend}")
+
+
+def create_session_store() -> SessionStore:
+    """Хранилище сессий из настроек"""
+    return SessionStore(
+        create_backends(settings.session_store_backend, settings.session_store_url),
+        default_ttl=settings.session_timeout * 60,
+        l1_size=settings.session_l1_size,
+        l1_ttl=settings.session_l1_ttl,
+        replicas=settings.session_ring_replicas,
+    )
+
+
+# Глобальный экземпляр
+session_store = create_session_store()
@@ -0,0 +1,402 @@
+"""
+StarCourier Web - Playthrough Simulator
+Монте-Карло симуляция прохождений по графу сцен
+
+Граф сцен сворачивается в плоские массивы NumPy: смещения выборов
+каждой сцены, целевые сцены, изменения характеристик и маски
+изменяемых характеристик. Партия прохождений идёт одновременно:
+на каждом шаге все ещё не завершённые прохождения делают выбор,
+применяют изменения с ограничением 0..100 (как apply_stat_changes)
+и проверяют конец игры (как check_game_over и концовки сцен).
+
+Отчёт: распределение исходов, длины путей, итоговые характеристики
+и средние характеристики при входе в каждую сцену.
+
+Запуск из командной строки:
+    python -m app.services.simulation --runs 1000000 --policy cautious
+
+NumPy - необязательная зависимость (pip install numpy).
+
+Автор: QuadDarv1ne
+Версия: 1.0.0
+"""
+
+import argparse
+import json
+import logging
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from app.services.player_state import STAT_DEFAULT, STAT_MAX, STAT_MIN
+from app.services.scene_graph import MISSING_SCENE, SceneGraph
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Политики выбора
+POLICY_UNIFORM = "uniform"
+POLICY_CAUTIOUS = "cautious"
+POLICIES = (POLICY_UNIFORM, POLICY_CAUTIOUS)
+
+# Исходы прохождения помимо типов концовок
+OUTCOME_HEALTH = "health_depleted"
+OUTCOME_MORALE = "morale_depleted"
+OUTCOME_DEAD_END = "dead_end"
+OUTCOME_MISSING = "missing_scene"
+OUTCOME_MAX_STEPS = "max_steps"
+
+# Характеристики, обнуление которых заканчивает игру (как check_game_over)
+GAME_OVER_STATS = (("health", OUTCOME_HEALTH), ("morale", OUTCOME_MORALE))
+
+
+class SimulationUnavailable(RuntimeError):
+    """NumPy не установлен"""
+
+
+# ============================================================================
+# TABLE
+# ============================================================================
+
+class SimulationTable:
+    """
+    Граф сцен в виде массивов для пакетной симуляции
+
+    Выборы всех сцен лежат подряд: выборы сцены i занимают
+    позиции offsets[i]..offsets[i+1]-1 массивов targets, deltas, masks.
+
+    Args:
+        graph: Скомпилированный граф сцен
+        initial_stats: Начальные характеристики игрока
+        start_scene: ID начальной сцены
+    """
+
+    def __init__(self, graph: SceneGraph, initial_stats: Mapping[str, int],
+                 start_scene: str = "start") -> None:
+        if not NUMPY_AVAILABLE:
+            raise SimulationUnavailable("Для симуляции нужен NumPy: pip install numpy")
+        if start_scene not in graph:
+            raise ValueError(f"Начальная сцена '{start_scene}' не найдена")
+
+        # Характеристики: начальные, затем встречающиеся только в выборах
+        stat_names = list(initial_stats)
+        known = set(stat_names)
+        for node in graph.nodes:
+            for transition in node.transitions:
+                for stat, _ in transition.stats:
+                    if stat not in known:
+                        known.add(stat)
+                        stat_names.append(stat)
+        stat_index = {stat: i for i, stat in enumerate(stat_names)}
+
+        self.graph = graph
+        self.stat_names: Tuple[str, ...] = tuple(stat_names)
+        self.start = graph.index[start_scene]
+        # Неизвестная характеристика отсчитывается от 50, как в apply_stat_changes
+        self.initial = np.array(
+            [initial_stats.get(stat, STAT_DEFAULT) for stat in stat_names], dtype=np.int32
+        )
+
+        counts = [len(node.transitions) for node in graph.nodes]
+        self.offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+        self.counts = np.asarray(counts, dtype=np.int64)
+
+        total = int(self.offsets[-1])
+        self.targets = np.full(total, MISSING_SCENE, dtype=np.int64)
+        self.deltas = np.zeros((total, len(stat_names)), dtype=np.int32)
+        self.masks = np.zeros((total, len(stat_names)), dtype=bool)
+        for node in graph.nodes:
+            base = int(self.offsets[node.index])
+            for j, transition in enumerate(node.transitions):
+                self.targets[base + j] = transition.target
+                for stat, change in transition.stats:
+                    self.deltas[base + j, stat_index[stat]] += change
+                    self.masks[base + j, stat_index[stat]] = True
+
+        # Исходы: типы концовок, затем особые исходы
+        ending_names = sorted({ending for ending in graph.ending_types if ending})
+        self.outcomes: Tuple[str, ...] = tuple(ending_names) + (
+            OUTCOME_HEALTH, OUTCOME_MORALE, OUTCOME_DEAD_END, OUTCOME_MISSING, OUTCOME_MAX_STEPS
+        )
+        outcome_index = {outcome: i for i, outcome in enumerate(self.outcomes)}
+        self.scene_outcome = np.array(
+            [outcome_index[ending] if ending else -1 for ending in graph.ending_types],
+            dtype=np.int64
+        )
+        self.outcome_index = outcome_index
+        self.game_over = [
+            (stat_index[stat], outcome_index[outcome])
+            for stat, outcome in GAME_OVER_STATS if stat in stat_index
+        ]
+
+    def policy_weights(self, policy: str) -> Optional["np.ndarray"]:
+        """
+        Веса выборов для политики (None - равновероятный выбор)
+
+        cautious предпочитает выборы, повышающие здоровье и мораль:
+        вес удваивается на каждые +10 к их сумме.
+        """
+        if policy == POLICY_UNIFORM:
+            return None
+        if policy == POLICY_CAUTIOUS:
+            gain = np.zeros(len(self.targets), dtype=np.float64)
+            for stat, _ in self.game_over:
+                gain += self.deltas[:, stat]
+            return np.exp2(np.clip(gain / 10.0, -10, 10))
+        raise ValueError(f"Неизвестная политика '{policy}', доступны: {', '.join(POLICIES)}")
+
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+class _Accumulator:
+    """Накопление статистики по партиям"""
+
+    def __init__(self, table: SimulationTable, max_steps: int) -> None:
+        scenes, stats = len(table.graph), len(table.stat_names)
+        self.table = table
+        self.outcomes = np.zeros(len(table.outcomes), dtype=np.int64)
+        self.outcome_lengths = np.zeros(len(table.outcomes), dtype=np.int64)
+        self.lengths = np.zeros(max_steps + 1, dtype=np.int64)
+        self.visits = np.zeros(scenes, dtype=np.int64)
+        self.scene_sum = np.zeros((scenes, stats), dtype=np.float64)
+        self.scene_sq = np.zeros((scenes, stats), dtype=np.float64)
+        self.final_sum = np.zeros(stats, dtype=np.float64)
+        self.final_sq = np.zeros(stats, dtype=np.float64)
+        self.final_hist: List[Any] = [np.zeros(0, dtype=np.int64) for _ in range(stats)]
+        # Характеристики не опускаются ниже min(0, начальное значение)
+        self.offset = -min(0, int(table.initial.min()))
+
+    def visit(self, scenes: "np.ndarray", stats: "np.ndarray") -> None:
+        """Вход в сцены с текущими характеристиками"""
+        n = len(self.visits)
+        self.visits += np.bincount(scenes, minlength=n)
+        values = stats.astype(np.float64)
+        for k in range(stats.shape[1]):
+            self.scene_sum[:, k] += np.bincount(scenes, weights=values[:, k], minlength=n)
+            self.scene_sq[:, k] += np.bincount(scenes, weights=values[:, k] ** 2, minlength=n)
+
+    def finish(self, outcomes: "np.ndarray", lengths: "np.ndarray", stats: "np.ndarray") -> None:
+        """Итоги партии"""
+        self.outcomes += np.bincount(outcomes, minlength=len(self.outcomes))
+        self.outcome_lengths += np.bincount(outcomes, weights=lengths, minlength=len(self.outcomes)) \
+            .astype(np.int64)
+        self.lengths += np.bincount(lengths, minlength=len(self.lengths))
+        values = stats.astype(np.float64)
+        self.final_sum += values.sum(axis=0)
+        self.final_sq += (values ** 2).sum(axis=0)
+        for k in range(stats.shape[1]):
+            hist = np.bincount(stats[:, k] + self.offset)
+            if len(hist) > len(self.final_hist[k]):
+                hist[:len(self.final_hist[k])] += self.final_hist[k]
+                self.final_hist[k] = hist
+            else:
+                self.final_hist[k][:len(hist)] += hist
+
+
+def _percentile(hist: "np.ndarray", q: float, offset: int = 0) -> int:
+    """Процентиль по гистограмме целых значений"""
+    cumulative = np.cumsum(hist)
+    return int(np.searchsorted(cumulative, q * cumulative[-1], side="left")) - offset
+
+
+def _describe(total: float, squares: float, count: int) -> Dict[str, float]:
+    mean = total / count
+    return {"mean": round(mean, 2), "std": round(max(squares / count - mean * mean, 0.0) ** 0.5, 2)}
+
+
+def _run_batch(table: SimulationTable, runs: int, rng: "np.random.Generator",
+               weights: Optional["np.ndarray"], max_steps: int, acc: _Accumulator) -> None:
+    """Одна партия прохождений"""
+    scene = np.full(runs, table.start, dtype=np.int64)
+    stats = np.tile(table.initial, (runs, 1))
+    lengths = np.zeros(runs, dtype=np.int64)
+    outcomes = np.full(runs, table.outcome_index[OUTCOME_MAX_STEPS], dtype=np.int64)
+    active = np.arange(runs)
+    acc.visit(scene, stats)
+
+    if weights is not None:
+        cumulative = np.cumsum(weights)
+        segment_start = np.concatenate(([0.0], cumulative))[table.offsets[:-1]]
+        segment_total = np.concatenate(([0.0], cumulative))[table.offsets[1:]] - segment_start
+
+    for _ in range(max_steps):
+        if not active.size:
+            break
+        current = scene[active]
+
+        # Сцена без выборов (и не концовка): тупик
+        dead = table.counts[current] == 0
+        if dead.any():
+            outcomes[active[dead]] = table.outcome_index[OUTCOME_DEAD_END]
+            active, current = active[~dead], current[~dead]
+            if not active.size:
+                break
+
+        # Выбор
+        first = table.offsets[current]
+        last = table.offsets[current + 1] - 1
+        u = rng.random(active.size)
+        if weights is None:
+            choice = first + (u * table.counts[current]).astype(np.int64)
+        else:
+            point = segment_start[current] + u * segment_total[current]
+            choice = np.clip(np.searchsorted(cumulative, point, side="right"), first, last)
+
+        # Переход в отсутствующую сцену: API ответит 404
+        target = table.targets[choice]
+        missing = target == MISSING_SCENE
+        if missing.any():
+            outcomes[active[missing]] = table.outcome_index[OUTCOME_MISSING]
+            active, choice, target = active[~missing], choice[~missing], target[~missing]
+            if not active.size:
+                break
+
+        # Изменения характеристик: ограничиваются только затронутые выбором
+        current_stats = stats[active]
+        changed = np.clip(current_stats + table.deltas[choice], STAT_MIN, STAT_MAX)
+        current_stats = np.where(table.masks[choice], changed, current_stats)
+        stats[active] = current_stats
+        scene[active] = target
+        lengths[active] += 1
+        acc.visit(target, current_stats)
+
+        # Конец игры: обнуление характеристик важнее концовки сцены
+        outcome = table.scene_outcome[target]
+        for stat, code in reversed(table.game_over):
+            outcome = np.where(current_stats[:, stat] <= 0, code, outcome)
+        done = outcome >= 0
+        if done.any():
+            outcomes[active[done]] = outcome[done]
+            active = active[~done]
+
+    acc.finish(outcomes, lengths, stats)
+
+
+def simulate(
+    table: SimulationTable,
+    runs: int = 10000,
+    policy: str = POLICY_UNIFORM,
+    seed: Optional[int] = None,
+    max_steps: int = 200,
+    batch_size: int = 100000,
+    include_scenes: bool = True
+) -> Dict[str, Any]:
+    """
+    Симулировать прохождения
+
+    Args:
+        table: Граф сцен в виде массивов
+        runs: Число прохождений
+        policy: Политика выбора (uniform, cautious)
+        seed: Зерно генератора (для воспроизводимости)
+        max_steps: Максимум выборов в прохождении
+        batch_size: Прохождений в одной партии (ограничивает память)
+        include_scenes: Включить характеристики по сценам
+
+    Returns:
+        Отчёт симуляции
+    """
+    weights = table.policy_weights(policy)
+    rng = np.random.default_rng(seed)
+    acc = _Accumulator(table, max_steps)
+
+    started = time.perf_counter()
+    remaining = runs
+    while remaining > 0:
+        batch = min(batch_size, remaining)
+        _run_batch(table, batch, rng, weights, max_steps, acc)
+        remaining -= batch
+    elapsed = time.perf_counter() - started
+
+    report: Dict[str, Any] = {
+        "runs": runs,
+        "policy": policy,
+        "seed": seed,
+        "max_steps": max_steps,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "runs_per_second": int(runs / elapsed) if elapsed > 0 else None,
+        "outcomes": {
+            outcome: {
+                "count": int(count),
+                "share": round(count / runs, 4),
+                "avg_length": round(acc.outcome_lengths[i] / count, 2),
+            }
+            for i, (outcome, count) in enumerate(zip(table.outcomes, acc.outcomes))
+            if count
+        },
+        "path_length": {
+            "mean": round(float(np.dot(np.arange(len(acc.lengths)), acc.lengths)) / runs, 2),
+            "median": _percentile(acc.lengths, 0.5),
+            "p90": _percentile(acc.lengths, 0.9),
+            "max": int(np.flatnonzero(acc.lengths)[-1]),
+        },
+        "final_stats": {
+            stat: {
+                **_describe(acc.final_sum[k], acc.final_sq[k], runs),
+                "p10": _percentile(acc.final_hist[k], 0.1, acc.offset),
+                "p50": _percentile(acc.final_hist[k], 0.5, acc.offset),
+                "p90": _percentile(acc.final_hist[k], 0.9, acc.offset),
+            }
+            for k, stat in enumerate(table.stat_names)
+        },
+    }
+
+    if include_scenes:
+        report["scenes"] = {
+            scene_id: {
+                "visits": int(acc.visits[i]),
+                "stats": {
+                    stat: _describe(acc.scene_sum[i, k], acc.scene_sq[i, k], int(acc.visits[i]))
+                    for k, stat in enumerate(table.stat_names)
+                },
+            }
+            for i, scene_id in enumerate(table.graph.scene_ids)
+            if acc.visits[i]
+        }
+
+    return report
+
+
+def build_simulation_table() -> SimulationTable:
+    """Таблица симуляции для текущего снимка контента"""
+    from app.services.content_store import get_content
+    from app.services.data_service import data_service
+
+    return SimulationTable(get_content().scene_graph, data_service.get_initial_stats())
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Симуляция из командной строки, отчёт в JSON"""
+    parser = argparse.ArgumentParser(description="Монте-Карло симуляция прохождений")
+    parser.add_argument("--runs", type=int, default=100000, help="Число прохождений")
+    parser.add_argument("--policy", choices=POLICIES, default=POLICY_UNIFORM, help="Политика выбора")
+    parser.add_argument("--seed", type=int, default=None, help="Зерно генератора")
+    parser.add_argument("--max-steps", type=int, default=200, help="Максимум выборов")
+    parser.add_argument("--batch-size", type=int, default=100000, help="Прохождений в партии")
+    parser.add_argument("--scenes", action="store_true", help="Характеристики по сценам")
+    args = parser.parse_args(argv)
+
+    from app.services.data_service import data_service
+    data_service.load_data()
+
+    report = simulate(
+        build_simulation_table(), runs=args.runs, policy=args.policy, seed=args.seed,
+        max_steps=args.max_steps, batch_size=args.batch_size, include_scenes=args.scenes
+    )
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
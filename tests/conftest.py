@@ -0,0 +1,151 @@
+"""
+StarCourier Web - Test Fixtures
+Общие заглушки тестов: управляемые часы и Redis без сервера
+"""
+
+import asyncio
+import pytest
+import sys
+import os
+
+# Добавляем путь к backend
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.services.session_store import record_version
+
+
+class FakeClock:
+    """Управляемые часы"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakePubSub:
+    """Подписка заглушки Redis"""
+
+    def __init__(self, server):
+        self.server = server
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.server.subscribers.setdefault(channel, []).append(self)
+
+    async def unsubscribe(self, channel):
+        subscribers = self.server.subscribers.get(channel, [])
+        if self in subscribers:
+            subscribers.remove(self)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        pass
+
+
+class FakeRedis:
+    """
+    Локальная замена Redis без сервера
+
+    Команды RedisCache (get/setex/delete/exists/flushdb, pub/sub)
+    и RedisSessionBackend (get/set(px=)/delete, eval скрипта
+    compare-and-set). Счётчики: gets - чтения, calls - все команды.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or FakeClock()
+        # Ключ -> (значение, момент истечения или None)
+        self.data = {}
+        self.subscribers = {}
+        self.gets = 0
+        self.calls = 0
+
+    def _read(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self.clock():
+            del self.data[key]
+            return None
+        return value
+
+    def _write(self, key, value, ttl):
+        value = value.encode() if isinstance(value, str) else value
+        self.data[key] = (value, self.clock() + ttl if ttl else None)
+
+    async def get(self, key):
+        self.calls += 1
+        self.gets += 1
+        return self._read(key)
+
+    async def set(self, key, value, px=None, ex=None):
+        self.calls += 1
+        self._write(key, value, px / 1000 if px else ex)
+        return True
+
+    async def setex(self, key, ttl, value):
+        self.calls += 1
+        self._write(key, value, ttl)
+        return True
+
+    async def delete(self, *keys):
+        self.calls += 1
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def exists(self, key):
+        self.calls += 1
+        return int(self._read(key) is not None)
+
+    async def flushdb(self):
+        self.calls += 1
+        self.data.clear()
+
+    async def eval(self, script, numkeys, key, value, expected, px):
+        """Скрипт compare-and-set RedisSessionBackend"""
+        self.calls += 1
+        current = self._read(key)
+        if (0 if current is None else record_version(current)) != int(expected):
+            return 0
+        self._write(key, value, int(px) / 1000 or None)
+        return 1
+
+    async def publish(self, channel, message):
+        self.calls += 1
+        subscribers = list(self.subscribers.get(channel, []))
+        for pubsub in subscribers:
+            pubsub.queue.put_nowait({"type": "message", "channel": channel, "data": message.encode()})
+        return len(subscribers)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def clock():
+    """Управляемые часы (время начинается с 0)"""
+    return FakeClock()
+
+
+@pytest.fixture
+def make_redis(clock):
+    """Фабрика заглушек Redis на общих часах (несколько узлов)"""
+    def make():
+        return FakeRedis(clock)
+    return make
+
+
+@pytest.fixture
+def fake_redis(make_redis):
+    """Заглушка Redis на часах clock"""
+    return make_redis()
@@ -46,6 +46,30 @@ class TestHealthCheck:
         data = response.json()
         assert data["name"] == "StarCourier Web"
 
+    def test_startup_report(self):
+        """Диагностика старта содержит замер импортов и отложенные роутеры"""
+        response = client.get("/health/startup?limit=3")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["imports"]["slowest"]) <= 3
+        assert data["imports"]["modules_count"] > 0
+        assert {r["prefix"] for r in data["lazy_routers"]} == {"/api/admin", "/api/data"}
+
+    def test_lazy_router_loads_on_first_request(self):
+        """Отложенный роутер подключается первым запросом к своему префиксу"""
+        response = client.get("/api/data/summary")
+        assert response.status_code != 404
+
+        statuses = client.get("/health/startup").json()["lazy_routers"]
+        assert any(r["prefix"] == "/api/data" and r["loaded"] for r in statuses)
+        assert client.get("/api/data/no-such-endpoint").status_code == 404
+
+    def test_openapi_includes_lazy_routers(self):
+        """Схема OpenAPI содержит пути отложенных роутеров"""
+        paths = client.get("/openapi.json").json()["paths"]
+        assert any(path.startswith("/api/admin") for path in paths)
+        assert any(path.startswith("/api/data") for path in paths)
+
 
 # ============================================================================
 # GAME API TESTS
@@ -65,6 +89,17 @@ class TestGameAPI:
         assert "stats" in data
         assert "relationships" in data
 
+    def test_player_id_length_limited(self):
+        """player_id длиннее колонки БД отклоняется до записи событий"""
+        from pydantic import ValidationError
+        from app.models.game import GameChoiceRequest, GameStartRequest
+
+        GameStartRequest(player_id="p" * 36)
+        with pytest.raises(ValidationError):
+            GameStartRequest(player_id="p" * 37)
+        with pytest.raises(ValidationError):
+            GameChoiceRequest(player_id="p" * 37, choice_index=0)
+
     def test_start_game_scene_has_choices(self):
         """Начальная сцена должна иметь выборы"""
         response = client.post("/api/game/start", json={"player_id": "test_player_2"})
@@ -109,6 +144,32 @@ class TestGameAPI:
         })
         assert response.status_code == 404
 
+    def test_make_choice_by_index(self):
+        """Выбор по номеру: сцена и статистика определяются сервером"""
+        start = client.post("/api/game/start", json={"player_id": "test_player_6"}).json()
+        choice = start["scene"]["choices"][0]
+
+        response = client.post("/api/game/choose", json={
+            "player_id": "test_player_6",
+            "choice_index": 0,
+            "stats": {"health": -100}
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["scene"]["id"] == choice["next"]
+        assert data["stats"]["health"] == start["stats"]["health"]
+        for stat, change in (choice["stats"] or {}).items():
+            assert data["stats"][stat] == max(0, min(100, start["stats"][stat] + change))
+
+    def test_make_choice_invalid_index(self):
+        """Несуществующий номер выбора отклоняется"""
+        client.post("/api/game/start", json={"player_id": "test_player_7"})
+        response = client.post("/api/game/choose", json={
+            "player_id": "test_player_7",
+            "choice_index": 999
+        })
+        assert response.status_code == 400
+
     def test_get_player_stats(self):
         """Тест получения статистики игрока"""
         # Начинаем игру
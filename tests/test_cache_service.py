@@ -0,0 +1,359 @@
+"""
+StarCourier Web - Cache Service Tests
+Тесты сервиса кэширования
+
+Запуск: pytest tests/test_cache_service.py -v
+"""
+
+import asyncio
+import pytest
+import sys
+import os
+
+# Добавляем путь к backend
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.services.cache_service import (
+    CacheService, InMemoryCache, RedisCache, TieredCache, cache_service, cached,
+    should_refresh_early
+)
+
+
+def make_service(clock, server=None):
+    """CacheService на управляемых часах (in-memory или поверх заглушки Redis)"""
+    service = CacheService()
+    service._clock = clock
+    service._memory_cache = InMemoryCache(clock=clock)
+    if server is not None:
+        service._redis_cache = RedisCache("redis://fake/0")
+        service._redis_cache._client = server
+        service._use_redis = True
+    return service
+
+
+class TestInMemoryCache:
+    """Тесты in-memory кэша"""
+
+    def test_lazy_expiry_on_access(self, clock):
+        """Истёкший ключ не возвращается, даже если очистка до него не дошла"""
+        cache = InMemoryCache(sweep_batch=0, clock=clock)
+        cache.set("a", 1, ttl=10)
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10
+        assert not cache.exists("a")
+        assert cache.get("a") is None
+        assert cache.get_stats()["expired"] == 1
+
+    def test_bounded_sweep(self, clock):
+        """Очистка удаляет не больше limit записей за шаг, в порядке сроков"""
+        cache = InMemoryCache(sweep_batch=0, clock=clock)
+        for i in range(10):
+            cache.set(f"k{i}", i, ttl=i + 1)
+        clock.now = 100
+        assert cache.sweep(3) == 3
+        assert cache.get_stats()["size"] == 7
+        assert "k0" not in cache._cache and "k3" in cache._cache
+        assert cache.sweep() == 7
+
+    def test_overwrite_keeps_new_deadline(self, clock):
+        """Устаревшая запись кучи не удаляет перезаписанный ключ"""
+        cache = InMemoryCache(sweep_batch=0, clock=clock)
+        cache.set("a", 1, ttl=5)
+        cache.set("a", 2, ttl=50)
+        clock.now = 10
+        assert cache.sweep() == 0
+        assert cache.get("a") == 2
+
+    def test_heap_compaction(self, clock):
+        """Куча не растёт от перезаписей одного ключа"""
+        cache = InMemoryCache(clock=clock)
+        for i in range(1000):
+            cache.set("hot", i, ttl=60)
+        assert len(cache._heap) < 200
+
+    def test_lru_eviction_on_new_keys_only(self, clock):
+        """Перезапись существующего ключа не вытесняет другие"""
+        cache = InMemoryCache(max_size=2, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("b", 3)
+        assert cache.get("a") == 1
+        cache.set("c", 4)
+        assert cache.get("b") is None
+        assert cache.keys() == ["a", "c"]
+
+
+class TestSingleFlight:
+    """Тесты объединения одновременных промахов"""
+
+    def test_concurrent_misses_run_factory_once(self):
+        """Одновременные промахи по ключу вычисляют значение один раз"""
+        service = CacheService()
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"top": [1, 2, 3]}
+
+        async def run():
+            results = await asyncio.gather(*(service.get_or_set("lb", factory) for _ in range(20)))
+            assert all(result == {"top": [1, 2, 3]} for result in results)
+            assert await service.get_or_set("lb", factory) == {"top": [1, 2, 3]}
+
+        asyncio.run(run())
+        assert len(calls) == 1
+        assert service.get_stats()["coalesced"] == 19
+        assert service.get_stats()["inflight"] == 0
+
+    def test_error_propagates_to_waiters(self):
+        """Исключение получают все ожидающие, следующий вызов вычисляет заново"""
+        service = CacheService()
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("db down")
+
+        async def run():
+            results = await asyncio.gather(
+                *(service.get_or_set("k", failing) for _ in range(5)), return_exceptions=True
+            )
+            assert all(isinstance(result, RuntimeError) for result in results)
+            assert await service.get_or_set("k", lambda: 42) == 42
+
+        asyncio.run(run())
+        assert len(calls) == 1
+        # Ошибка на промахе - не ошибка фонового обновления
+        assert service.get_stats()["refresh_errors"] == 0
+
+    def test_cancelled_waiter_does_not_cancel_flight(self):
+        """Отмена первого запроса не прерывает вычисление для остальных"""
+        service = CacheService()
+
+        async def factory():
+            await asyncio.sleep(0.02)
+            return "value"
+
+        async def run():
+            leader = asyncio.create_task(service.get_or_set("k", factory))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(service.get_or_set("k", factory))
+            await asyncio.sleep(0)
+            leader.cancel()
+            assert await follower == "value"
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+
+        asyncio.run(run())
+
+    def test_cached_decorator_coalesces(self):
+        """@cached объединяет одновременные вызовы"""
+        calls = []
+
+        @cached(key_prefix="test_single_flight", ttl=60)
+        async def load(board):
+            calls.append(board)
+            await asyncio.sleep(0.01)
+            return [board]
+
+        async def run():
+            results = await asyncio.gather(*(load("weekly") for _ in range(10)))
+            assert results == [["weekly"]] * 10
+            await cache_service.delete(cache_service._make_key("test_single_flight", "weekly"))
+
+        asyncio.run(run())
+        assert calls == ["weekly"]
+
+    def test_jittered_ttl_bounds(self):
+        """Разброс TTL остаётся в пределах ±jitter"""
+        values = {CacheService.jittered_ttl(100, 0.1) for _ in range(200)}
+        assert min(values) >= 90 and max(values) <= 110
+        assert len(values) > 1
+        assert CacheService.jittered_ttl(100, 0) == 100
+
+
+class TestStaleWhileRevalidate:
+    """Тесты отдачи устаревших значений и раннего обновления"""
+
+    @pytest.mark.parametrize("redis", [False, True])
+    def test_stale_value_served_while_refreshing(self, redis, clock, fake_redis):
+        """В окне устаревания отдаётся старое значение, обновление идёт в фоне"""
+        service = make_service(clock, fake_redis if redis else None)
+        version = {"n": 0}
+
+        async def factory():
+            version["n"] += 1
+            return {"n": version["n"]}
+
+        async def run():
+            assert await service.get_or_set("dash", factory, ttl=10, stale_ttl=5) == {"n": 1}
+            clock.now = 12
+            # Устаревшее значение сразу, без ожидания factory
+            assert await service.get_or_set("dash", factory, ttl=10, stale_ttl=5) == {"n": 1}
+            assert await service.get("dash") is None
+            await asyncio.sleep(0.01)
+            assert await service.get_or_set("dash", factory, ttl=10, stale_ttl=5) == {"n": 2}
+            # За окном устаревания - обычный промах
+            clock.now = 40
+            assert await service.get_or_set("dash", factory, ttl=10, stale_ttl=5) == {"n": 3}
+
+        asyncio.run(run())
+        assert service.get_stats()["stale_served"] == 1
+
+    def test_refresh_error_keeps_stale_value(self, clock):
+        """Ошибка фонового обновления не ломает отдачу устаревшего значения"""
+        service = make_service(clock)
+
+        async def failing():
+            raise RuntimeError("db down")
+
+        async def run():
+            await service.get_or_set("k", lambda: "old", ttl=10, stale_ttl=30)
+            clock.now = 15
+            assert await service.get_or_set("k", failing, ttl=10, stale_ttl=30) == "old"
+            await asyncio.sleep(0.01)
+            assert await service.get_or_set("k", failing, ttl=10, stale_ttl=30) == "old"
+            await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+        assert service.get_stats()["refresh_errors"] == 2
+
+    def test_early_refresh_before_expiry(self, clock):
+        """XFetch обновляет горячий ключ до истечения TTL"""
+        service = make_service(clock)
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return len(calls)
+
+        async def run():
+            await service.get_or_set("hot", factory, ttl=60, early_refresh=1.0)
+            # До истечения - тысячные доли секунды, вычисление длится 0.02 с
+            clock.now = 59.999
+            for _ in range(20):
+                assert await service.get_or_set("hot", factory, ttl=60, early_refresh=1.0) >= 1
+            await asyncio.sleep(0.05)
+
+        asyncio.run(run())
+        assert len(calls) >= 2
+        assert service.get_stats()["early_refreshes"] >= 1
+
+    def test_should_refresh_early_probability(self):
+        """Вероятность раннего обновления растёт к концу срока"""
+        near = sum(should_refresh_early(0.1, 1.0, 1.0) for _ in range(1000))
+        far = sum(should_refresh_early(10.0, 1.0, 1.0) for _ in range(1000))
+        assert near > 800
+        assert far < 5
+        assert not should_refresh_early(0.1, 1.0, 0)
+
+
+def make_worker(server, clock):
+    """Кэш воркера: L1 перед общей заглушкой Redis"""
+    redis_cache = RedisCache("redis://fake/0")
+    redis_cache._client = server
+    return TieredCache(redis_cache, l1_size=100, l1_ttl=5, clock=clock)
+
+
+class TestTieredCache:
+    """Тесты L1 перед Redis с инвалидацией по pub/sub"""
+
+    def test_l1_serves_repeated_reads(self, clock, fake_redis):
+        """Повторные чтения не ходят в Redis"""
+
+        async def run():
+            worker = make_worker(fake_redis, clock)
+            worker.start()
+            assert await worker.wait_subscribed()
+            await worker.set("scenes", {"count": 83}, 300)
+            for _ in range(10):
+                assert await worker.get("scenes") == {"count": 83}
+            assert fake_redis.gets == 0
+            # Запись L1 живёт не дольше l1_ttl
+            clock.now = 6
+            assert await worker.get("scenes") == {"count": 83}
+            assert fake_redis.gets == 1
+            stats = worker.get_stats()
+            await worker.close()
+            return stats
+
+        stats = asyncio.run(run())
+        assert stats["tiers"]["l1"]["hits"] == 10
+        assert stats["tiers"]["l2"]["hits"] == 1
+        assert stats["hits"] == 11
+
+    def test_invalidation_broadcast(self, clock, fake_redis):
+        """Запись на одном воркере удаляет ключ из L1 другого"""
+
+        async def run():
+            worker_a = make_worker(fake_redis, clock)
+            worker_b = make_worker(fake_redis, clock)
+            worker_a.start()
+            worker_b.start()
+            assert await worker_a.wait_subscribed() and await worker_b.wait_subscribed()
+
+            await worker_a.set("leaderboard", [1], 300)
+            assert await worker_b.get("leaderboard") == [1]
+            await worker_a.set("leaderboard", [2], 300)
+            await asyncio.sleep(0.01)
+            assert await worker_b.get("leaderboard") == [2]
+
+            await worker_b.delete("leaderboard")
+            await asyncio.sleep(0.01)
+            assert await worker_a.get("leaderboard") is None
+
+            await worker_a.set("x", 1, 300)
+            assert await worker_b.get("x") == 1
+            await worker_a.clear()
+            await asyncio.sleep(0.01)
+            assert await worker_b.get("x") is None
+            stats = worker_b.get_stats()["invalidation"]
+            await worker_a.close()
+            await worker_b.close()
+            return stats
+
+        stats = asyncio.run(run())
+        assert stats["subscribed"]
+        assert stats["sent"] == 1
+        assert stats["received"] == 4
+
+    def test_no_l1_without_subscription(self, clock, fake_redis):
+        """Без подписки на инвалидации L1 не заполняется"""
+
+        async def run():
+            worker = make_worker(fake_redis, clock)
+            await worker.set("k", "v", 300)
+            assert await worker.get("k") == "v"
+            assert await worker.get("k") == "v"
+
+        asyncio.run(run())
+        assert fake_redis.gets == 2
+
+    def test_stale_read_not_cached_after_invalidation(self, clock, fake_redis):
+        """Значение, прочитанное до инвалидации, не попадает в L1"""
+
+        async def run():
+            worker = make_worker(fake_redis, clock)
+            worker.start()
+            await worker.wait_subscribed()
+            await fake_redis.setex("k", 300, '"old"')
+            original_get = fake_redis.get
+
+            async def slow_get(key):
+                value = await original_get(key)
+                # Пока идёт чтение, другой воркер перезаписал ключ
+                worker.handle_message(b"other|k")
+                return value
+
+            fake_redis.get = slow_get
+            assert await worker.get("k") == "old"
+            fake_redis.get = original_get
+            await fake_redis.setex("k", 300, '"new"')
+            assert await worker.get("k") == "new"
+            await worker.close()
+
+        asyncio.run(run())
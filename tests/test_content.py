@@ -0,0 +1,612 @@
+"""
+StarCourier Web - Content Store Tests
+Тесты хранилища контента и индексов
+
+Запуск: pytest tests/test_content.py -v
+"""
+
+import pytest
+import shutil
+import sys
+import os
+
+# Добавляем путь к backend
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.services.content_bundle import BUNDLE_FILENAME, read_bundle_version, write_bundle
+from app.services.content_store import (
+    ContentStore, ContentValidationError, FrozenDict, content_store
+)
+from app.services.scene_analysis import build_scene_analysis
+from app.services.scene_graph import build_scene_graph
+
+
+# ============================================================================
+# CONTENT STORE TESTS
+# ============================================================================
+
+class TestContentStore:
+    """Тесты ContentStore"""
+
+    def test_snapshot_contains_all_sections(self):
+        """Снимок содержит все разделы контента"""
+        snapshot = ContentStore().snapshot
+        assert "start" in snapshot.scenes
+        assert len(snapshot.characters) > 0
+        assert "metadata" in snapshot.abilities
+        assert "q6_01" in snapshot.quests
+        assert len(snapshot.achievements["achievements"]) > 0
+
+    def test_snapshot_is_cached(self):
+        """Снимок строится один раз"""
+        store = ContentStore()
+        assert store.snapshot is store.snapshot
+
+    def test_snapshot_is_read_only(self):
+        """Данные снимка нельзя изменить"""
+        snapshot = ContentStore().snapshot
+        assert isinstance(snapshot.scenes, FrozenDict)
+        with pytest.raises(TypeError):
+            snapshot.scenes["start"] = {}
+        with pytest.raises(TypeError):
+            snapshot.scenes["start"].update({"title": "hacked"})
+
+    def test_strings_are_interned(self):
+        """Повторяющиеся ID хранятся в одном экземпляре"""
+        snapshot = ContentStore(use_bundle=False).snapshot
+        scene_id = next(iter(snapshot.scenes))
+        assert scene_id is sys.intern("".join(scene_id))
+
+    def test_service_keys_excluded_from_characters(self):
+        """Служебные записи characters.json не считаются персонажами"""
+        characters = content_store.snapshot.characters
+        assert "metadata" not in characters
+        assert "player_template" not in characters
+
+    def test_reload_keeps_snapshot_for_same_files(self):
+        """Без изменений файлов перезагрузка возвращает тот же снимок"""
+        store = ContentStore()
+        first = store.snapshot
+        assert store.reload() is first
+
+    def test_broken_content_keeps_previous_snapshot(self, tmp_path):
+        """Повреждённый файл не подменяет рабочий снимок"""
+        shutil.copytree(content_store.data_dir, tmp_path, dirs_exist_ok=True)
+        store = ContentStore(tmp_path)
+        first = store.snapshot
+
+        (tmp_path / "scenes.json").write_text("{broken", encoding="utf-8")
+        with pytest.raises(ContentValidationError):
+            store.reload()
+
+        assert store.snapshot is first
+        assert store.get_status()["last_error"]
+
+    def test_rejected_reload_is_reported(self, tmp_path, caplog):
+        """DataService сообщает об отклонённой перезагрузке"""
+        from app.services.data_service import DataService
+
+        shutil.copytree(content_store.data_dir, tmp_path, dirs_exist_ok=True)
+        service = DataService(ContentStore(tmp_path))
+        service.load_data()
+        assert service.reload_data() is True
+
+        (tmp_path / "scenes.json").write_text("{broken", encoding="utf-8")
+        assert service.reload_data() is False
+        assert "Перезагрузка данных отклонена" in caplog.text
+        assert "start" in service.get_scenes()
+
+
+# ============================================================================
+# CONTENT BUNDLE TESTS
+# ============================================================================
+
+class TestContentBundle:
+    """Тесты бинарного бандла контента"""
+
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        """Копия каталога данных с собранным бандлом"""
+        shutil.copytree(content_store.data_dir, tmp_path, dirs_exist_ok=True)
+        snapshot = ContentStore(tmp_path, use_bundle=False).snapshot
+        write_bundle(snapshot, tmp_path / BUNDLE_FILENAME)
+        return tmp_path
+
+    def test_store_prefers_bundle(self, data_dir):
+        """Актуальный бандл загружается вместо JSON"""
+        store = ContentStore(data_dir, use_bundle=True)
+        snapshot = store.snapshot
+
+        assert store.get_status()["source"] == "bundle"
+        assert snapshot.version == read_bundle_version(data_dir / BUNDLE_FILENAME)
+        assert snapshot.scenes == content_store.snapshot.scenes
+        assert snapshot.quest_graph.prerequisites("q6_01") == \
+            content_store.snapshot.quest_graph.prerequisites("q6_01")
+
+    def test_stale_bundle_falls_back_to_json(self, data_dir):
+        """Бандл со старой версией игнорируется"""
+        scenes = data_dir / "scenes.json"
+        scenes.write_bytes(scenes.read_bytes() + b"\n")
+
+        store = ContentStore(data_dir, use_bundle=True)
+        assert store.snapshot.version != read_bundle_version(data_dir / BUNDLE_FILENAME)
+        assert store.get_status()["source"] == "json"
+
+    def test_corrupted_bundle_falls_back_to_json(self, data_dir):
+        """Повреждённый бандл не мешает загрузке"""
+        bundle = data_dir / BUNDLE_FILENAME
+        bundle.write_bytes(bundle.read_bytes()[:100])
+
+        store = ContentStore(data_dir, use_bundle=True)
+        assert "start" in store.snapshot.scenes
+        assert store.get_status()["source"] == "json"
+
+    def test_bundle_from_other_code_falls_back_to_json(self, data_dir, monkeypatch):
+        """Бандл, собранный другой версией кода индексов, не распаковывается"""
+        from app.services import content_bundle
+
+        monkeypatch.setattr(content_bundle, "code_fingerprint", lambda: b"\0" * 16)
+        store = ContentStore(data_dir, use_bundle=True)
+        assert "start" in store.snapshot.scenes
+        assert store.get_status()["source"] == "json"
+        assert read_bundle_version(data_dir / BUNDLE_FILENAME) is None
+
+    def test_unpickling_error_falls_back_to_json(self, data_dir, monkeypatch):
+        """Любая ошибка распаковки (например, TypeError) ведёт к чтению JSON"""
+        from app.services import content_bundle
+
+        def broken_loads(data):
+            raise TypeError("__init__() missing 1 required positional argument")
+
+        monkeypatch.setattr(content_bundle.pickle, "loads", broken_loads)
+        store = ContentStore(data_dir, use_bundle=True)
+        assert "start" in store.snapshot.scenes
+        assert store.get_status()["source"] == "json"
+        # Чтение JSON после бандла не пропускает номер поколения
+        assert store.snapshot.generation == 1
+
+    def test_indexes(self):
+        """Индексы снимка согласованы с данными"""
+        snapshot = content_store.snapshot
+        assert set(snapshot.scene_titles) == set(snapshot.scenes)
+        assert "metadata" not in snapshot.quest_index
+        assert snapshot.get_rarity_color("unknown") == "#9ca3af"
+
+
+# ============================================================================
+# SCENE GRAPH TESTS
+# ============================================================================
+
+class TestSceneGraph:
+    """Тесты скомпилированного графа сцен"""
+
+    def test_indexes_match_scenes(self):
+        """Индексы сцен согласованы с массивами графа"""
+        snapshot = content_store.snapshot
+        graph = snapshot.scene_graph
+        assert len(graph) == len(snapshot.scenes)
+        for scene_id, idx in graph.index.items():
+            assert graph.scene_ids[idx] == scene_id
+            assert graph.nodes[idx].index == idx
+
+    def test_transitions(self):
+        """Переходы указывают на индексы целевых сцен"""
+        snapshot = content_store.snapshot
+        graph = snapshot.scene_graph
+        node = graph.get("start")
+        for choice, target in zip(snapshot.scenes["start"]["choices"], node.targets):
+            if choice["next"] in graph:
+                assert graph.scene_ids[target] == choice["next"]
+            else:
+                assert target == -1
+
+    def test_transition_table(self):
+        """Таблица переходов хранит только числовые изменения характеристик"""
+        snapshot = content_store.snapshot
+        graph = snapshot.scene_graph
+        for scene_id, scene in snapshot.scenes.items():
+            node = graph.get(scene_id)
+            assert len(node.transitions) == len(scene.get("choices", []))
+            for choice, transition in zip(scene.get("choices", []), node.transitions):
+                assert transition.next_scene == choice.get("next", "")
+                assert all(isinstance(change, int) for _, change in transition.stats)
+        assert graph.get("start").transition(len(graph.get("start").transitions)) is None
+
+    def test_precompiled_response(self):
+        """Ответ сцены собран заранее"""
+        node = content_store.snapshot.scene_graph.get("start")
+        assert node.response.id == "start"
+        assert len(node.response.choices) == len(node.choices)
+        assert content_store.snapshot.scene_graph.get("missing_scene") is None
+
+
+class TestSceneAnalysis:
+    """Тесты статического анализа графа сцен"""
+
+    def setup_method(self):
+        scenes = {
+            "start": {"choices": [
+                {"next": "a", "stats": {"health": -30}},
+                {"next": "b", "stats": {"morale": 10}},
+                {"next": "nowhere"},
+            ]},
+            "a": {"choices": [
+                {"next": "defend_station", "stats": {"health": -80}},
+                {"next": "start"},
+            ]},
+            "b": {"choices": [{"next": "dead"}, {"next": "hide_artifact"}]},
+            "dead": {"choices": []},
+            "defend_station": {"choices": []},
+            "hide_artifact": {"choices": []},
+            "orphan": {"choices": [{"next": "start"}]},
+        }
+        self.analysis = build_scene_analysis(
+            build_scene_graph(scenes), {"health": 100, "morale": 75}
+        )
+
+    def test_content_problems(self):
+        """Недостижимые сцены, переходы в никуда и тупики"""
+        summary = self.analysis.summary()
+        assert summary["unreachable"] == ["orphan"]
+        assert summary["missing_targets"] == [
+            {"scene_id": "start", "choice_index": 2, "next": "nowhere"}
+        ]
+        assert summary["dead_ends"] == ["dead"]
+
+    def test_stat_bounds(self):
+        """Границы характеристик учитывают циклы, ограничение и конец игры"""
+        assert self.analysis.stat_range("start", "health") == (1, 100)
+        assert self.analysis.stat_range("a", "health") == (1, 70)
+        assert self.analysis.stat_range("b", "morale") == (85, 85)
+        # Переход в defend_station всегда обнуляет здоровье
+        assert self.analysis.stat_range("defend_station", "health") is None
+
+    def test_reachable_endings(self):
+        """Концовки, которые ещё можно получить из сцены"""
+        assert self.analysis.reachable_endings("start") == ["guardian"]
+        assert self.analysis.can_reach_ending("b", "guardian")
+        assert not self.analysis.can_reach_ending("a", "combat_victory")
+        assert self.analysis.reachable_endings("dead") == []
+
+    def test_snapshot_analysis(self):
+        """Анализ строится вместе со снимком контента"""
+        analysis = content_store.snapshot.scene_analysis
+        assert analysis.is_reachable("start")
+        assert analysis.scene_report("start")["stat_bounds"]["health"] == {"min": 100, "max": 100}
+
+
+# ============================================================================
+# PAYLOAD CACHE TESTS
+# ============================================================================
+
+class TestPayloadCache:
+    """Тесты кэша сериализованных ответов"""
+
+    def test_encode_matches_json_response(self):
+        """Кодирование совпадает с JSONResponse FastAPI"""
+        from fastapi.responses import JSONResponse
+        from app.services.payload_cache import encode_json
+
+        data = {"id": "start", "title": "Начало", "items": [1, 2]}
+        assert encode_json(data) == JSONResponse(data).body
+
+    def test_payload_built_once_per_snapshot(self):
+        """Ответ кодируется один раз на снимок"""
+        from app.services.payload_cache import get_payload
+
+        snapshot = ContentStore().snapshot
+        calls = []
+
+        def build():
+            calls.append(1)
+            return {"ok": True}
+
+        first = get_payload(snapshot, "test", build)
+        second = get_payload(snapshot, "test", build)
+        assert first is second
+        assert len(calls) == 1
+
+    def test_scene_endpoint_serves_cached_bytes(self):
+        """Эндпоинт сцены отдаёт закэшированный ответ"""
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        client = TestClient(app)
+        response = client.get("/api/game/scene/start")
+        assert response.status_code == 200
+        assert response.json()["id"] == "start"
+        assert content_store.snapshot.payloads["scene:start"] == response.content
+
+
+# ============================================================================
+# ETAG TESTS
+# ============================================================================
+
+class TestContentETag:
+    """Тесты условных GET-запросов"""
+
+    def setup_method(self):
+        from fastapi.testclient import TestClient
+        from app.main import app
+        self.client = TestClient(app)
+
+    def test_etag_header(self):
+        """Эндпоинты контента возвращают ETag и Cache-Control"""
+        response = self.client.get("/api/abilities")
+        assert response.status_code == 200
+        assert content_store.version in response.headers["etag"]
+        assert "cache-control" in response.headers
+
+    def test_not_modified(self):
+        """Совпадающий If-None-Match даёт 304 без тела"""
+        etag = self.client.get("/api/quests").headers["etag"]
+        response = self.client.get("/api/quests", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        weak = self.client.get("/api/scenes", headers={"If-None-Match": f"W/{etag}"})
+        assert weak.status_code == 304
+
+    def test_stale_etag(self):
+        """Устаревший ETag получает полный ответ"""
+        response = self.client.get("/api/characters", headers={"If-None-Match": '"old"'})
+        assert response.status_code == 200
+        assert response.json()
+
+    def test_other_paths_untouched(self):
+        """Остальные эндпоинты не получают ETag"""
+        response = self.client.get("/health")
+        assert "etag" not in response.headers
+
+    def test_player_achievements_not_cached(self):
+        """Достижения игрока меняются по ходу игры: ETag контента к ним не применяется"""
+        import asyncio
+        from app.services.achievement_tracker import achievement_tracker
+
+        player = {"visited_scenes": ["start"], "stats": {"health": 100}}
+        asyncio.run(achievement_tracker.on_change("etag_player", player))
+        try:
+            etag = self.client.get("/api/achievements").headers["etag"]
+            first = self.client.get("/api/achievements/player/etag_player",
+                                    headers={"If-None-Match": etag})
+            assert first.status_code == 200
+            assert "etag" not in first.headers
+
+            player["ending_type"] = "awakening"
+            asyncio.run(achievement_tracker.on_change("etag_player", player, ["ending_type"]))
+            second = self.client.get("/api/achievements/player/etag_player",
+                                     headers={"If-None-Match": etag})
+            assert second.status_code == 200
+            assert second.json()["unlocked_count"] >= first.json()["unlocked_count"]
+        finally:
+            achievement_tracker.forget("etag_player")
+
+
+# ============================================================================
+# ABILITY INDEX TESTS
+# ============================================================================
+
+class TestAbilityIndex:
+    """Тесты индекса способностей"""
+
+    ABILITIES = {
+        "metadata": {"branches": ["alchemy", "path", "psychic"]},
+        "alchemy": {
+            "potion": {"id": "alc_1", "level_required": 1, "chapters": [1, 2]},
+            "elixir": {"id": "alc_2", "level_required": 10, "chapters": [],
+                       "quest_unlock": "q1"},
+        },
+        "path": {
+            "alliance": {"fleet": {"id": "pa_1", "unlock": "alliance_path_chapter_13"}},
+        },
+        "psychic": {
+            "mind": {"id": "psy_1", "level_required": 5, "chapters": [2],
+                     "quest_unlock": "q1", "quest_requirement": "q2"},
+        },
+    }
+
+    def setup_method(self):
+        from app.services.ability_index import build_ability_index
+        self.index = build_ability_index(self.ABILITIES)
+
+    def test_get_by_id_and_key(self):
+        """Поиск по id и по ключу"""
+        assert self.index.get("alc_2")["level_required"] == 10
+        assert self.index.get("potion")["id"] == "alc_1"
+        assert self.index.get("alc_1", branch="psychic") is None
+        assert self.index.get("missing") is None
+
+    def test_by_level_and_chapter(self):
+        """Диапазон уровней и глава"""
+        assert list(self.index.by_level(5, 10)) == ["alchemy", "psychic"]
+        assert list(self.index.by_level(5, 10)["alchemy"]) == ["elixir"]
+        assert self.index.by_chapter(2) == {
+            "alchemy": {"potion": self.ABILITIES["alchemy"]["potion"]},
+            "psychic": {"mind": self.ABILITIES["psychic"]["mind"]},
+        }
+
+    def test_available(self):
+        """Доступность учитывает уровень, главу, квесты и путь"""
+        def ids(items):
+            return [item["id"] for item in items]
+
+        assert ids(self.index.available(1, 1, [])) == ["alc_1"]
+        assert ids(self.index.available(10, 2, ["q1"])) == ["alc_1", "alc_2"]
+        assert ids(self.index.available(10, 2, ["q1", "q2"])) == ["alc_1", "alc_2", "psy_1"]
+        assert ids(self.index.available(1, 13, [], path="alliance")) == ["pa_1"]
+
+
+# ============================================================================
+# SEARCH INDEX TESTS
+# ============================================================================
+
+class TestSearchIndex:
+    """Тесты полнотекстового индекса"""
+
+    def setup_method(self):
+        from app.services.search_index import SearchIndex
+        self.index = SearchIndex([
+            ({"id": 1}, "Щит разума", "Защищает от ментальных атак", "psychic"),
+            ({"id": 2}, "Зелье", "Усиливает щит корабля", "alchemy"),
+            ({"id": 3}, "Ёлочный эликсир", "Праздничное зелье", "alchemy"),
+        ])
+
+    def test_case_folding(self):
+        """Поиск не зависит от регистра и ё/е"""
+        assert [r["id"] for r in self.index.search("ЩИТ")] == [1, 2]
+        assert [r["id"] for r in self.index.search("елочный")] == [3]
+
+    def test_ranking_and_limit(self):
+        """Совпадения в названии выше, лимит соблюдается"""
+        assert [r["id"] for r in self.index.search("зелье")] == [2, 3]
+        assert len(self.index.search("щит", limit=1)) == 1
+
+    def test_group_filter(self):
+        """Фильтр по группе"""
+        assert [r["id"] for r in self.index.search("щит", group="alchemy")] == [2]
+        assert self.index.search("нет такого") == []
+
+    def test_postings_are_compact(self):
+        """Постинги хранятся отсортированными массивами"""
+        from array import array
+        posting = self.index._trigrams["щит"]
+        assert isinstance(posting, array)
+        assert list(posting) == [0, 1]
+
+    def test_quest_search_endpoint(self):
+        """Эндпоинт поиска квестов использует индекс снимка"""
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        quest = next(iter(content_store.snapshot.quest_index.values()))
+        response = TestClient(app).get("/api/quests/search", params={"query": quest["name"]})
+        assert response.status_code == 200
+        assert response.json()[0]["name"] == quest["name"]
+
+
+# ============================================================================
+# QUEST GRAPH TESTS
+# ============================================================================
+
+class TestQuestGraph:
+    """Тесты графа зависимостей квестов"""
+
+    QUESTS = {
+        "metadata": {"version": "1.0"},
+        "q1": {"chapter": 1},
+        "q2": {"chapter": 1, "requires": "q1"},
+        "q3": {"chapter": 2, "requires": ["q2", "external"], "path": "alliance"},
+        "q4": {"chapter": 2, "requires": ["q1"], "level_required": 10},
+    }
+
+    def setup_method(self):
+        from app.services.quest_graph import build_quest_graph
+        self.graph = build_quest_graph(self.QUESTS)
+
+    def test_edges_and_order(self):
+        """Прямые/обратные рёбра и топологический порядок"""
+        assert self.graph.unlocks("q1") == ["q2", "q4"]
+        order = [self.graph.quest_ids[i] for i in self.graph.topological_order]
+        assert order.index("q1") < order.index("q2") < order.index("q3")
+
+    def test_transitive_prerequisites(self):
+        """Транзитивные предпосылки"""
+        assert self.graph.prerequisites("q3") == ["q1", "q2", "external"]
+        assert self.graph.prerequisites("q1") == []
+
+    def test_available_bitmask(self):
+        """Доступность по маске завершённых квестов"""
+        assert self.graph.available(1, []) == ["q1"]
+        assert self.graph.available(1, ["q1"]) == ["q1", "q2"]
+        assert self.graph.available(2, ["q1", "q2", "external"], path="alliance") == ["q3"]
+        assert self.graph.available(2, ["q1"], level=10) == ["q4"]
+        assert self.graph.is_unlocked("q2", self.graph.encode(["q1"]))
+
+
+# ============================================================================
+# ACHIEVEMENT RULES TESTS
+# ============================================================================
+
+class TestAchievementRules:
+    """Тесты скомпилированных правил достижений"""
+
+    ACHIEVEMENTS = {
+        "explorer": {"name": "Explorer", "description": "", "icon": "🧭", "points": 20,
+                     "requirement": {"type": "scenes_visited", "count": 2}},
+        "strong": {"name": "Strong", "description": "", "icon": "💪", "points": 60,
+                   "requirement": {"type": "stat_threshold", "stat": "health", "min": 80}},
+        "pacifist": {"name": "Pacifist", "description": "", "icon": "🕊", "points": 40,
+                     "requirement": {"type": "no_pattern", "pattern": "aggressive"}},
+        "secret": {"name": "Secret", "description": "", "icon": "?", "points": 10,
+                   "requirement": {"type": "event", "event": "unknown"}},
+    }
+
+    def setup_method(self):
+        from app.services.achievement_rules import build_achievement_engine
+        self.engine = build_achievement_engine(self.ACHIEVEMENTS)
+
+    def test_groups_by_player_field(self):
+        """Правила сгруппированы по читаемым полям"""
+        assert self.engine.groups["visited_scenes"] == (0,)
+        assert self.engine.groups["games_completed"] == (2,)
+        assert self.engine.indexes_for_fields(["stats", "decision_patterns"]) == [1, 2]
+
+    def test_check_payload(self):
+        """Ответ содержит разблокированные достижения и прогресс"""
+        result = self.engine.check({"visited_scenes": ["a", "b", "b"], "stats": {"health": 90}})
+        assert [a["id"] for a in result["achievements"]] == ["strong", "explorer"]
+        assert result["total_points"] == 80
+        assert result["total_count"] == 4
+        assert result["progress"]["explorer"] == {"current": 2, "max": 2, "percentage": 100}
+        assert result["progress"]["secret"]["current"] == 0
+
+    def test_missing_fields_use_defaults(self):
+        """Отсутствующие поля дают результат по умолчанию"""
+        result = self.engine.check({"games_completed": 1})
+        assert [a["id"] for a in result["achievements"]] == ["pacifist"]
+
+
+# ============================================================================
+# ACHIEVEMENT TRACKER TESTS
+# ============================================================================
+
+class TestAchievementTracker:
+    """Тесты инкрементальной проверки достижений"""
+
+    def setup_method(self):
+        from app.services.achievement_tracker import AchievementTracker
+        self.tracker = AchievementTracker()
+        self.sent = []
+
+    def _capture(self, monkeypatch):
+        from app.services import achievement_tracker as module
+
+        async def notify(user_id, name, description, points):
+            self.sent.append((user_id, name))
+
+        monkeypatch.setattr(module.notification_service, "notify_achievement", notify)
+
+    def test_incremental_unlocks_match_full_check(self, monkeypatch):
+        """Инкрементальная проверка совпадает с полной и уведомляет один раз"""
+        import asyncio
+        self._capture(monkeypatch)
+        engine = content_store.snapshot.achievement_engine
+        player = {"visited_scenes": ["start"], "stats": {"health": 100}}
+
+        first = asyncio.run(self.tracker.on_change("p1", player))
+        expected = {a["id"] for a in engine.check(player)["achievements"]}
+        assert {a["id"] for a in first} == expected
+        assert len(self.sent) == len(expected)
+
+        player["ending_type"] = "awakening"
+        second = asyncio.run(self.tracker.on_change("p1", player, ["ending_type"]))
+        expected_after = {a["id"] for a in engine.check(player)["achievements"]}
+        assert {a["id"] for a in second} == expected_after - expected
+
+        assert asyncio.run(self.tracker.on_change("p1", player, ["stats"])) == []
+        payload = self.tracker.get_payload("p1")
+        assert payload["unlocked_count"] == len(expected_after)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,444 @@
+"""
+StarCourier Web - Game State Tests
+Тесты хранилища состояния игроков /api/game
+
+Запуск: pytest tests/test_game_state.py -v
+"""
+
+import asyncio
+import pytest
+import sys
+import os
+
+# Добавляем путь к backend
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from datetime import datetime
+
+from app.database.models import GAME_EVENT_CHOICE, GAME_EVENT_START
+from app.services.content_store import get_content
+from app.services.game_log import GameEventLog, LoggedEvent, NO_CHOICE, new_game_state, replay
+from app.services.player_state import PlayerState, new_player_state
+from app.services.player_store import PlayerStore, estimate_size
+
+
+class FakePersistence:
+    """Хранилище состояний в памяти вместо PlayerStats"""
+
+    def __init__(self):
+        self.rows = {}
+        self.batches = []
+
+    async def save_many(self, states):
+        self.batches.append(sorted(states))
+        self.rows.update({player_id: dict(state) for player_id, state in states.items()})
+        return len(states)
+
+    async def load(self, player_id):
+        state = self.rows.get(player_id)
+        return dict(state) if state else None
+
+    async def delete(self, player_id):
+        return self.rows.pop(player_id, None) is not None
+
+
+class FakeGraph:
+    """Граф сцен: только индекс и порядок ID"""
+
+    def __init__(self, scene_ids):
+        self.scene_ids = tuple(scene_ids)
+        self.index = {scene_id: i for i, scene_id in enumerate(self.scene_ids)}
+
+
+class FakeEventStorage:
+    """Хранилище событий в памяти вместо game_events"""
+
+    def __init__(self):
+        self.events = []
+        self.fail = False
+
+    async def save_many(self, events):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.events.extend(events)
+        return len(events)
+
+    async def load_last_game(self, player_id):
+        events = [e for e in self.events if e["player_id"] == player_id]
+        starts = [i for i, e in enumerate(events) if e["kind"] == GAME_EVENT_START]
+        if not starts:
+            return []
+        return [
+            LoggedEvent(e["kind"], e["scene"], e["choice"], e["created_at"])
+            for e in events[starts[-1]:]
+        ]
+
+    async def delete(self, player_id):
+        before = len(self.events)
+        self.events = [e for e in self.events if e["player_id"] != player_id]
+        return len(self.events) < before
+
+
+def make_state(scene="start"):
+    return {"current_scene": scene, "stats": {"health": 100}, "visited_scenes": [scene]}
+
+
+# ============================================================================
+# PLAYER STORE TESTS
+# ============================================================================
+
+class TestPlayerStore:
+    """Тесты ограниченного хранилища игроков"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, clock):
+        self.clock = clock
+        self.persistence = FakePersistence()
+        self.store = PlayerStore(
+            max_players=2, idle_timeout=60, persistence=self.persistence, clock=self.clock
+        )
+
+    def test_lru_eviction_spills_to_db(self):
+        """Сверх лимита вытесняется давно не использованный игрок"""
+        self.store["a"] = make_state()
+        self.store["b"] = make_state()
+        self.store["a"]  # a становится свежим
+        self.store["c"] = make_state()
+
+        assert "b" not in self.store
+        assert asyncio.run(self.store.spill_pending()) == 1
+        assert self.persistence.rows["b"]["current_scene"] == "start"
+        assert self.store.get_stats()["evicted_lru"] == 1
+
+    def test_idle_players_expire(self):
+        """Простаивающие игроки вытесняются"""
+        self.store["a"] = make_state()
+        self.clock.now = 61
+        self.store["b"] = make_state()
+
+        assert "a" not in self.store
+        assert self.store.get_stats()["evicted_idle"] == 1
+
+    def test_evicted_player_is_restored(self):
+        """Вытесненный игрок восстанавливается из БД"""
+        self.store["a"] = make_state("scene_2")
+        self.clock.now = 61
+        assert self.store.sweep() == 1
+        asyncio.run(self.store.spill_pending())
+
+        state = asyncio.run(self.store.load("a"))
+        assert state["current_scene"] == "scene_2"
+        assert "a" in self.store
+        assert asyncio.run(self.store.load("unknown")) is None
+
+    def test_memory_accounting(self):
+        """Память учитывается и ограничивает хранилище"""
+        self.store.max_players = 0
+        self.store["a"] = make_state()
+        single = self.store.memory_bytes
+        assert single > 0
+
+        self.store.max_memory_bytes = single * 2
+        self.store["a"]["visited_scenes"].extend(f"scene_{i}" for i in range(50))
+        self.store.record_change("a")
+        self.store["b"] = make_state()
+
+        assert "a" not in self.store
+        assert self.store.memory_bytes == single
+
+    def test_delete_removes_saved_state(self):
+        """Удаление стирает игрока и из памяти, и из БД"""
+        self.persistence.rows["a"] = make_state()
+        assert asyncio.run(self.store.delete("a")) is True
+        assert asyncio.run(self.store.load("a")) is None
+        assert asyncio.run(self.store.delete("a")) is False
+
+
+# ============================================================================
+# WRITE-BEHIND TESTS
+# ============================================================================
+
+class TestWriteBehind:
+    """Тесты отложенного сохранения прогресса"""
+
+    def setup_method(self):
+        self.persistence = FakePersistence()
+        self.store = PlayerStore(
+            max_players=0, idle_timeout=0, persistence=self.persistence,
+            write_behind=True, flush_threshold=3
+        )
+
+    def test_changes_are_batched(self):
+        """Изменения пишутся одной пачкой при сохранении"""
+        for player_id in ("a", "b"):
+            self.store[player_id] = make_state()
+            self.store.record_change(player_id)
+        self.store.record_change("a")
+
+        assert self.persistence.batches == []
+        assert asyncio.run(self.store.flush()) == 2
+        assert self.persistence.batches == [["a", "b"]]
+        assert asyncio.run(self.store.flush()) == 0
+
+    def test_threshold_triggers_flush(self):
+        """Порог изменённых игроков запускает сохранение"""
+        async def scenario():
+            for player_id in ("a", "b", "c"):
+                self.store[player_id] = make_state()
+                self.store.record_change(player_id)
+            await asyncio.sleep(0)
+            await self.store.close()
+
+        asyncio.run(scenario())
+        assert self.persistence.batches == [["a", "b", "c"]]
+
+    def test_saved_copy_is_isolated(self):
+        """В БД уходит копия состояния на момент сохранения"""
+        self.store["a"] = make_state()
+        self.store.record_change("a")
+        asyncio.run(self.store.flush())
+
+        self.store["a"]["visited_scenes"].append("scene_2")
+        assert self.persistence.rows["a"]["visited_scenes"] == ["start"]
+
+    def test_failed_flush_keeps_changes(self):
+        """При ошибке БД игроки остаются изменёнными"""
+        async def broken(states):
+            raise RuntimeError("db down")
+
+        self.store["a"] = make_state()
+        self.store.record_change("a")
+        self.persistence.save_many, save_many = broken, self.persistence.save_many
+
+        assert asyncio.run(self.store.flush()) == 0
+        assert self.store.get_stats()["dirty"] == 1
+
+        self.persistence.save_many = save_many
+        assert asyncio.run(self.store.close()) is None
+        assert "a" in self.persistence.rows
+
+
+# ============================================================================
+# PLAYER STATE TESTS
+# ============================================================================
+
+class TestPlayerState:
+    """Тесты компактного состояния игрока"""
+
+    def setup_method(self):
+        self.graph = FakeGraph(["start", "scene_1", "scene_2"])
+        self.player = new_player_state(
+            {"health": 90, "morale": 50}, {"max": 50}, self.graph, inventory=["Нож"]
+        )
+
+    def test_stats_are_clamped(self):
+        """Изменения ограничиваются диапазоном 0..100"""
+        assert self.player.stats.apply({"health": 30, "morale": -80, "luck": 10})
+        assert self.player.stats.to_dict() == {"health": 100, "morale": 0, "luck": 60}
+        assert self.player.stats.apply(None) is False
+        # Обычный Mapping: values()/items() работают
+        assert list(self.player.stats.values()) == [100, 0, 60]
+        assert dict(self.player.stats.items()) == self.player.stats.to_dict()
+
+    def test_visited_scenes_bitset(self):
+        """Посещённые сцены хранятся битовой маской"""
+        visited = self.player.visited
+        assert visited.add("scene_2") is True
+        assert visited.add("scene_2") is False
+        assert visited.add("unknown") is True
+
+        assert "scene_2" in visited and "scene_1" not in visited
+        assert len(visited) == 3
+        assert visited.to_list() == ["start", "scene_2", "unknown"]
+
+    def test_dict_round_trip(self):
+        """to_dict/from_dict сохраняют состояние"""
+        self.player.visited.add("scene_1")
+        self.player.choices_made = 2
+        data = self.player.to_dict()
+
+        restored = PlayerState.from_dict(data, self.graph)
+        assert restored.to_dict() == data
+        assert restored["visited_scenes"] == {"start", "scene_1"}
+        assert restored.get("choices_made") == 2
+
+    def test_smaller_than_dict(self):
+        """Компактное состояние меньше словаря"""
+        assert self.player.size_bytes() < estimate_size(self.player.to_dict())
+
+
+# ============================================================================
+# GAME EVENT LOG TESTS
+# ============================================================================
+
+def play(player, graph, steps):
+    """Сыграть первые доступные выборы, вернуть события журнала"""
+    events = []
+    for _ in range(steps):
+        node = graph.get(player.current_scene)
+        choice = next(
+            i for i, t in enumerate(node.transitions)
+            if t.target != -1 and graph.nodes[t.target].transitions
+        )
+        transition = node.transition(choice)
+        events.append(LoggedEvent(GAME_EVENT_CHOICE, node.index, choice, datetime.now()))
+        player.stats.apply_deltas(transition.stats)
+        player.enter_scene(transition.next_scene, graph.nodes[transition.target].ending_type)
+    return events
+
+
+class TestGameEventLog:
+    """Тесты журнала событий и восстановления по нему"""
+
+    def setup_method(self):
+        self.graph = get_content().scene_graph
+        self.started = datetime(2026, 1, 1, 12, 0, 0)
+        self.start_event = LoggedEvent(GAME_EVENT_START, 0, NO_CHOICE, self.started)
+
+    def test_snapshot_interval(self):
+        """Снимок нужен раз в snapshot_interval событий и после выбора без номера"""
+        log = GameEventLog(enabled=True, snapshot_interval=2, storage=FakeEventStorage())
+        assert log.record_start("a", 0) is False
+        assert log.record_choice("a", 0, 0) is False
+        assert log.record_choice("a", 1, 0) is True
+        assert log.record_choice("a", 2, None) is True
+        assert GameEventLog(enabled=False).record_choice("a", 0, 0) is True
+
+    def test_replay_from_start(self):
+        """Повтор событий с начала игры даёт то же состояние"""
+        player = new_game_state(self.started.isoformat())
+        events = [self.start_event] + play(player, self.graph, 3)
+
+        restored = replay(None, events, self.graph)
+        assert restored.to_dict() == player.to_dict()
+
+    def test_replay_after_snapshot(self):
+        """Со снимком повторяются только события после него"""
+        player = new_game_state(self.started.isoformat())
+        events = [self.start_event] + play(player, self.graph, 1)
+        snapshot = PlayerState.from_dict(player.to_dict(), self.graph)
+        events += play(player, self.graph, 2)
+
+        restored = replay(snapshot, events, self.graph)
+        assert restored.to_dict() == player.to_dict()
+
+    def test_replay_stops_on_mismatch(self):
+        """Событие не из текущей сцены прерывает повтор"""
+        player = new_game_state(self.started.isoformat())
+        events = [self.start_event] + play(player, self.graph, 1)
+        events.append(LoggedEvent(GAME_EVENT_CHOICE, 0, 0, datetime.now()))
+
+        restored = replay(None, events, self.graph)
+        assert restored.choices_made == 1
+        assert restored.current_scene == player.current_scene
+
+    def test_flush_and_rehydrate(self):
+        """События пишутся пачкой, ошибки БД не теряют их"""
+        storage = FakeEventStorage()
+        log = GameEventLog(enabled=True, storage=storage)
+        started = datetime.now()
+        log.record_start("a", self.graph.index["start"], started)
+        player = new_game_state(started.isoformat())
+        for event in play(player, self.graph, 2):
+            log.record_choice("a", event.scene, event.choice)
+
+        storage.fail = True
+        assert asyncio.run(log.flush()) == 0
+        assert log.get_stats()["buffered"] == 3
+
+        storage.fail = False
+        restored = asyncio.run(log.rehydrate("a", None))
+        assert len(storage.events) == 3
+        assert restored.to_dict() == player.to_dict()
+
+        assert asyncio.run(log.delete("a")) is True
+        assert asyncio.run(log.rehydrate("a", None)) is None
+
+    def test_overflow_requests_snapshot(self):
+        """Игроки отброшенных при переполнении событий получают полный снимок"""
+        log = GameEventLog(enabled=True, snapshot_interval=100, batch_size=1,
+                           storage=FakeEventStorage())
+        marked = []
+        log.on_drop(marked.append)
+        log.record_start("a", 0)
+        log.record_choice("a", 0, 0)
+        for i in range(10):
+            log.record_start(f"p{i}", 0)
+
+        assert log.get_stats()["dropped"] == 2
+        assert set(marked) == {"a"}
+        assert log._since_snapshot["a"] == 0
+        assert all(event["player_id"] != "a" for event in log._buffer)
+
+    def test_delete_during_failed_flush(self):
+        """Неудачная запись не возвращает в буфер события удалённого игрока"""
+        storage = FakeEventStorage()
+        log = GameEventLog(enabled=True, storage=storage)
+        log.record_start("a", 0)
+        log.record_start("b", 0)
+        storage.fail = True
+        save_many = storage.save_many
+
+        async def slow_save(events):
+            await asyncio.sleep(0.01)
+            return await save_many(events)
+
+        storage.save_many = slow_save
+
+        async def run():
+            flush = asyncio.create_task(log.flush())
+            await asyncio.sleep(0)
+            assert await log.delete("a") is True
+            assert await flush == 0
+
+        asyncio.run(run())
+        assert [event["player_id"] for event in log._buffer] == ["b"]
+
+
+# ============================================================================
+# GAME STATE SERVICE TESTS
+# ============================================================================
+
+class TestGameStateService:
+    """Тесты сохранения анонимных игр в PlayerStats"""
+
+    async def _with_session(self, work):
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from app.database.models import Base
+
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            async with async_sessionmaker(engine)() as session:
+                return await work(session)
+        finally:
+            await engine.dispose()
+
+    def test_registered_users_saves_untouched(self):
+        """Анонимные запросы не читают, не перезаписывают и не удаляют чужие сохранения"""
+        from sqlalchemy import select
+        from app.database.models import PlayerStats, User
+        from app.services.db_service import GUEST_USER_ID, GameStateService
+
+        async def work(session):
+            session.add(User(id="u1", username="guest", email="guest@example.com", password_hash="x"))
+            session.add(PlayerStats(id="s1", user_id="u1", player_id="owned", choices_made=9))
+            await session.flush()
+
+            saved = await GameStateService.save_states(session, {
+                "owned": {"current_scene": "hack", "choices_made": 0},
+                "anon": {"current_scene": "start", "choices_made": 1},
+            })
+            assert saved == 1
+            assert await GameStateService.load_state(session, "owned") is None
+            assert not await GameStateService.delete_state(session, "owned")
+
+            rows = {row.player_id: row for row in (await session.execute(select(PlayerStats))).scalars()}
+            assert rows["owned"].choices_made == 9 and rows["owned"].user_id == "u1"
+            # Гостевой владелец - зарезервированный, а не зарегистрированный "guest"
+            assert rows["anon"].user_id == GUEST_USER_ID
+            assert (await GameStateService.load_state(session, "anon"))["choices_made"] == 1
+            assert await GameStateService.delete_state(session, "anon")
+
+        asyncio.run(self._with_session(work))
@@ -0,0 +1,365 @@
+"""
+StarCourier Web - Session Store Tests
+Тесты общего хранилища сессий воркеров
+
+Запуск: pytest tests/test_session_store.py -v
+"""
+
+import asyncio
+import pickle
+import pytest
+import sys
+import os
+
+# Добавляем путь к backend
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.services.combat_service import CombatManager, create_enemy_combatant, create_player_combatant
+from app.services.game_integration import GameIntegrationService
+from app.services.game_log import new_game_state
+from app.services.player_store import PlayerStore, StaleStateError
+from app.services.session_store import (
+    NS_GAME, HashRing, HotKeyCache, MemorySessionBackend, RedisSessionBackend,
+    SQLiteSessionBackend, SessionStore, make_key, register_codec
+)
+
+# Пространство имён тестов: значения - JSON как есть
+NS_TEST = "test"
+register_codec(NS_TEST, lambda value: value, lambda data: data)
+
+
+class RecordingPersistence:
+    """Сохранение состояний в БД: запоминает записанное"""
+
+    def __init__(self):
+        self.rows = {}
+
+    async def save_many(self, states):
+        self.rows.update(states)
+        return len(states)
+
+    async def load(self, player_id):
+        return None
+
+    async def delete(self, player_id):
+        return self.rows.pop(player_id, None) is not None
+
+
+def redis_store(client, **kwargs):
+    """Хранилище с одним узлом поверх заглушки Redis"""
+    return SessionStore([RedisSessionBackend("redis://fake/0", client=client)], **kwargs)
+
+
+class TestHashRing:
+    """Тесты кольца консистентного хеширования"""
+
+    def test_distribution_and_stability(self):
+        """Ключи распределяются по узлам, новый узел забирает ~1/N ключей"""
+        keys = [f"player_{i}" for i in range(3000)]
+        ring = HashRing(["a", "b", "c"])
+        owners = {key: ring.node_for(key) for key in keys}
+        counts = {node: list(owners.values()).count(node) for node in ring.nodes}
+        assert all(600 < count < 1400 for count in counts.values())
+
+        grown = HashRing(["a", "b", "c", "d"])
+        moved = [key for key in keys if grown.node_for(key) != owners[key]]
+        # Переезжают только ключи нового узла
+        assert all(grown.node_for(key) == "d" for key in moved)
+        assert len(moved) < len(keys) * 0.4
+
+    def test_single_node(self):
+        """Один узел владеет всеми ключами"""
+        assert HashRing(["only"]).node_for("anything") == "only"
+        with pytest.raises(ValueError):
+            HashRing([])
+
+
+class TestSessionStore:
+    """Тесты хранилища сессий"""
+
+    def test_memory_backend_keeps_objects(self, clock):
+        """In-process бэкенд хранит объекты без сериализации и соблюдает TTL"""
+        store = SessionStore([MemorySessionBackend(clock=clock)], default_ttl=10)
+        value = {"scene": "start"}
+
+        async def run():
+            await store.set(NS_GAME, "p1", value)
+            assert await store.get(NS_GAME, "p1") is value
+            clock.now = 11
+            assert await store.get(NS_GAME, "p1") is None
+
+        asyncio.run(run())
+        assert not store.shared
+
+    def test_sqlite_shared_between_workers(self, tmp_path):
+        """Два воркера с одним файлом SQLite видят записи друг друга"""
+        path = str(tmp_path / "sessions.db")
+        worker_a = SessionStore([SQLiteSessionBackend(path)])
+        worker_b = SessionStore([SQLiteSessionBackend(path)])
+
+        async def run():
+            await worker_a.set(NS_TEST, "p1", {"choices_made": 1})
+            assert await worker_b.get(NS_TEST, "p1") == {"choices_made": 1}
+            assert await worker_b.delete(NS_TEST, "p1")
+            assert await worker_a.get(NS_TEST, "p1") is None
+            await worker_a.set(NS_TEST, "gone", {}, ttl=-1)
+            assert await worker_b.get(NS_TEST, "gone") is None
+            await worker_a.close()
+            await worker_b.close()
+
+        asyncio.run(run())
+
+    def test_sharded_redis_nodes(self, make_redis):
+        """Ключи расходятся по узлам кольца, каждый читается со своего узла"""
+        clients = [make_redis(), make_redis()]
+        backends = [RedisSessionBackend(f"redis://node{i}/0", client=c) for i, c in enumerate(clients)]
+        worker_a = SessionStore(backends, l1_size=0)
+        worker_b = SessionStore(
+            [RedisSessionBackend(f"redis://node{i}/0", client=c) for i, c in enumerate(clients)],
+            l1_size=0
+        )
+
+        async def run():
+            for i in range(50):
+                await worker_a.set(NS_TEST, f"p{i}", i)
+            for i in range(50):
+                assert await worker_b.get(NS_TEST, f"p{i}") == i
+
+        asyncio.run(run())
+        assert all(client.data for client in clients)
+        assert sum(len(client.data) for client in clients) == 50
+
+    def test_l1_serves_only_stale_tolerant_reads(self, clock, fake_redis):
+        """L1 отвечает на fresh=False, чтение для изменения идёт в бэкенд"""
+        worker_a = redis_store(fake_redis, l1_ttl=1.0, clock=clock)
+        worker_b = redis_store(fake_redis, l1_ttl=1.0, clock=clock)
+
+        async def run():
+            await worker_a.set(NS_TEST, "p1", {"v": 1})
+            await worker_b.set(NS_TEST, "p1", {"v": 2})
+            assert await worker_a.get(NS_TEST, "p1", fresh=False) == {"v": 1}
+            assert await worker_a.get(NS_TEST, "p1") == {"v": 2}
+            # Свежее чтение обновило L1
+            calls = fake_redis.calls
+            assert await worker_a.get(NS_TEST, "p1", fresh=False) == {"v": 2}
+            assert fake_redis.calls == calls
+            clock.now = 2.0
+            await worker_b.set(NS_TEST, "p1", {"v": 3})
+            assert await worker_a.get(NS_TEST, "p1", fresh=False) == {"v": 3}
+
+        asyncio.run(run())
+        assert worker_a.get_stats()["l1_hits"] == 2
+
+    def test_backend_errors_are_misses(self, fake_redis, monkeypatch):
+        """Ошибка бэкенда не пробрасывается"""
+
+        async def down(*args, **kwargs):
+            raise ConnectionError("down")
+
+        monkeypatch.setattr(fake_redis, "get", down)
+        monkeypatch.setattr(fake_redis, "set", down)
+        store = redis_store(fake_redis)
+
+        async def run():
+            assert not await store.set(NS_TEST, "p1", {})
+            assert await store.get(NS_TEST, "p1") is None
+
+        asyncio.run(run())
+        assert store.get_stats()["errors"] == 2
+
+    def test_foreign_payloads_rejected(self, fake_redis):
+        """Записи не в JSON-формате пространства имён не десериализуются"""
+        store = redis_store(fake_redis, l1_size=0)
+
+        async def run():
+            # pickle с вызовом при загрузке - не исполняется
+            fake_redis.data[make_key(NS_GAME, "p1")] = (pickle.dumps(print), None)
+            assert await store.get(NS_GAME, "p1") is None
+            # JSON, не похожий на состояние игры
+            fake_redis.data[make_key(NS_GAME, "p2")] = (b'{"stats": 1}', None)
+            assert await store.get(NS_GAME, "p2") is None
+            # Пространство имён без кодека
+            assert not await store.set("unknown", "p3", {})
+
+        asyncio.run(run())
+        assert store.get_stats()["errors"] == 3
+
+    def test_hot_key_cache_lru(self, clock):
+        """L1 ограничен по размеру"""
+        cache = HotKeyCache(max_size=2, ttl=10, clock=clock)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")
+        cache.put("c", b"3")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+
+
+class TestSharedManagers:
+    """Менеджеры игры на общем хранилище: запросы игрока на разных воркерах"""
+
+    def test_player_store_across_workers(self, fake_redis):
+        """Игра, начатая на одном воркере, продолжается на другом"""
+        worker_a = PlayerStore(sessions=redis_store(fake_redis))
+        worker_b = PlayerStore(sessions=redis_store(fake_redis))
+
+        async def run():
+            player = new_game_state("2024-01-01T00:00:00")
+            worker_a["p1"] = player
+            await worker_a.publish("p1")
+
+            loaded = await worker_b.load("p1")
+            assert loaded.current_scene == "start"
+            loaded.choices_made = 3
+            await worker_b.publish("p1")
+
+            assert (await worker_a.load("p1")).choices_made == 3
+            assert await worker_b.delete("p1")
+            # Копия в памяти удалённого на другом воркере игрока не воскресает
+            assert await worker_a.load("p1") is None
+
+        asyncio.run(run())
+
+    def test_concurrent_publish_conflicts(self, fake_redis):
+        """Запись поверх изменений другого воркера отклоняется"""
+        worker_a = PlayerStore(sessions=redis_store(fake_redis))
+        worker_b = PlayerStore(sessions=redis_store(fake_redis))
+
+        async def run():
+            worker_a["p1"] = new_game_state("2024-01-01T00:00:00")
+            await worker_a.publish("p1")
+            player_a = await worker_a.load("p1")
+            player_b = await worker_b.load("p1")
+
+            player_b.choices_made = 2
+            await worker_b.publish("p1")
+            player_a.choices_made = 1
+            with pytest.raises(StaleStateError):
+                await worker_a.publish("p1")
+            # Устаревшая копия отброшена, выигравшее изменение сохранилось
+            assert "p1" not in worker_a
+            assert (await worker_a.load("p1")).choices_made == 2
+
+            # Новая игра записывается поверх любой версии
+            worker_b["p1"] = new_game_state("2024-01-02T00:00:00")
+            (await worker_a.load("p1")).choices_made = 5
+            await worker_a.publish("p1")
+            assert await worker_b.publish("p1", force=True)
+            assert (await worker_a.load("p1")).choices_made == 0
+
+        asyncio.run(run())
+        assert worker_a.get_stats()["conflicts"] == 1
+
+    def test_sqlite_compare_and_set(self, tmp_path):
+        """Версии проверяются и в общем файле SQLite"""
+        path = str(tmp_path / "sessions.db")
+        worker_a = SessionStore([SQLiteSessionBackend(path)])
+        worker_b = SessionStore([SQLiteSessionBackend(path)])
+
+        async def run():
+            assert await worker_a.compare_and_set(NS_TEST, "k", {"v": 1}, 0)
+            assert await worker_b.compare_and_set(NS_TEST, "k", {"v": 2}, 0) is False
+            value, version = await worker_b.get_versioned(NS_TEST, "k")
+            assert (value, version) == ({"v": 1}, 1)
+            assert await worker_b.compare_and_set(NS_TEST, "k", {"v": 2}, version)
+            assert await worker_a.compare_and_set(NS_TEST, "k", {"v": 3}, 1) is False
+            await worker_a.close()
+            await worker_b.close()
+
+        asyncio.run(run())
+        assert worker_b.get_stats()["conflicts"] == 1
+
+    def test_spill_writes_shared_state(self, clock, fake_redis):
+        """В БД вытесняется последняя опубликованная версия, а не копия воркера"""
+        persistence = RecordingPersistence()
+        worker_a = PlayerStore(idle_timeout=10, persistence=persistence,
+                               sessions=redis_store(fake_redis), clock=clock)
+        worker_b = PlayerStore(sessions=redis_store(fake_redis))
+
+        async def run():
+            worker_a["p1"] = new_game_state("2024-01-01T00:00:00")
+            await worker_a.publish("p1")
+            player = await worker_b.load("p1")
+            player.choices_made = 7
+            await worker_b.publish("p1")
+
+            clock.now = 11
+            assert worker_a.sweep() == 1
+            await worker_a.spill_pending()
+
+        asyncio.run(run())
+        assert persistence.rows["p1"]["choices_made"] == 7
+
+    def test_combat_across_workers(self, fake_redis):
+        """Бой, начатый на одном воркере, продолжается на другом"""
+        worker_a = CombatManager(sessions=redis_store(fake_redis))
+        worker_b = CombatManager(sessions=redis_store(fake_redis))
+
+        async def run():
+            combat = worker_a.start_combat(
+                create_player_combatant("Макс Велл", 1), [create_enemy_combatant("Бандит", 1)]
+            )
+            await worker_a.save_combat(combat.id)
+            assert combat.id not in worker_a.combats
+
+            loaded = await worker_b.load_combat(combat.id)
+            loaded.turn = 5
+            await worker_b.save_combat(combat.id)
+            assert (await worker_a.load_combat(combat.id)).turn == 5
+            assert combat.id in worker_a.combats
+            assert await worker_a.load_combat("missing") is None
+
+        asyncio.run(run())
+
+    def test_failed_handlers_release_state(self, fake_redis):
+        """Бой и игрок, загруженные обработчиком с ошибкой, не остаются в памяти"""
+        combats = CombatManager(sessions=redis_store(fake_redis))
+        integration = GameIntegrationService(sessions=redis_store(fake_redis))
+
+        async def run():
+            combat = combats.start_combat(
+                create_player_combatant("Макс Велл", 1), [create_enemy_combatant("Бандит", 1)]
+            )
+            await combats.save_combat(combat.id)
+            with pytest.raises(ValueError):
+                async with combats.use_combat(combat.id) as loaded:
+                    loaded.turn = 9
+                    raise ValueError("Способность не найдена")
+            assert not combats.combats
+            # Изменения обработчика с ошибкой не записаны
+            assert (await combats.load_combat(combat.id, fresh=False)).turn == 1
+
+            async with combats.use_combat(combat.id) as loaded:
+                loaded.turn = 2
+            assert not combats.combats
+
+            with pytest.raises(ValueError):
+                async with integration.use_player("p1"):
+                    raise ValueError("down")
+            assert not integration.players
+
+        asyncio.run(run())
+
+    def test_integration_players_across_workers(self, fake_redis):
+        """Игрок механик сохраняется между воркерами"""
+        worker_a = GameIntegrationService(sessions=redis_store(fake_redis))
+        worker_b = GameIntegrationService(sessions=redis_store(fake_redis))
+
+        async def run():
+            player = await worker_a.load_player("p1")
+            player.stats["money"] = 7
+            item_id = next(iter(player.inventory.items))
+            assert player.inventory.equip_item(item_id)[0]
+            worker_a.start_combat("p1", "Бандит", 1)
+            await worker_a.save_player("p1")
+
+            loaded = await worker_b.load_player("p1")
+            assert loaded.stats["money"] == 7
+            assert loaded.inventory.items.keys() == player.inventory.items.keys()
+            equipped = next(iter(loaded.inventory.equipped.values()))
+            # Экипировка ссылается на предмет инвентаря, а не на копию
+            assert equipped is loaded.inventory.items[item_id] and equipped.equipped
+            assert loaded.crafting.recipes.keys() == player.crafting.recipes.keys()
+            assert len(loaded.combat.combats) == 1
+
+        asyncio.run(run())
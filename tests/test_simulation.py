@@ -0,0 +1,78 @@
+"""
+StarCourier Web - Simulation Tests
+Тесты Монте-Карло симуляции прохождений
+
+Запуск: pytest tests/test_simulation.py -v
+"""
+
+import pytest
+import sys
+import os
+
+# Добавляем путь к backend
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+pytest.importorskip("numpy")
+
+from app.api.game import apply_stat_changes
+from app.services.scene_graph import build_scene_graph
+from app.services.simulation import SimulationTable, simulate
+
+INITIAL_STATS = {"health": 100, "morale": 75, "money": 1000}
+
+
+def make_table(scenes):
+    return SimulationTable(build_scene_graph(scenes), INITIAL_STATS)
+
+
+# ============================================================================
+# SIMULATION TESTS
+# ============================================================================
+
+class TestSimulation:
+    """Тесты симуляции прохождений"""
+
+    def test_matches_stat_rules(self):
+        """Характеристики меняются как в apply_stat_changes"""
+        changes = [{"money": -10, "luck": 5}, {"morale": 40}]
+        table = make_table({
+            "start": {"choices": [{"next": "a", "stats": changes[0]}]},
+            "a": {"choices": [{"next": "defend_station", "stats": changes[1]}]},
+            "defend_station": {"choices": []},
+        })
+        report = simulate(table, runs=100, seed=1)
+
+        expected = dict(INITIAL_STATS)
+        for change in changes:
+            expected = apply_stat_changes(expected, change)
+        assert {stat: value["p50"] for stat, value in report["final_stats"].items()} == expected
+        assert report["outcomes"]["combat_victory"]["count"] == 100
+        assert report["path_length"]["max"] == 2
+
+    def test_game_over(self):
+        """Обнулённое здоровье заканчивает игру"""
+        table = make_table({
+            "start": {"choices": [{"next": "a", "stats": {"health": -100, "morale": -100}}]},
+            "a": {"choices": [{"next": "start"}]},
+        })
+        report = simulate(table, runs=10, seed=1)
+        assert report["outcomes"] == {
+            "health_depleted": {"count": 10, "share": 1.0, "avg_length": 1.0}
+        }
+
+    def test_policies(self):
+        """cautious предпочитает выборы, повышающие здоровье"""
+        table = make_table({
+            "start": {"choices": [
+                {"next": "nowhere"},
+                {"next": "dead_end", "stats": {"health": 50}},
+            ]},
+            "dead_end": {"choices": []},
+        })
+        uniform = simulate(table, runs=20000, seed=1, include_scenes=True)
+        cautious = simulate(table, runs=20000, policy="cautious", seed=1)
+
+        assert abs(uniform["outcomes"]["missing_scene"]["share"] - 0.5) < 0.02
+        assert cautious["outcomes"]["dead_end"]["share"] > 0.95
+        assert uniform["scenes"]["start"]["visits"] == 20000
+        assert simulate(table, runs=20000, seed=1)["outcomes"] == uniform["outcomes"]